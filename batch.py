@@ -0,0 +1,296 @@
+# Batch solver for puzzle files with one puzzle per line (81 characters, same format as test_data/input2.txt)
+# or any other format loader.py reads (pretty / SDK / SS grids, packed corpus)
+# puzzles are read lazily and every result is written as soon as it is known -> memory use doesn't depend on input size
+# usage: python batch.py [input file, default stdin] [-o output file] [--engine strings|bits|dlx|numpy]
+#                       [--workers N] [--chunk-size N] [--unordered]
+# puzzles are solved in chunks (the numpy engine solves a whole chunk at once)
+# with --workers the chunks are sent to a pool of worker processes
+# output file named *.sdkc is written as corpus (corpus.py) with solutions and statuses
+
+import argparse
+import collections
+import concurrent.futures
+import importlib
+import itertools
+import os
+import sys
+import time
+
+import corpus
+import loader
+import solver
+from solver import digits, enough_clues
+
+# solver engines that can be used (module name of each engine)
+# engines with solve_batch() get a whole chunk of puzzles at once
+ENGINES = {"strings": "solver", "bits": "bitsolver", "dlx": "dlx", "numpy": "npsolver"}
+
+# engines whose solves fill the instrumentation counters (solver.collect_stats())
+COUNTING_ENGINES = ("strings", "bits", "dlx")
+
+# result line for puzzles without a single solution
+UNSOLVABLE = "unsolvable"
+MULTIPLE = "multiple"
+TOO_FEW_CLUES = "too_few_clues"
+# record that couldn't be read (line without 81 squares, unfinished grid)
+INVALID = "invalid"
+
+def read_puzzles(records):
+    # puzzle of every record, records with an error give an empty puzzle (-> INVALID result, one result per record)
+    for record in records:
+        yield record.puzzle or ""
+
+def result_line(grid, answer):
+    # converts output of solve() to one line of text
+    if answer == False:
+        return UNSOLVABLE
+    elif answer == 2:
+        # solve() returns 2 for multiple solutions and for too few input digits
+        if enough_clues(grid):
+            return MULTIPLE
+        return TOO_FEW_CLUES
+    return "".join(answer.values())
+
+def line_status(line):
+    # solve status (solver.py statuses, corpus.INVALID) of a result line
+    statuses = {UNSOLVABLE: solver.NONE, MULTIPLE: solver.MULTIPLE, TOO_FEW_CLUES: solver.TOO_FEW_CLUES,
+                INVALID: corpus.INVALID}
+    return statuses.get(line, solver.UNIQUE)
+
+def solve_puzzles(grids, solve_batch):
+    # solve a list of puzzle lines and return list of their result lines
+    # lines without 81 squares aren't solved
+    valid = [i for i, grid in enumerate(grids) if sum(1 for c in grid if c in digits or c in "0.") == 81]
+    lines = [INVALID] * len(grids)
+    for i, answer in zip(valid, solve_batch([grids[i] for i in valid])):
+        lines[i] = result_line(grids[i], answer)
+    return lines
+
+def solve_lines(puzzles, engine="bits", chunk_size=256, counters=None):
+    # generator of result lines (one for each puzzle)
+    # counters -> dict where the instrumentation counters of all solves are summed (COUNTING_ENGINES only)
+    check_counters(engine, counters)
+    solve_batch = get_solve_batch(engine)
+    for chunk in chunked(puzzles, chunk_size):
+        if counters is None:
+            lines = solve_puzzles(chunk, solve_batch)
+        else:
+            with solver.collect_stats() as chunk_counters:
+                lines = solve_puzzles(chunk, solve_batch)
+            solver.add_stats(counters, chunk_counters)
+        for line in lines:
+            yield line
+
+def check_counters(engine, counters):
+    # counters of an engine that can't count would stay all zero -> error instead
+    if counters is not None and engine not in COUNTING_ENGINES:
+        raise ValueError("the %s engine has no instrumentation counters" % engine)
+
+def get_solve_batch(engine):
+    # function solving a list of grids with the chosen engine
+    module = importlib.import_module(ENGINES[engine])
+    if hasattr(module, "solve_batch"):
+        return module.solve_batch
+    return lambda grids: [module.solve(grid) for grid in grids]
+
+def chunked(items, size):
+    # split iterable into lists of at most size items (lazily)
+    items = iter(items)
+    while True:
+        chunk = list(itertools.islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+def pool_imap(func, tasks, workers, ordered=True, max_pending=None):
+    # run func(task) for every task in a process pool and yield the results
+    # only a limited number of tasks is submitted at once -> tasks are read lazily and memory stays flat
+    # ordered -> results in the same order as tasks, otherwise in the order they finish
+    if max_pending is None:
+        max_pending = 2 * workers
+    tasks = iter(tasks)
+
+    # no with block -> leaving it would wait for all submitted tasks, even when the consumer stops early
+    pool = concurrent.futures.ProcessPoolExecutor(workers)
+    pending = collections.deque()
+    try:
+        for task in itertools.islice(tasks, max_pending):
+            pending.append(pool.submit(func, task))
+
+        while pending:
+            if ordered:
+                done = [pending.popleft()]
+            else:
+                finished, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                done = [f for f in pending if f in finished]
+                for f in done:
+                    pending.remove(f)
+
+            for f in done:
+                # refill the pool before handing the result out
+                for task in itertools.islice(tasks, 1):
+                    pending.append(pool.submit(func, task))
+                yield f.result()
+    finally:
+        if pending:
+            # consumer stopped early (or a task failed) -> nobody needs the other results
+            stop_pool(pool, pending)
+        else:
+            pool.shutdown()
+
+def stop_pool(pool, futures):
+    # cancel the futures that didn't start and stop the workers without finishing the tasks they already took
+    # (the executor hands tasks to the workers ahead of time, those can't be cancelled)
+    for f in futures:
+        f.cancel()
+    # the executor has no public way to reach its workers -> _processes (pid -> Process) is a CPython internal,
+    # without it the workers only stop after the tasks they took
+    processes = list((getattr(pool, "_processes", None) or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        process.join()
+
+def solve_chunk(task):
+    # worker function -> solves one chunk of (index, puzzle) pairs
+    # returns worker pid, time spent solving, list of (index, result line) and instrumentation counters of the chunk
+    # (None when count is False -> the solves aren't instrumented)
+    engine, chunk, count = task
+    solve_batch = get_solve_batch(engine)
+    start = time.perf_counter()
+    grids = [grid for i, grid in chunk]
+    if count:
+        with solver.collect_stats() as counters:
+            lines = solve_puzzles(grids, solve_batch)
+    else:
+        counters = None
+        lines = solve_puzzles(grids, solve_batch)
+    results = [(i, line) for (i, grid), line in zip(chunk, lines)]
+    return os.getpid(), time.perf_counter() - start, results, counters
+
+def solve_parallel(puzzles, engine="bits", workers=None, chunk_size=256, ordered=True, stats=None, counters=None):
+    # generator of (index, result line) for all puzzles, solved in a pool of worker processes
+    # puzzles are sent to the workers in chunks of chunk_size to keep the overhead of sending them low
+    # ordered -> results in input order, otherwise in the order the chunks finish (use index to match them)
+    # stats -> dict that gets filled with worker pid: [solved puzzles, seconds spent solving]
+    # counters -> dict where the instrumentation counters of all workers are summed (COUNTING_ENGINES only)
+    check_counters(engine, counters)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    tasks = ((engine, chunk, counters is not None) for chunk in chunked(enumerate(puzzles), chunk_size))
+
+    for pid, elapsed, results, chunk_counters in pool_imap(solve_chunk, tasks, workers, ordered):
+        if counters is not None:
+            solver.add_stats(counters, chunk_counters)
+        if stats is not None:
+            worker = stats.setdefault(pid, [0, 0.0])
+            worker[0] += len(results)
+            worker[1] += elapsed
+        for result in results:
+            yield result
+
+def print_stats(stats, wall_time, out=sys.stderr):
+    # puzzles/sec of each worker and of the whole run
+    total = sum(n for n, _ in stats.values())
+    for pid, (n, busy) in sorted(stats.items()):
+        rate = n / busy if busy else 0
+        out.write("worker %d: %d puzzles, %.1f puzzles/sec\n" % (pid, n, rate))
+    rate = total / wall_time if wall_time else 0
+    out.write("total: %d puzzles in %.2f s, %.1f puzzles/sec with %d workers\n" % (total, wall_time, rate, len(stats)))
+
+def print_counters(counters, out=sys.stderr):
+    # summed instrumentation counters of the run
+    for key in solver.STAT_COUNTERS:
+        out.write("%s: %d\n" % (key, counters[key]))
+    for key in solver.STAT_TIMES:
+        out.write("%s: %.3f s\n" % (key, counters[key]))
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Solve sudoku puzzles, one puzzle per line.")
+    parser.add_argument("input", nargs="?", default="-", help="input file (default: stdin)")
+    parser.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="bits", help="solver engine (default: bits)")
+    parser.add_argument("--workers", type=int, default=0, help="number of worker processes (default: solve in this process)")
+    parser.add_argument("--chunk-size", type=int, default=256, help="puzzles solved / sent to a worker at once (default: 256)")
+    parser.add_argument("--unordered", action="store_true", help="write results as they finish, prefixed with the input line index")
+    parser.add_argument("--stats", action="store_true", help="print puzzles/sec of each worker to stderr")
+    parser.add_argument("--counters", action="store_true",
+                        help="print summed search counters and phase times to stderr (not with the numpy engine)")
+    args = parser.parse_args(argv)
+    if args.counters and args.engine not in COUNTING_ENGINES:
+        parser.error("--counters can't be used with the %s engine" % args.engine)
+    if args.unordered and args.output.endswith(corpus.EXTENSION):
+        parser.error("--unordered can't be used with corpus output")
+    return args
+
+class CorpusOutput:
+    # output to a packed corpus -> every result line is stored with its puzzle (puzzles and results come in the same order)
+
+    def __init__(self, path):
+        self.writer = corpus.CorpusWriter(path, solutions=True, statuses=True)
+        self.puzzles = collections.deque()
+
+    def remember(self, puzzles):
+        # pass puzzles through and keep them until their result is written
+        for puzzle in puzzles:
+            self.puzzles.append(puzzle)
+            yield puzzle
+
+    def write(self, text):
+        line = text.rstrip("\n")
+        status = line_status(line)
+        puzzle = self.puzzles.popleft()
+        if status == INVALID:
+            # stored as an unreadable record (a blank puzzle would be read back as too few clues)
+            puzzle = None
+        self.writer.add(puzzle, line if status == solver.UNIQUE else None, status)
+
+    def close(self):
+        self.writer.close()
+
+def open_output(name):
+    if name == "-":
+        return sys.stdout
+    if name.endswith(corpus.EXTENSION):
+        return CorpusOutput(name)
+    return open(name, "w")
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    records = loader.open_records(args.input)
+    puzzles = read_puzzles(records)
+    f_out = open_output(args.output)
+    if isinstance(f_out, CorpusOutput):
+        puzzles = f_out.remember(puzzles)
+    start = time.perf_counter()
+    stats = {}
+    counters = solver.new_stats() if args.counters else None
+    try:
+        if args.workers > 0:
+            results = solve_parallel(puzzles, args.engine, args.workers, args.chunk_size,
+                                     not args.unordered, stats, counters)
+            for i, line in results:
+                if args.unordered:
+                    line = "%d\t%s" % (i, line)
+                f_out.write(line + "\n")
+        else:
+            for line in solve_lines(puzzles, args.engine, args.chunk_size, counters):
+                f_out.write(line + "\n")
+    except BrokenPipeError:
+        # output was closed early (for example piped to head) -> stop quietly
+        # stdout is pointed to devnull so that python doesn't fail again when flushing it at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    finally:
+        records.close()
+        if f_out is not sys.stdout:
+            f_out.close()
+
+    if args.stats and args.workers > 0:
+        print_stats(stats, time.perf_counter() - start)
+    if counters is not None:
+        print_counters(counters)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+# Benchmarks of the sudoku solver
+# usage: python bench.py [--backends] [puzzle files...]      (default: test_data/input*.txt)
+# compares the search modes and orderings of solver.py -> search time, search nodes, nodes/sec and peak memory of the search
+# with --backends compares solve_grid() of all solver backends on the same puzzles instead
+# with --suite runs solve(), generator(), get_pencilmarks() and check_user_solution() on the puzzle files and on
+# generated easy / hard / pathological / invalid corpora, records time, search nodes and peak memory of every call
+# usage: python bench.py --suite [--size N] [--seed S] [--json results.json] [--baseline old.json] [--threshold 0.25]
+# -> exits with 1 if a group of results got slower (or needs more nodes / memory) than the baseline by more than threshold
+
+import argparse
+import glob
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import generate
+import solver
+
+# directory of this file -> the test data is found from any working directory
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# default puzzle files
+TEST_FILES = sorted(glob.glob(os.path.join(ROOT, "test_data", "input*.txt")))
+
+# well known puzzles that need a lot of search (all have one solution)
+HARD_PUZZLES = [
+    "1.......2.9.4...5...6...7...5.9.3.......7.......85..4.7.....6...3...9.8...2.....1",
+    "8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4..",
+    "4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......",
+]
+
+# valid puzzles (one solution) that are pathological for this solver: minimal 17-clue puzzles and puzzles
+# where the fewest-candidates choice needs many search nodes
+PATHOLOGICAL_PUZZLES = [
+    ("17-clue:1", ".......1.4.........2...........5.4.7..8...3....1.9....3..4..2...5.1........8.6..."),
+    ("17-clue:2", ".......12....35......6...7.7.....3.....4..8..1...........12.....8.....4..5....6.."),
+    ("17-clue:3", "..............3.85..1.2.......5.7.....4...1...9.......5......73..2.1........4...9"),
+    ("norvig-hard", "..53.....8......2..7..1.5..4....53...1..7...6..32...8..6.5....9..4....3......97.."),
+    ("coly013", "...7..8......4..3......9..16..5......1..3..4...5..1..75..2..6...3..8..9...7.....2"),
+    ("discrepancy", "12.3....435....1....4........54..2..6...7.........8.9...31..5.......9.7.....6...8"),
+    ("champagne", "..1..4.......6.3.5...9.....8.....7.3.......285...7.6..3...8...6..92......4...1..."),
+]
+
+# operations of the suite
+OPERATIONS = ("solve", "get_pencilmarks", "check_user_solution", "generator")
+
+# measured values compared with the baseline (summed over a group, peak memory is the maximum)
+METRICS = ("time_ms", "nodes", "peak_kib")
+# differences smaller than this are never counted as a regression (timer noise of very short calls)
+NOISE = {"time_ms": 0.5, "nodes": 0, "peak_kib": 1.0}
+
+def display_path(path):
+    # path of a puzzle file as shown in the results (relative to this directory for the test data)
+    full = os.path.abspath(path)
+    if full.startswith(ROOT + os.sep):
+        return os.path.relpath(full, ROOT).replace(os.sep, "/")
+    return path
+
+def read_grids(path):
+    # all puzzles in a file (every 81 squares make one puzzle, so both one-line and pretty format work)
+    with open(path, "r") as f:
+        chars = [c for c in f.read() if c in solver.digits or c in "0."]
+    return ["".join(chars[i:i + 81]) for i in range(0, len(chars) - 80, 81)]
+
+def measure_search(values, mode, ordering):
+    # time and number of nodes of one search, peak memory (bytes) is measured in a second run
+    # because tracemalloc slows the search down
+    stats = {}
+    start = time.perf_counter()
+    solver.search(values, mode, stats, ordering)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    solver.search(values, mode, None, ordering)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return elapsed, stats["nodes"], peak
+
+def compare_modes(paths):
+    # print a table with every search mode and ordering on every puzzle that parses (invalid puzzles have no search)
+    variants = [(mode, ordering) for mode in solver.MODES for ordering in solver.ORDERINGS]
+    totals = dict((variant, [0.0, 0, 0]) for variant in variants)
+    print("%-28s %-18s %10s %8s %12s %12s" % ("puzzle", "mode", "time [ms]", "nodes", "nodes/sec", "peak [KiB]"))
+
+    for path in paths:
+        for n, grid in enumerate(read_grids(path)):
+            values = solver.grid_parser(grid)
+            if values is False or values == 2:
+                continue
+            name = "%s:%d" % (display_path(path), n + 1)
+            for variant in variants:
+                elapsed, nodes, peak = measure_search(values, *variant)
+                total = totals[variant]
+                total[0] += elapsed
+                total[1] += nodes
+                total[2] = max(total[2], peak)
+                print("%-28s %-18s %10.2f %8d %12.0f %12.1f"
+                      % (name, "/".join(variant), elapsed * 1000, nodes, nodes / elapsed, peak / 1024))
+
+    for variant, (elapsed, nodes, peak) in totals.items():
+        if elapsed:
+            print("%-28s %-18s %10.2f %8d %12.0f %12.1f"
+                  % ("total (max peak)", "/".join(variant), elapsed * 1000, nodes, nodes / elapsed, peak / 1024))
+
+def compare_backends(paths):
+    # print solve time of every backend on every puzzle (invalid puzzles too) and the total time of each backend
+    grids = [("%s:%d" % (display_path(path), n + 1), grid) for path in paths for n, grid in enumerate(read_grids(path))]
+    totals = dict((backend, 0.0) for backend in solver.BACKENDS)
+    print("%-28s %-8s %10s  %s" % ("puzzle", "backend", "time [ms]", "status"))
+
+    for name, grid in grids:
+        for backend in solver.BACKENDS:
+            result = solver.solve_grid(grid, backend=backend)
+            totals[backend] += result.elapsed
+            print("%-28s %-8s %10.2f  %s" % (name, backend, result.elapsed * 1000, result.status))
+
+    for backend, elapsed in totals.items():
+        rate = len(grids) / elapsed if elapsed else 0
+        print("%-28s %-8s %10.2f  %.1f puzzles/sec" % ("total", backend, elapsed * 1000, rate))
+
+def search_nodes(grid):
+    # number of search nodes solve() needs (0 if the puzzle doesn't get to the search)
+    values = solver.grid_parser(grid)
+    if values is False or values == 2:
+        return 0
+    stats = {}
+    solver.search(values, stats=stats)
+    return stats["nodes"]
+
+def measure(func, args, repeat):
+    # best time of repeat calls of func(*args) and peak memory (bytes) of one more call under tracemalloc
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, best, peak
+
+def make_corpora(size, seed):
+    # generated puzzle groups -> {tier: [(name, grid)]}
+    # easy = solved by propagation alone, hard = generated puzzles that need search and HARD_PUZZLES,
+    # pathological = PATHOLOGICAL_PUZZLES and random symmetry transforms of them (same puzzles to the eye,
+    # other square and digit order for the search) up to size puzzles,
+    # invalid = generated puzzles with clues removed (many solutions) or a clashing digit added (no solution)
+    rng = random.Random(seed)
+    easy = []
+    hard = [("hard:%d" % (n + 1), grid) for n, grid in enumerate(HARD_PUZZLES)]
+    # at most 20 puzzles per wanted puzzle are generated -> the corpus is always finished
+    for n, grid in enumerate(generate.generate_puzzles(20 * size, seed)):
+        if len(easy) >= size and len(hard) >= size + len(HARD_PUZZLES):
+            break
+        tier = easy if search_nodes(grid) <= 1 else hard
+        if len(tier) < size + (len(HARD_PUZZLES) if tier is hard else 0):
+            tier.append(("generated:%d" % (n + 1), grid))
+
+    pathological = []
+    for n in range(max(size, len(PATHOLOGICAL_PUZZLES))):
+        name, grid = PATHOLOGICAL_PUZZLES[n % len(PATHOLOGICAL_PUZZLES)]
+        if n < len(PATHOLOGICAL_PUZZLES):
+            pathological.append(("pathological:%s" % name, grid))
+        else:
+            grid = generate.shuffle_grid(grid, rng)
+            pathological.append(("pathological:%s~%d" % (name, n // len(PATHOLOGICAL_PUZZLES)), grid))
+
+    invalid = []
+    for n, (name, grid) in enumerate((easy + hard)[:size]):
+        clues = [i for i, c in enumerate(grid) if c in solver.digits]
+        chars = list(grid)
+        if n % 2 == 0:
+            for i in rng.sample(clues, min(len(clues) - 17, 6)):
+                chars[i] = "."
+            invalid.append(("%s-removed" % name, "".join(chars)))
+        else:
+            # digit of a peer put into an empty square of the same row
+            i = rng.choice([i for i in range(81) if chars[i] == "." and any(grid[j] in solver.digits for j in range(i - i % 9, i - i % 9 + 9))])
+            chars[i] = rng.choice([grid[j] for j in range(i - i % 9, i - i % 9 + 9) if grid[j] in solver.digits])
+            invalid.append(("%s-clash" % name, "".join(chars)))
+
+    return {"easy": easy, "hard": hard, "pathological": pathological, "invalid": invalid}
+
+def run_suite(paths, size=20, seed=0, repeat=3):
+    # list of result records (dicts) of all operations on all puzzle groups
+    groups = dict(("test_data/" + path.replace("\\", "/").split("/")[-1],
+                   [("%s:%d" % (display_path(path), n + 1), grid) for n, grid in enumerate(read_grids(path))]) for path in paths)
+    groups.update(make_corpora(size, seed))
+
+    records = []
+    for tier, grids in groups.items():
+        for name, grid in grids:
+            result, elapsed, peak = measure(solver.solve_grid, (grid,), repeat)
+            records.append({"op": "solve", "tier": tier, "name": name, "status": result.status,
+                            "time_ms": elapsed * 1000, "nodes": search_nodes(grid), "peak_kib": peak / 1024})
+
+            _, elapsed, peak = measure(solver.get_pencilmarks, (grid,), repeat)
+            records.append({"op": "get_pencilmarks", "tier": tier, "name": name,
+                            "time_ms": elapsed * 1000, "nodes": 0, "peak_kib": peak / 1024})
+
+            # user grid = the puzzle with the first empty square filled wrong
+            answer = solver.legacy_answer(result)
+            user_grid = grid.replace(".", "0")
+            if result.solution is not None and "0" in user_grid:
+                i = user_grid.index("0")
+                wrong = solver.digits[solver.digits.index(result.solution[solver.squares[i]]) - 1]
+                user_grid = user_grid[:i] + wrong + user_grid[i + 1:]
+            _, elapsed, peak = measure(solver.check_user_solution, (user_grid, answer), repeat)
+            records.append({"op": "check_user_solution", "tier": tier, "name": name,
+                            "time_ms": elapsed * 1000, "nodes": 0, "peak_kib": peak / 1024})
+
+    for n in range(size):
+        _, elapsed, peak = measure(solver.generator, ("strings", "%s:%d" % (seed, n)), 1)
+        records.append({"op": "generator", "tier": "generated", "name": "seed %s:%d" % (seed, n),
+                        "time_ms": elapsed * 1000, "nodes": 0, "peak_kib": peak / 1024})
+    return records
+
+def summarize(records):
+    # totals of every operation and tier -> {"op/tier": {"count", "time_ms", "nodes", "peak_kib"}}
+    summary = {}
+    for record in records:
+        group = summary.setdefault("%s/%s" % (record["op"], record["tier"]),
+                                   {"count": 0, "time_ms": 0.0, "nodes": 0, "peak_kib": 0.0})
+        group["count"] += 1
+        group["time_ms"] += record["time_ms"]
+        group["nodes"] += record["nodes"]
+        group["peak_kib"] = max(group["peak_kib"], record["peak_kib"])
+    return summary
+
+def find_regressions(summary, baseline, threshold):
+    # list of (group, metric, baseline value, new value) that grew by more than threshold (0.25 = 25 %)
+    regressions = []
+    for key, group in sorted(summary.items()):
+        old = baseline.get(key)
+        if old is None or old["count"] != group["count"]:
+            # new group or different corpus -> nothing to compare
+            continue
+        for metric in METRICS:
+            if group[metric] > old[metric] * (1 + threshold) + NOISE[metric]:
+                regressions.append((key, metric, old[metric], group[metric]))
+    return regressions
+
+def suite(args):
+    records = run_suite(args.files or TEST_FILES, args.size, args.seed, args.repeat)
+    summary = summarize(records)
+
+    print("%-40s %6s %12s %8s %12s" % ("group", "count", "time [ms]", "nodes", "peak [KiB]"))
+    for key, group in sorted(summary.items()):
+        print("%-40s %6d %12.2f %8d %12.1f" % (key, group["count"], group["time_ms"], group["nodes"], group["peak_kib"]))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"python": platform.python_version(), "platform": platform.platform(), "size": args.size,
+                       "seed": args.seed, "summary": summary, "results": records}, f, indent=1)
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)["summary"]
+        regressions = find_regressions(summary, baseline, args.threshold)
+        for key, metric, old, new in regressions:
+            print("REGRESSION %s %s: %.2f -> %.2f (+%.0f %%)" % (key, metric, old, new, (new / old - 1) * 100 if old else 100))
+        if regressions:
+            return 1
+        print("no regressions against %s (threshold %.0f %%)" % (args.baseline, args.threshold * 100))
+    return 0
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Benchmark the sudoku solver.")
+    parser.add_argument("files", nargs="*", help="puzzle files (default: test_data/input*.txt)")
+    parser.add_argument("--backends", action="store_true", help="compare solver backends instead of search modes")
+    parser.add_argument("--suite", action="store_true", help="run the benchmark suite with regression check")
+    parser.add_argument("--size", type=int, default=20, help="puzzles in each generated tier of the suite (default: 20)")
+    parser.add_argument("--seed", default="0", help="seed of the generated tiers (default: 0)")
+    parser.add_argument("--repeat", type=int, default=3, help="calls timed for each puzzle, the best counts (default: 3)")
+    parser.add_argument("--json", help="write suite results to this file")
+    parser.add_argument("--baseline", help="suite results of an earlier run to compare with")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed growth against the baseline (default: 0.25)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.suite:
+        return suite(args)
+    if args.backends:
+        compare_backends(args.files or TEST_FILES)
+    else:
+        compare_modes(args.files or TEST_FILES)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
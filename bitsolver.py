@@ -0,0 +1,166 @@
+# Bitmask based sudoku solver engine
+# same contracts as grid_parser(), search() and solve() in solver.py, but the possible values of each square
+# are stored as a 9-bit integer (bit i set = digit i+1 possible) in a flat list of 81 items
+# the propagation and search are the N x N engine of board.py on the 9x9 topology (one implementation to keep up
+# to date), this module adds the solver.py contracts, instrumentation and the 9x9 tables used by other modules
+
+import itertools
+import time
+
+# square names are used to give the solution in the same dict format as solver.py
+from solver import (digits, squares, SolveResult, UNIQUE, BUDGET_EXCEEDED, BudgetExceeded, result_status,
+                    legacy_answer, start_stats, report_stats)
+import board
+from board import get_topology
+
+# all digits possible
+ALL = 0x1FF
+
+# bit of each digit and digit of each single bit
+BIT = dict((d, 1 << i) for i, d in enumerate(digits))
+DIGIT = dict((1 << i, d) for i, d in enumerate(digits))
+
+# number of possible values for every 9-bit value
+COUNT = [bin(v).count("1") for v in range(ALL + 1)]
+
+# units and peers come from the 9x9 board topology in board.py (the same one the N x N solver uses)
+_topology = get_topology(9)
+
+# list of all units (rows, cols, 3x3 squares) as tuples of square indexes
+unitlist = _topology.unitlist
+
+# for each square index the tuple of units that contain it
+units = _topology.units
+
+# for each square index the tuple of its 20 peers
+peers = _topology.peers
+
+def grid_chars(grid):
+    # same as grid_values() in solver.py -> keep digits and blank spaces (0, .), ignore all other characters
+    return [c for c in grid if c in digits or c in "0."][:81]
+
+def grid_parser(grid, stats=None):
+    # parses an input grid (assigns all input digits), returns list of candidate bits, False or 2
+    # stats = dict where parse and propagate times are added, or None
+    values = parse_values(grid, stats)
+    if values is False:
+        return False
+
+    # counts number of input digits and tracks used digits (as bits)
+    input_d_count = 0
+    used_digs = 0
+    for d in grid_chars(grid):
+        if d in digits:
+            used_digs |= BIT[d]
+            input_d_count += 1
+
+    # at least 17 input digits and 8 different digits needed for an unique solution
+    if input_d_count < 17 or COUNT[used_digs] < 8:
+        return 2
+
+    return values
+
+def parse_values(grid, stats=None):
+    # assigns all input digits without checking their count, returns list of candidate bits or False
+    if stats is not None:
+        start = time.perf_counter()
+    values = [ALL] * 81
+    chars = grid_chars(grid)
+    if stats is not None:
+        propagate_start = time.perf_counter()
+        stats["parse_time"] += propagate_start - start
+
+    for s, d in enumerate(chars):
+        if d in digits:
+            if not assign(values, s, BIT[d]):
+                # we can't assign d to square s -> bad sudoku input puzzle
+                values = False
+                break
+
+    if stats is not None:
+        stats["propagate_time"] += time.perf_counter() - propagate_start
+    return values
+
+def assign(values, s, d):
+    # set square s to digit bit d -> eliminate all other possible values, returns values or False
+    return board.assign(_topology, values, s, d)
+
+def eliminate(values, s, d):
+    # digit bit d is eliminated from possible values of square s, propagate when values or places <= 1
+    return board.eliminate(_topology, values, s, d)
+
+def search(values, budget=None, stats=None):
+    # depth-first search from parsed values, returns solved values, False (no solution) or 2 (multiple solutions)
+    # budget = solver.Budget checked at every search node (raises BudgetExceeded), or None
+    # stats = dict where search nodes, backtracks and max depth are added, or None
+    if values is False:
+        return False
+    elif values == 2:
+        return 2
+
+    # uniqueness check = search for at most 2 solutions
+    found = list(itertools.islice(_search(values, budget, stats), 2))
+    if len(found) > 1:
+        return 2
+    elif found:
+        return found[0]
+    else:
+        return False
+
+def _search(values, budget=None, stats=None):
+    # generator of all solutions (solved values) in the order the depth-first search finds them
+    return board._search(_topology, values, budget, stats)
+
+def to_solution(values):
+    # solved values -> solution dict (same format as solver.py)
+    return dict(zip(squares, (DIGIT[v] for v in values)))
+
+def iter_solutions(grid, budget=None):
+    # generator of all solutions (solution dicts) of grid, found one by one when asked for
+    # works for any number of input digits (no minimum of 17 like in solve())
+    values = parse_values(grid)
+    if values is not False:
+        for solution in _search(values, budget):
+            yield to_solution(solution)
+
+def count_solutions(grid, limit=None, budget=None):
+    # number of solutions of grid, the search stops once limit solutions were found
+    count = 0
+    values = parse_values(grid)
+    if values is not False:
+        for solution in itertools.islice(_search(values, budget), limit):
+            count += 1
+    return count
+
+def solve_grid(grid, budget=None, instrument=False):
+    # solve sudoku, returns SolveResult with solution dict (same format as solver.py)
+    # budget = solver.Budget -> status BUDGET_EXCEEDED with the nodes and time used (result.stats) when it runs out
+    # instrument = search nodes, backtracks, max depth and phase times in result.stats (like solver.solve_grid(),
+    # also inside a solver.collect_stats() block), assign / eliminate calls aren't counted in this engine
+    stats = start_stats(instrument)
+    start = time.perf_counter()
+    values = grid_parser(grid, stats)
+    search_start = time.perf_counter()
+    try:
+        answer = search(values, budget, stats)
+        status = result_status(values, answer)
+    except BudgetExceeded as e:
+        answer = None
+        status = BUDGET_EXCEEDED
+        if stats is None:
+            # not instrumented -> the budget's own node count (search time is added below)
+            stats = e.stats
+            stats["search_time"] = 0.0
+    end = time.perf_counter()
+
+    if stats is not None:
+        stats["search_time"] += end - search_start
+        report_stats(stats)
+    solution = None
+    if status == UNIQUE:
+        solution = to_solution(answer)
+    return SolveResult(status, solution, end - start, stats)
+
+def solve(grid, budget=None):
+    # old interface of solve_grid() -> solution dict, False or 2 (raises BudgetExceeded when budget runs out)
+    return legacy_answer(solve_grid(grid, budget))
@@ -0,0 +1,323 @@
+# Sudoku boards of any size N x N with N = B * B (4x4, 9x9, 16x16, 25x25)
+# Topology = square indexes of all units and peers of one board size, built only once for each size (get_topology())
+# the solver keeps the possible values of each square as an N-bit integer (bit i set = symbol i possible)
+# in a flat list of N * N items, so copying and searching stays cheap on big boards
+# bitsolver.py is this engine on the 9x9 topology (same assign(), eliminate() and _search())
+# symbols are 1-9 and then letters (16x16 uses 1-9 A-G, 25x25 uses 1-9 A-P), blanks are 0 or .
+
+import functools
+import itertools
+import math
+import random
+import time
+
+from solver import (SolveResult, UNIQUE, MULTIPLE, NONE, TOO_FEW_CLUES, BUDGET_EXCEEDED, Budget, BudgetExceeded,
+                    legacy_answer)
+
+# symbols of the biggest supported board, smaller boards use the first N of them
+SYMBOLS = "123456789ABCDEFGHIJKLMNOP"
+BLANKS = "0."
+
+# board sizes that can be used
+SIZES = (4, 9, 16, 25)
+
+# names of rows and columns (square names are row + column like "A1" in solver.py, "P16" on 16x16)
+ROW_NAMES = "ABCDEFGHIJKLMNOPQRSTUVWXY"
+
+# known minimum of input digits for an unique solution (other sizes have no minimum, only the symbol count check)
+MIN_CLUES = {4: 4, 9: 17}
+
+class Topology:
+    # units and peers of a board of size x size squares as tuples of square indexes
+
+    def __init__(self, size):
+        box = math.isqrt(size)
+        if size not in SIZES:
+            raise ValueError("unsupported board size: %r" % (size,))
+        self.size = size
+        self.box = box
+        self.cells = size * size
+
+        # symbols and their bits
+        self.symbols = SYMBOLS[:size]
+        self.all = (1 << size) - 1
+        self.bit = dict((d, 1 << i) for i, d in enumerate(self.symbols))
+        self.symbol = dict((1 << i, d) for i, d in enumerate(self.symbols))
+        self.squares = [r + str(c + 1) for r in ROW_NAMES[:size] for c in range(size)]
+
+        # same order of units as bitsolver.py (columns, rows, boxes) -> same search order on 9x9
+        n = size
+        bands = [range(b * box, b * box + box) for b in range(box)]
+        self.unitlist = ([tuple(r * n + c for r in range(n)) for c in range(n)] +        # columns
+                         [tuple(r * n + c for c in range(n)) for r in range(n)] +        # rows
+                         [tuple(r * n + c for r in rs for c in cs) for rs in bands for cs in bands])        # boxes
+        self.units = [tuple(u for u in self.unitlist if s in u) for s in range(self.cells)]
+        self.peers = [tuple(sorted(set(sum(self.units[s], ())) - set([s]))) for s in range(self.cells)]
+
+@functools.lru_cache(maxsize=None)
+def get_topology(size=9):
+    # topology of the board size, built on first use
+    return Topology(size)
+
+def infer_size(grid):
+    # board size from the number of squares in grid (16 -> 4x4, 81 -> 9x9, 256 -> 16x16, 625 -> 25x25)
+    count = sum(1 for c in grid if c in SYMBOLS or c in BLANKS)
+    for size in SIZES:
+        if count == size * size:
+            return size
+    raise ValueError("grid with %d squares isn't a supported board" % count)
+
+def _topology(grid, size):
+    return get_topology(infer_size(grid) if size is None else size)
+
+def grid_chars(topo, grid):
+    # symbols and blanks of grid, all other characters are ignored
+    return [c for c in grid if c in topo.bit or c in BLANKS][:topo.cells]
+
+def parse_values(topo, grid):
+    # assigns all input symbols without checking their count, returns list of candidate bits or False
+    values = [topo.all] * topo.cells
+    for s, d in enumerate(grid_chars(topo, grid)):
+        if d in topo.bit:
+            if not assign(topo, values, s, topo.bit[d]):
+                # we can't assign d to square s -> bad sudoku input puzzle
+                return False
+    return values
+
+def enough_clues(topo, grid):
+    # at least size - 1 different symbols on every size (with fewer, two symbols could be swapped in any solution)
+    # and the minimum number of clues of MIN_CLUES where it is known (17 on 9x9 = solver.enough_clues(), 4 on 4x4)
+    chars = [d for d in grid_chars(topo, grid) if d in topo.bit]
+    return len(chars) >= MIN_CLUES.get(topo.size, 0) and len(set(chars)) >= topo.size - 1
+
+def grid_parser(topo, grid):
+    # parses an input grid, returns list of candidate bits, False or 2 (too few input symbols)
+    values = parse_values(topo, grid)
+    if values is False:
+        return False
+    if not enough_clues(topo, grid):
+        return 2
+    return values
+
+def assign(topo, values, s, d):
+    # set square s to symbol bit d -> eliminate all other possible values
+    other_values = values[s] & ~d
+    while other_values:
+        d2 = other_values & -other_values
+        other_values ^= d2
+        if not eliminate(topo, values, s, d2):
+            return False
+    return values
+
+def eliminate(topo, values, s, d):
+    # symbol bit d is eliminated from possible values of square s, propagate when values or places <= 1
+    if not values[s] & d:
+        return values
+
+    v = values[s] = values[s] & ~d
+
+    if not v:
+        # contradiction -> last possible value was removed
+        return False
+    elif not v & (v - 1):
+        # square s is reduced to one value -> eliminate it from peers
+        for s2 in topo.peers[s]:
+            if not eliminate(topo, values, s2, v):
+                return False
+
+    for u in topo.units[s]:
+        # count places in unit where symbol d is still possible (stop counting after two)
+        n = 0
+        for s2 in u:
+            if values[s2] & d:
+                n += 1
+                if n > 1:
+                    break
+                place = s2
+        if n == 0:
+            # contradiction -> no place for this value
+            return False
+        elif n == 1:
+            if not assign(topo, values, place, d):
+                return False
+
+    return values
+
+def _search(topo, values, budget=None, stats=None, depth=1):
+    # generator of all solutions (solved values), square with the fewest possible values first
+    # budget = solver.Budget checked at every search node (raises BudgetExceeded), or None
+    # stats = dict where search nodes, backtracks and max depth are added, or None
+    if budget is not None:
+        budget.charge()
+    if stats is not None:
+        stats["nodes"] += 1
+        if depth > stats["max_depth"]:
+            stats["max_depth"] = depth
+
+    s = -1
+    n = topo.size + 1
+    for i, v in enumerate(values):
+        c = v.bit_count()
+        if 1 < c < n:
+            n = c
+            s = i
+            if c == 2:
+                break
+
+    if s == -1:
+        yield values
+        return
+
+    v = values[s]
+    while v:
+        d = v & -v
+        v ^= d
+        new_values = assign(topo, values[:], s, d)
+        if new_values:
+            yield from _search(topo, new_values, budget, stats, depth + 1)
+        elif stats is not None:
+            stats["backtracks"] += 1
+
+def search(topo, values, budget=None):
+    # depth-first search from parsed values, returns solved values, False (no solution) or 2 (multiple solutions)
+    # budget = solver.Budget checked at every search node (raises BudgetExceeded), or None
+    if values is False:
+        return False
+    elif values == 2:
+        return 2
+    found = list(itertools.islice(_search(topo, values, budget), 2))
+    if len(found) > 1:
+        return 2
+    elif found:
+        return found[0]
+    return False
+
+def to_string(topo, values):
+    # solved values -> grid string
+    return "".join(topo.symbol[v] for v in values)
+
+def to_solution(topo, values):
+    # solved values -> solution dict (square name -> symbol, same format as solver.py on 9x9)
+    return dict(zip(topo.squares, (topo.symbol[v] for v in values)))
+
+def iter_solutions(grid, size=None, budget=None):
+    # generator of all solutions (solution dicts) of grid, size is found from the grid if not given
+    # budget = solver.Budget of the whole iteration (raises BudgetExceeded when it runs out)
+    topo = _topology(grid, size)
+    values = parse_values(topo, grid)
+    if values is not False:
+        for solution in _search(topo, values, budget):
+            yield to_solution(topo, solution)
+
+def count_solutions(grid, limit=None, size=None, budget=None):
+    # number of solutions of grid, the search stops once limit solutions were found
+    count = 0
+    for solution in itertools.islice(iter_solutions(grid, size, budget), limit):
+        count += 1
+    return count
+
+def solve_grid(grid, size=None, budget=None):
+    # solve sudoku of any supported size, returns SolveResult (same statuses as solver.solve_grid())
+    # budget = solver.Budget -> status BUDGET_EXCEEDED with the nodes and time used (result.stats) when it runs out
+    topo = _topology(grid, size)
+    start = time.perf_counter()
+    values = grid_parser(topo, grid)
+    try:
+        answer = search(topo, values, budget)
+    except BudgetExceeded as e:
+        return SolveResult(BUDGET_EXCEEDED, None, time.perf_counter() - start, e.stats)
+    if values is False or answer is False:
+        status = NONE
+    elif values == 2:
+        status = TOO_FEW_CLUES
+    elif answer == 2:
+        status = MULTIPLE
+    else:
+        status = UNIQUE
+    solution = to_solution(topo, answer) if status == UNIQUE else None
+    return SolveResult(status, solution, time.perf_counter() - start)
+
+def solve(grid, size=None, budget=None):
+    # old interface of solve_grid() -> solution dict, False or 2 (raises BudgetExceeded when budget runs out)
+    return legacy_answer(solve_grid(grid, size, budget))
+
+def complete_grid(size=9, rng=None):
+    # random complete grid -> pattern grid shuffled by random symmetries (band / stack, row / column orders,
+    # transposition and relabeling), big boards don't need any search this way
+    topo = get_topology(size)
+    if not isinstance(rng, random.Random):
+        rng = random.Random(rng)
+    box, n = topo.box, size
+
+    def order():
+        bands = list(range(box))
+        rng.shuffle(bands)
+        result = []
+        for b in bands:
+            inner = list(range(box))
+            rng.shuffle(inner)
+            result.extend(b * box + i for i in inner)
+        return result
+
+    rows, cols = order(), order()
+    if rng.random() < 0.5:
+        rows, cols = cols, rows
+    symbols = list(topo.symbols)
+    rng.shuffle(symbols)
+    # base pattern: every row is the row above shifted by one box (or by one at the start of a band)
+    return "".join(symbols[(box * (r % box) + r // box + c) % n] for r in rows for c in cols)
+
+def _check_budget(check_nodes, budget):
+    # Budget of one uniqueness check of puzzle_generator() -> check_nodes search nodes
+    # and the deadline / cancel token of the generator's budget
+    if budget is None:
+        return Budget(check_nodes)
+    return Budget(check_nodes, deadline=budget.deadline, cancel=budget.cancel)
+
+def puzzle_generator(complete, size=None, rng=None, check_nodes=200, budget=None):
+    # remove symbols from a complete grid in random order while the puzzle keeps its unique solution
+    # (a symbol stays if the puzzle without it has a solution with another symbol in its square)
+    # check_nodes = search nodes for each of these checks, a symbol whose check runs out of them stays too
+    # -> the puzzle is always unique, but on big boards it can keep a few symbols that aren't needed
+    # budget = solver.Budget of the whole generation, the nodes of all checks are charged to it
+    # (raises BudgetExceeded when it runs out)
+    topo = _topology(complete, size)
+    if not isinstance(rng, random.Random):
+        rng = random.Random(rng)
+    grid = grid_chars(topo, complete)
+    order = list(range(topo.cells))
+    rng.shuffle(order)
+
+    for s in order:
+        if budget is not None:
+            # parsing a big board takes longer than many search nodes -> deadline and cancellation at every square
+            budget.check()
+        d = grid[s]
+        grid[s] = "."
+        values = parse_values(topo, grid)
+        if values and eliminate(topo, values, s, topo.bit[d]):
+            check = _check_budget(check_nodes, budget)
+            try:
+                other = next(_search(topo, values, check), None) is not None
+            except BudgetExceeded:
+                if check.reason != "nodes":
+                    # deadline or cancellation of the whole generation
+                    budget.reason = check.reason
+                    raise BudgetExceeded(budget.partial_stats())
+                other = True
+            if other:
+                grid[s] = d
+            if budget is not None:
+                budget.nodes += check.nodes
+                if budget.max_nodes is not None and budget.nodes > budget.max_nodes:
+                    budget.nodes = budget.max_nodes
+                    budget.reason = "nodes"
+                    raise BudgetExceeded(budget.partial_stats())
+    return "".join(grid)
+
+def generator(size=9, rng=None, check_nodes=200, budget=None):
+    # random puzzle with an unique solution on a board of size x size squares
+    # budget = solver.Budget of the whole generation (raises BudgetExceeded when it runs out)
+    if not isinstance(rng, random.Random):
+        rng = random.Random(rng)
+    return puzzle_generator(complete_grid(size, rng), size, rng, check_nodes, budget)
@@ -0,0 +1,190 @@
+# Candidate (pencilmark) grid that is kept up to date edit by edit
+# for every square and digit it counts the peers holding that digit -> candidates of an empty square are the digits
+# none of its peers holds (the same rule as solver.get_pencilmarks()), so placing or deleting a digit only
+# changes the counts of the 20 peers of that square instead of computing the whole grid again
+# every edit is recorded -> edits can be undone and redone
+# strong=True also applies naked and hidden singles to the candidates until nothing changes
+# usage: python candidates.py [puzzles file, default stdin] [-o output] [--strong]
+#        -> one line per puzzle with the candidates of all 81 squares (given digits as themselves)
+#        (any format loader.py reads, records that can't be read are reported on stderr)
+
+import argparse
+import os
+import sys
+
+from solver import digits, squares
+from board import get_topology
+
+# units and peers as tuples of square indexes (same tables as bitsolver.py)
+_topology = get_topology(9)
+unitlist = _topology.unitlist
+peers = _topology.peers
+
+ALL = 0x1FF
+
+# digit (1-9) -> its bit, square name -> its index
+BIT = [0] + [1 << i for i in range(9)]
+INDEX = dict((s, i) for i, s in enumerate(squares))
+
+# candidate string of every 9-bit value
+TEXT = ["".join(d for i, d in enumerate(digits) if v >> i & 1) for v in range(ALL + 1)]
+
+def _square(s):
+    # square index from index or square name ("A1")
+    return INDEX[s] if isinstance(s, str) else s
+
+def _digit(d):
+    # digit 0-9 from int or character (0 and . = empty)
+    if isinstance(d, str):
+        return int(d) if d in digits else 0
+    return d
+
+class CandidateGrid:
+    # grid of placed digits with candidates of the empty squares
+    # squares can be given as index (0-80) or name ("A1"), digits as int (0 = empty) or character
+
+    def __init__(self, grid=""):
+        self.values = [0] * 81                          # digit of every square, 0 = empty
+        self.seen = [[0] * 10 for _ in range(81)]       # seen[s][d] = number of peers of s holding digit d
+        self.undo_stack = []                            # edits as (square, old digit, new digit)
+        self.redo_stack = []
+        for s, c in enumerate(c for c in grid if c in digits or c in "0."):
+            if s == 81:
+                break
+            if c in digits:
+                self._place(s, int(c))
+
+    def _place(self, s, d):
+        # put digit d (0 = empty) to square s and update the counts of its peers
+        old = self.values[s]
+        if old:
+            for p in peers[s]:
+                self.seen[p][old] -= 1
+        if d:
+            for p in peers[s]:
+                self.seen[p][d] += 1
+        self.values[s] = d
+
+    def set(self, s, d):
+        # user edit -> records it for undo, returns False if the square already had this digit
+        s, d = _square(s), _digit(d)
+        old = self.values[s]
+        if old == d:
+            return False
+        self._place(s, d)
+        self.undo_stack.append((s, old, d))
+        self.redo_stack = []
+        return True
+
+    def clear(self, s):
+        return self.set(s, 0)
+
+    def undo(self):
+        # undo the last edit, returns index of the changed square (None if there is nothing to undo)
+        if not self.undo_stack:
+            return None
+        s, old, new = self.undo_stack.pop()
+        self._place(s, old)
+        self.redo_stack.append((s, old, new))
+        return s
+
+    def redo(self):
+        # redo the last undone edit, returns index of the changed square (None if there is nothing to redo)
+        if not self.redo_stack:
+            return None
+        s, old, new = self.redo_stack.pop()
+        self._place(s, new)
+        self.undo_stack.append((s, old, new))
+        return s
+
+    def mask(self, s):
+        # candidates of square s as 9-bit value (bit of the digit for filled squares)
+        s = _square(s)
+        if self.values[s]:
+            return BIT[self.values[s]]
+        seen = self.seen[s]
+        return sum(BIT[d] for d in range(1, 10) if not seen[d])
+
+    def candidates(self, s):
+        # candidate digits of square s as string (the digit itself for filled squares)
+        return TEXT[self.mask(s)]
+
+    def conflicts(self):
+        # indexes of squares whose digit is held by one of their peers too
+        return [s for s, d in enumerate(self.values) if d and self.seen[s][d]]
+
+    def masks(self, strong=False):
+        # candidates of all squares as list of 9-bit values
+        values = [self.mask(s) for s in range(81)]
+        if strong:
+            _propagate(values, [s for s in range(81) if not self.values[s]])
+        return values
+
+    def marks(self, strong=False):
+        # same dict as solver.get_pencilmarks() -> square name -> candidates, empty string for filled squares
+        return dict((s, "" if v else TEXT[m]) for s, v, m in zip(squares, self.values, self.masks(strong)))
+
+    def to_string(self):
+        return "".join(str(d) if d else "." for d in self.values)
+
+def _propagate(values, empty):
+    # naked singles (the only candidate of a square is removed from its peers) and hidden singles
+    # (a digit with one place left in a unit is the only candidate of that square) on the empty squares until
+    # nothing changes, squares without any candidate are left empty (board can't be solved)
+    empty = set(empty)
+    done = set()
+    changed = True
+    while changed:
+        changed = False
+        for s in empty:
+            v = values[s]
+            if s not in done and v and not v & (v - 1):
+                done.add(s)
+                for p in peers[s]:
+                    if p in empty and values[p] & v:
+                        values[p] &= ~v
+                        changed = True
+        for u in unitlist:
+            for i in range(9):
+                bit = 1 << i
+                places = [s for s in u if values[s] & bit]
+                if len(places) == 1 and places[0] in empty and values[places[0]] != bit:
+                    values[places[0]] = bit
+                    changed = True
+    return values
+
+def iter_candidates(puzzles, strong=False):
+    # candidates of many puzzles (grid strings) -> list of 81 candidate strings for each puzzle
+    for puzzle in puzzles:
+        yield [TEXT[m] for m in CandidateGrid(puzzle).masks(strong)]
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Print candidates of every square of sudoku puzzles.")
+    parser.add_argument("input", nargs="?", default="-", help="file with one puzzle per line or corpus (default: stdin)")
+    parser.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+    parser.add_argument("--strong", action="store_true", help="apply naked and hidden singles to the candidates")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    # the input is read by loader.py (imported here -> the GUI doesn't need it)
+    import loader
+
+    args = parse_args(argv)
+    records = loader.open_records(args.input)
+    f_out = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        for record in records:
+            if record.error is not None:
+                sys.stderr.write("line %d: %s\n" % (record.line, record.error))
+                continue
+            cands = [TEXT[m] for m in CandidateGrid(record.puzzle).masks(args.strong)]
+            f_out.write(" ".join(cands) + "\n")
+    except BrokenPipeError:
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    finally:
+        records.close()
+        if f_out is not sys.stdout:
+            f_out.close()
+
+if __name__ == "__main__":
+    main()
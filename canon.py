@@ -0,0 +1,257 @@
+# Canonical form of sudoku puzzles and a solution cache keyed by it
+# two puzzles are the same up to symmetry if one can be turned into the other by relabeling digits,
+# reordering bands / stacks, rows inside bands / columns inside stacks and transposing
+# -> both have the same canonical form = lexicographically smallest grid string of all their transforms
+# (blank squares count as "0", so they come before the digits)
+# transforms use the same (rows, cols, transpose, relabel) tuples as generate.py
+
+import collections
+import threading
+import time
+
+from generate import PERMS3, transform_indexes
+from solver import digits, squares, grid_values, solve_grid, SolveResult, legacy_answer
+
+# cache statistics (same idea as functools.lru_cache().cache_info())
+CacheInfo = collections.namedtuple("CacheInfo", ["hits", "misses", "evictions", "maxsize", "currsize"])
+
+def _rows(grid):
+    # grid string with "0" for blanks -> rows of the grid and rows of the transposed grid
+    rows = [grid[r * 9:r * 9 + 9] for r in range(9)]
+    return rows, ["".join(row[c] for row in rows) for c in range(9)]
+
+def _relabel(row, cols, mapping, label):
+    # row read in order cols with digits relabeled in the order they first appear
+    # mapping (old digit -> new digit) and next new label are extended in a copy only when a new digit shows up
+    out = []
+    copied = False
+    for c in cols:
+        ch = row[c]
+        if ch != "0":
+            new = mapping.get(ch)
+            if new is None:
+                if not copied:
+                    mapping = dict(mapping)
+                    copied = True
+                new = mapping[ch] = digits[label]
+                label += 1
+            ch = new
+        out.append(ch)
+    return "".join(out), mapping, label
+
+def _leading_blanks(row):
+    # most blanks the row can start with when its columns are reordered
+    clues = sorted(sum(1 for c in row[i:i + 3] if c != "0") for i in (0, 3, 6))
+    lead = 0
+    for n in clues:
+        lead += 3 - n
+        if n:
+            break
+    return lead
+
+def _keep_best(expansions):
+    # only the expansions with the smallest string (all of them if there are ties)
+    best = min(e[0] for e in expansions)
+    return [e[1:] for e in expansions if e[0] == best], best
+
+def _best_orders(row, mapping, label, max_states=None):
+    # column orders (stack by stack) that give the smallest relabeled row
+    # -> list of (row text, cols, mapping, next label), all with the same text
+    # None when more than max_states partial orders have to be compared
+    orders = [("", [], mapping, label)]
+    for _ in range(3):
+        expansions = []
+        for text, cols, mapping, label in orders:
+            for stack in range(3):
+                if stack * 3 in cols:
+                    continue
+                for perm in PERMS3:
+                    part = [stack * 3 + i for i in perm]
+                    part_text, new_mapping, new_label = _relabel(row, part, mapping, label)
+                    expansions.append((part_text, text + part_text, cols + part, new_mapping, new_label))
+            if max_states is not None and len(expansions) > max_states:
+                return None
+        orders = _keep_best(expansions)[0]
+    return orders
+
+def canonical_form(grid, max_states=None):
+    # canonical form of grid (any string grid_values() accepts) -> (canonical grid string, transform)
+    # apply_transform(grid, transform) gives the canonical grid
+    # the search builds the smallest grid row by row and keeps every partial transform that ties,
+    # the order of columns is chosen at the first row with a digit (blank rows look the same in any order)
+    # symmetric or sparse grids tie a lot (seconds for a few filled rows) -> returns None when more than
+    # max_states partial transforms have to be compared for one row (None = no limit)
+    values = grid_values(grid)
+    grid = "".join(values[s] if values[s] in digits else "0" for s in squares)
+    grids = _rows(grid)
+
+    # state = (transpose, rows used, cols or None if not chosen yet, mapping, next label)
+    states = [(t, [], None, {}, 0) for t in (False, True)]
+    result = []
+    for n in range(9):
+        # next row -> any row first, then the rest of the band, then the first row of another band
+        options = []
+        for state in states:
+            rows = state[1]
+            if n == 0:
+                options.extend((state, r) for r in range(9))
+            elif n % 3:
+                band = rows[-1] // 3
+                options.extend((state, r) for r in range(band * 3, band * 3 + 3) if r not in rows)
+            else:
+                options.extend((state, r) for r in range(9) if r // 3 not in [x // 3 for x in rows])
+
+        # columns not chosen yet -> only rows that can start with the most blanks can win
+        # (blank stacks first, then the blanks of the emptiest stack)
+        if states[0][2] is None:
+            lead = [_leading_blanks(grids[state[0]][r]) for state, r in options]
+            most = max(lead)
+            options = [option for option, k in zip(options, lead) if k == most]
+
+        expansions = []
+        for (t, rows, cols, mapping, label), r in options:
+            row = grids[t][r]
+            if cols is not None:
+                text, new_mapping, new_label = _relabel(row, cols, mapping, label)
+                expansions.append((text, t, rows + [r], cols, new_mapping, new_label))
+            elif row == "000000000":
+                expansions.append((row, t, rows + [r], None, mapping, label))
+            else:
+                orders = _best_orders(row, mapping, label, max_states)
+                if orders is None:
+                    return None
+                for text, new_cols, new_mapping, new_label in orders:
+                    expansions.append((text, t, rows + [r], new_cols, new_mapping, new_label))
+            if max_states is not None and len(expansions) > max_states:
+                return None
+        states, best = _keep_best(expansions)
+        result.append(best)
+
+    # any of the tied transforms gives the same grid, digits missing in the puzzle get the unused labels
+    t, rows, cols, mapping, label = states[0]
+    if cols is None:
+        cols = list(range(9))
+    relabel = dict(mapping)
+    unused = iter(digits[label:])
+    for d in digits:
+        if d not in relabel:
+            relabel[d] = next(unused)
+    canonical = "".join(result).replace("0", ".")
+    return canonical, (rows, cols, t, relabel)
+
+def invert_transform(grid, transform):
+    # inverse of apply_transform() -> canonical grid (or its solution) back to the original orientation and digits
+    rows, cols, transpose, relabel = transform
+    chars = [c for c in grid if c in digits or c in "0."]
+    old = [None] * 81
+    for new, i in enumerate(transform_indexes(rows, cols, transpose)):
+        old[i] = chars[new]
+    inverse = dict((v, k) for k, v in relabel.items())
+    return "".join(old).translate(str.maketrans(inverse))
+
+# most partial transforms SolutionCache lets canonical_form() compare for one row
+# (every generated puzzle fits, symmetric / sparse grids above it cost a few ms instead of seconds)
+MAX_STATES = 2048
+
+class SolutionCache:
+    # bounded LRU cache of solve results keyed by grid string
+    # a repeated grid is found by its exact string (a dict lookup), any other grid is mapped to its canonical form
+    # -> isomorphic puzzles share one entry
+    # maxsize bounds the canonical entries (what currsize and evictions count), the exact grids are kept apart as
+    # aliases of their entry (at most maxsize more, dropped without counting)
+    # costs: an exact hit is a dict lookup after reading the grid (about 35 us), an isomorphic hit costs canonical_form() (about 3 ms for a typical
+    # puzzle, about a strings solve and slower than a bits solve), so only repeated grids and slow backends gain;
+    # grids whose canonical form needs more than max_states partial transforms are solved directly
+    # safe to use from several threads
+
+    def __init__(self, maxsize=1024, backend="strings", max_states=MAX_STATES):
+        self.maxsize = maxsize
+        self.backend = backend
+        self.max_states = max_states
+        # grid string -> (status, solution string of that grid or None)
+        # entries by canonical form (or by the grid itself when it has none), aliases by exact grid
+        self.entries = collections.OrderedDict()
+        self.aliases = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def _get(self, key):
+        # entry or alias of key (counted as hit) or None
+        with self.lock:
+            for entries in (self.aliases, self.entries):
+                entry = entries.get(key)
+                if entry is not None:
+                    entries.move_to_end(key)
+                    self.hits += 1
+                    return entry
+            return None
+
+    def _put(self, key, entry, alias=False):
+        with self.lock:
+            entries = self.aliases if alias else self.entries
+            entries[key] = entry
+            entries.move_to_end(key)
+            while len(entries) > self.maxsize:
+                entries.popitem(last=False)
+                if not alias:
+                    self.evictions += 1
+
+    def _solve(self, grid):
+        # entry of grid solved with the backend (counted as miss), solved outside the lock
+        # -> other threads can use the cache meanwhile
+        with self.lock:
+            self.misses += 1
+        result = solve_grid(grid, backend=self.backend)
+        solution = None
+        if result.solution is not None:
+            solution = "".join(result.solution[s] for s in squares)
+        return result.status, solution
+
+    def solve_grid(self, grid):
+        # same result as solver.solve_grid(grid), elapsed includes the lookups and the canonicalization
+        start = time.perf_counter()
+        values = grid_values(grid)
+        # squares missing from a short grid are empty (as in solver.solve_grid())
+        key = "".join(values.get(s, ".").replace("0", ".") for s in squares)
+
+        entry = self._get(key)
+        if entry is None:
+            form = canonical_form(key, self.max_states)
+            if form is None:
+                # too symmetric to canonicalize cheaply -> solving it directly is faster, the grid is its own key
+                entry = self._solve(key)
+                self._put(key, entry)
+            else:
+                canonical, transform = form
+                canonical_entry = self._get(canonical)
+                if canonical_entry is None:
+                    canonical_entry = self._solve(canonical)
+                    self._put(canonical, canonical_entry)
+                status, solution = canonical_entry
+                if solution is not None:
+                    solution = invert_transform(solution, transform)
+                entry = (status, solution)
+                # the exact grid gets an alias -> repeating it doesn't need canonical_form() again
+                if key != canonical:
+                    self._put(key, entry, alias=True)
+
+        status, solution = entry
+        if solution is not None:
+            solution = dict(zip(squares, solution))
+        return SolveResult(status, solution, time.perf_counter() - start)
+
+    def solve(self, grid):
+        # old interface -> solution dict, False or 2 (same as solver.solve())
+        return legacy_answer(self.solve_grid(grid))
+
+    def cache_info(self):
+        with self.lock:
+            return CacheInfo(self.hits, self.misses, self.evictions, self.maxsize, len(self.entries))
+
+    def cache_clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.aliases.clear()
+            self.hits = self.misses = self.evictions = 0
@@ -0,0 +1,259 @@
+# Packed binary puzzle corpus (.sdkc files)
+# a 16 byte header (magic, version, flags, number of puzzles) and then fixed size records:
+#   puzzle (41 bytes = 81 squares x 4 bits, blank = 0), optional solution (41 bytes), optional status (1 byte)
+#   a puzzle of all 0xFF bytes marks a record that couldn't be read (batch.py keeps one record for every input record)
+# -> half the size of one-line text (6x smaller than the pretty format) and record i is at a known offset,
+#    so the reader memory-maps the file and gives puzzles by index and slices of puzzles without reading or copying the rest
+# usage: python corpus.py pack [input text file, default stdin] -o output.sdkc [--solve] [--engine ...]
+#        python corpus.py unpack input.sdkc [-o output file] [--results]
+#        python corpus.py info input.sdkc
+# batch.py and generate.py read / write these files directly (input detected by its header, output by .sdkc name)
+
+import argparse
+import importlib
+import mmap
+import os
+import struct
+import sys
+
+import loader
+import solver
+from solver import digits
+
+MAGIC = b"SDKC"
+VERSION = 2
+# versions the reader understands (version 1 has no unreadable record markers)
+READ_VERSIONS = (1, 2)
+# magic, version, flags, reserved, number of puzzles
+HEADER = struct.Struct("<4sBBHQ")
+EXTENSION = ".sdkc"
+
+# flags of the optional record fields
+HAS_SOLUTION = 1
+HAS_STATUS = 2
+
+# bytes of one packed grid (two squares in a byte, high half first)
+GRID_BYTES = 41
+
+# packed puzzle of a record that couldn't be read (4-bit value 15 is never a square)
+UNREADABLE = b"\xff" * GRID_BYTES
+
+# status byte of each solve status (0 = not known), INVALID = line without 81 squares
+INVALID = "invalid"
+STATUSES = [None, solver.UNIQUE, solver.MULTIPLE, solver.NONE, solver.TOO_FEW_CLUES, INVALID]
+STATUS_CODES = dict((status, code) for code, status in enumerate(STATUSES))
+
+# grid characters -> 4-bit values and every byte -> its two squares (tables make packing one translate() call)
+_NIBBLES = bytes.maketrans(b"0." + digits.encode(), bytes([0, 0] + list(range(1, 10))))
+_SQUARES = [".123456789"[b >> 4 & 15:(b >> 4 & 15) + 1] + ".123456789"[b & 15:(b & 15) + 1] for b in range(160)]
+
+def pack_grid(grid):
+    # grid string (any characters grid_values() accepts) -> 41 bytes, missing squares are blank
+    chars = "".join(c for c in grid if c in digits or c in "0.")[:81].ljust(82, ".")
+    values = chars.encode().translate(_NIBBLES)
+    return bytes(a << 4 | b for a, b in zip(values[0::2], values[1::2]))
+
+def unpack_grid(data):
+    # 41 bytes -> grid string of 81 characters (blanks are .), None for the UNREADABLE marker
+    if data == UNREADABLE:
+        return None
+    return "".join([_SQUARES[b] for b in data])[:81]
+
+class CorpusWriter:
+    # writes a corpus record by record (the number of puzzles goes to the header when the writer is closed)
+    # use as context manager: with CorpusWriter(path, solutions=True) as w: w.add(puzzle, solution, status)
+
+    def __init__(self, path, solutions=False, statuses=False):
+        self.flags = (HAS_SOLUTION if solutions else 0) | (HAS_STATUS if statuses else 0)
+        self.count = 0
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, self.flags, 0, 0))
+
+    def add(self, puzzle, solution=None, status=None):
+        # solution = grid string or solution dict, status = one of STATUSES (fields the corpus doesn't have are ignored)
+        # puzzle None = record that couldn't be read -> stored as UNREADABLE
+        record = UNREADABLE if puzzle is None else pack_grid(puzzle)
+        if self.flags & HAS_SOLUTION:
+            if isinstance(solution, dict):
+                solution = "".join(solution.values())
+            record += pack_grid(solution or "")
+        if self.flags & HAS_STATUS:
+            record += bytes([STATUS_CODES[status]])
+        self.file.write(record)
+        self.count += 1
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, VERSION, self.flags, 0, self.count))
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class Corpus:
+    # memory-mapped corpus -> len(), corpus[i] (puzzle string, None for an unreadable record), corpus[i:j] (Corpus over the same memory),
+    # solution(i), status(i) and raw(i, j) (memoryview of the packed records, no copy)
+
+    def __init__(self, path=None, _view=None):
+        if _view is not None:
+            self.buffer, self.flags, self.start, self.stop = _view
+        else:
+            with open(path, "rb") as f:
+                header = f.read(HEADER.size)
+                if len(header) < HEADER.size or header[:len(MAGIC)] != MAGIC:
+                    raise ValueError("%s: not a puzzle corpus" % path)
+                magic, version, self.flags, _, count = HEADER.unpack(header)
+                if version not in READ_VERSIONS:
+                    raise ValueError("%s: unsupported corpus version %d" % (path, version))
+                self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.buffer = memoryview(self.mmap)[HEADER.size:]
+            self.start, self.stop = 0, count
+        self.record_size = (GRID_BYTES + (GRID_BYTES if self.flags & HAS_SOLUTION else 0)
+                            + (1 if self.flags & HAS_STATUS else 0))
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def _offset(self, i):
+        # offset of record i of this view in the buffer
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("corpus index out of range")
+        return (self.start + i) * self.record_size
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(len(self))
+            if step != 1:
+                raise ValueError("corpus slices can't have a step")
+            return Corpus(_view=(self.buffer, self.flags, self.start + start, self.start + max(start, stop)))
+        offset = self._offset(i)
+        return unpack_grid(self.buffer[offset:offset + GRID_BYTES])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    @property
+    def has_solutions(self):
+        return bool(self.flags & HAS_SOLUTION)
+
+    @property
+    def has_statuses(self):
+        return bool(self.flags & HAS_STATUS)
+
+    def solution(self, i):
+        # solution grid string of puzzle i (None if not stored or not solved)
+        if not self.has_solutions:
+            return None
+        offset = self._offset(i) + GRID_BYTES
+        solution = unpack_grid(self.buffer[offset:offset + GRID_BYTES])
+        return solution if "." not in solution else None
+
+    def status(self, i):
+        # status of puzzle i (one of STATUSES, None if not stored or not known)
+        if not self.has_statuses:
+            return None
+        return STATUSES[self.buffer[self._offset(i) + self.record_size - 1]]
+
+    def raw(self, start=0, stop=None):
+        # packed records start..stop of this view (memoryview into the mapped file)
+        if stop is None:
+            stop = len(self)
+        return self.buffer[(self.start + start) * self.record_size:(self.start + stop) * self.record_size]
+
+    def close(self):
+        # the mapping can only be closed when no views (slices, raw()) of it are used anymore
+        if hasattr(self, "mmap"):
+            self.buffer.release()
+            self.mmap.close()
+
+def is_corpus(path):
+    # True if the file starts with the corpus header
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+def pack(f, path, engine=None):
+    # converts a text file of puzzles (any format loader.py reads) to a corpus,
+    # with engine the puzzles are solved and solutions and statuses are stored
+    # records that can't be read are skipped and reported on stderr
+    solve_grid = None
+    if engine is not None:
+        solve_grid = importlib.import_module(engine).solve_grid
+    with CorpusWriter(path, solutions=solve_grid is not None, statuses=solve_grid is not None) as writer:
+        for record in loader.iter_records(f):
+            puzzle = record.puzzle
+            if puzzle is None:
+                sys.stderr.write("line %d: %s\n" % (record.line, record.error))
+            elif solve_grid is None:
+                writer.add(puzzle)
+            else:
+                result = solve_grid(puzzle)
+                writer.add(puzzle, result.solution, result.status)
+        return writer.count
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Convert sudoku puzzles to and from the packed corpus format.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    pack_cmd = commands.add_parser("pack", help="text puzzles -> corpus")
+    pack_cmd.add_argument("input", nargs="?", default="-", help="text file (default: stdin)")
+    pack_cmd.add_argument("-o", "--output", required=True, help="corpus file")
+    pack_cmd.add_argument("--solve", action="store_true", help="store solutions and statuses")
+    pack_cmd.add_argument("--engine", choices=["solver", "bitsolver", "dlx"], default="bitsolver",
+                          help="solver module used by --solve (default: bitsolver)")
+
+    unpack_cmd = commands.add_parser("unpack", help="corpus -> text, one puzzle per line")
+    unpack_cmd.add_argument("input", help="corpus file")
+    unpack_cmd.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+    unpack_cmd.add_argument("--results", action="store_true", help="add the stored solution or status after each puzzle")
+
+    info_cmd = commands.add_parser("info", help="print number of puzzles and stored fields")
+    info_cmd.add_argument("input", help="corpus file")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.command == "pack":
+        f_in = sys.stdin if args.input == "-" else open(args.input, "r")
+        try:
+            count = pack(f_in, args.output, args.engine if args.solve else None)
+        finally:
+            if f_in is not sys.stdin:
+                f_in.close()
+        sys.stderr.write("%d puzzles packed to %s\n" % (count, args.output))
+
+    elif args.command == "unpack":
+        corpus = Corpus(args.input)
+        f_out = sys.stdout if args.output == "-" else open(args.output, "w")
+        try:
+            for i, puzzle in enumerate(corpus):
+                if puzzle is None:
+                    # unreadable record -> a line that is read as unreadable again
+                    puzzle = INVALID
+                if args.results:
+                    puzzle += "\t" + (corpus.solution(i) or corpus.status(i) or "")
+                f_out.write(puzzle + "\n")
+        except BrokenPipeError:
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        finally:
+            if f_out is not sys.stdout:
+                f_out.close()
+
+    else:
+        corpus = Corpus(args.input)
+        print("%s: %d puzzles, %d bytes per puzzle, solutions: %s, statuses: %s"
+              % (args.input, len(corpus), corpus.record_size, corpus.has_solutions, corpus.has_statuses))
+
+if __name__ == "__main__":
+    main()
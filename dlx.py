@@ -0,0 +1,146 @@
+# Exact cover solver engine (Knuth's Algorithm X)
+# sudoku as exact cover: 324 constraint columns (each square filled once, each digit once in each unit)
+# and 729 candidate rows (digit d in square s), built from squares and unitlist in solver.py
+# the links of Dancing Links are replaced by python sets -> column = set of rows that can still cover it,
+# covering a row removes the rows that clash with it from the other columns and uncovering puts them back
+
+import itertools
+import time
+
+from solver import (digits, squares, unitlist, grid_values, enough_clues, SolveResult, UNIQUE, MULTIPLE,
+                    NONE, TOO_FEW_CLUES, BUDGET_EXCEEDED, BudgetExceeded, legacy_answer, start_stats, report_stats)
+
+# columns covered by each candidate row (square, digit) -> the square itself and digit d in each unit of the square
+ROWS = dict(((s, d), [("square", s)] + [("unit", k, d) for k, u in enumerate(unitlist) if s in u])
+            for s in squares for d in digits)
+
+# every column and the rows that cover it
+COLUMNS = {}
+for row, cols in ROWS.items():
+    for col in cols:
+        COLUMNS.setdefault(col, set()).add(row)
+
+def select(X, row):
+    # cover row -> remove its columns and all rows that share a column with it, returns removed columns
+    removed = []
+    for col in ROWS[row]:
+        for other in X[col]:
+            for col2 in ROWS[other]:
+                if col2 != col:
+                    X[col2].remove(other)
+        removed.append(X.pop(col))
+    return removed
+
+def deselect(X, row, removed):
+    # undo select() -> put columns and rows back in reverse order
+    for col in reversed(ROWS[row]):
+        X[col] = removed.pop()
+        for other in X[col]:
+            for col2 in ROWS[other]:
+                if col2 != col:
+                    X[col2].add(other)
+
+def cover_grid(grid):
+    # exact cover matrix with the input digits already selected, None if two input digits clash
+    X = dict((col, set(rows)) for col, rows in COLUMNS.items())
+    for s, d in grid_values(grid).items():
+        if d in digits:
+            if any(col not in X for col in ROWS[(s, d)]):
+                # column already covered by another input digit
+                return None
+            select(X, (s, d))
+    return X
+
+def _search(X, chosen, budget=None, stats=None, depth=1):
+    # generator of all exact covers (lists of chosen rows)
+    # budget = solver.Budget checked at every search node (raises BudgetExceeded, X is left half covered then)
+    # stats = dict where search nodes, backtracks (nodes with a column no row can cover) and max depth are added
+    if budget is not None:
+        budget.charge()
+    if stats is not None:
+        stats["nodes"] += 1
+        if depth > stats["max_depth"]:
+            stats["max_depth"] = depth
+    if not X:
+        yield list(chosen)
+        return
+
+    # column with the fewest rows (same as choosing the square with fewest possible values)
+    col = min(X, key=lambda col: len(X[col]))
+    if not X[col] and stats is not None:
+        stats["backtracks"] += 1
+    # rows sorted -> search is repeatable
+    for row in sorted(X[col]):
+        chosen.append(row)
+        removed = select(X, row)
+        yield from _search(X, chosen, budget, stats, depth + 1)
+        deselect(X, row, removed)
+        chosen.pop()
+
+def _solutions(grid, X, budget=None, stats=None):
+    # generator of solution dicts of grid from its exact cover matrix X
+    if X is None:
+        return
+    given = dict((s, d) for s, d in grid_values(grid).items() if d in digits)
+    for chosen in _search(X, [], budget, stats):
+        solution = given.copy()
+        solution.update(chosen)
+        yield dict((s, solution[s]) for s in squares)
+
+def iter_solutions(grid, budget=None):
+    # generator of all solutions (solution dicts) of grid, works for any number of input digits
+    return _solutions(grid, cover_grid(grid), budget)
+
+def count_solutions(grid, limit=None, budget=None):
+    # number of solutions of grid, the search stops once limit solutions were found
+    count = 0
+    for solution in itertools.islice(iter_solutions(grid, budget), limit):
+        count += 1
+    return count
+
+def solve_grid(grid, budget=None, instrument=False):
+    # solve sudoku, returns SolveResult (same as solver.solve_grid())
+    # budget = solver.Budget -> status BUDGET_EXCEEDED with the nodes and time used (result.stats) when it runs out
+    # instrument = search nodes, backtracks, max depth and phase times in result.stats (like solver.solve_grid(),
+    # also inside a solver.collect_stats() block), building the matrix counts as propagate_time
+    # only clashing input digits count as no solution before the 17 input digits check
+    # (solver.py also finds contradictions by propagation there)
+    stats = start_stats(instrument)
+    start = time.perf_counter()
+    solution = None
+    X = cover_grid(grid)
+    search_start = time.perf_counter()
+    if stats is not None:
+        stats["propagate_time"] += search_start - start
+    if X is None:
+        status = NONE
+    elif not enough_clues(grid):
+        status = TOO_FEW_CLUES
+    else:
+        try:
+            found = list(itertools.islice(_solutions(grid, X, budget, stats), 2))
+        except BudgetExceeded as e:
+            found = None
+            if stats is None:
+                # not instrumented -> the budget's own node count (search time is added below)
+                stats = e.stats
+                stats["search_time"] = 0.0
+        if found is None:
+            status = BUDGET_EXCEEDED
+        elif len(found) > 1:
+            status = MULTIPLE
+        elif found:
+            status = UNIQUE
+            solution = found[0]
+        else:
+            status = NONE
+    end = time.perf_counter()
+
+    if stats is not None:
+        stats["search_time"] += end - search_start
+        report_stats(stats)
+    return SolveResult(status, solution, end - start, stats)
+
+def solve(grid, budget=None):
+    # old interface of solve_grid() -> solution dict, False or 2 (raises BudgetExceeded when budget runs out)
+    return legacy_answer(solve_grid(grid, budget))
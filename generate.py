@@ -0,0 +1,241 @@
+# Fast generator of complete sudoku grids
+# every function takes a seed or random.Random instance (rng) so the results can be reproduced
+# backtrack = randomized depth-first search on bitsolver values (any valid grid can come out)
+# shuffle = random symmetry transforms (digit relabeling, band / stack / row / column swaps, transposition)
+#           of a backtracked base grid -> much faster, the base grid is made again every fresh_every grids
+# run as a script it generates puzzles in bulk (in a pool of worker processes with --workers):
+# usage: python generate.py [-n N] [-o output file] [--seed S] [--workers N] [--chunk-size N]
+#                           [--min-clues N] [--max-clues N] [--backend strings|bits|dlx] [--stats]
+# output file named *.sdkc is written as packed corpus (corpus.py)
+# every chunk of puzzles gets its own seed derived from the master seed -> the output only depends on
+# the master seed and chunk size, not on the number of workers
+
+import argparse
+import collections
+import itertools
+import os
+import random
+import sys
+import time
+
+import bitsolver
+import corpus
+import solver
+from batch import pool_imap
+from solver import digits
+
+# ways to make a complete grid
+METHODS = ("backtrack", "shuffle")
+
+# all orders of 3 items (bands, stacks, rows in a band, columns in a stack)
+PERMS3 = list(itertools.permutations(range(3)))
+
+def get_rng(rng=None):
+    # random.Random from a seed (int / str / None = random seed) or an existing instance
+    if isinstance(rng, random.Random):
+        return rng
+    return random.Random(rng)
+
+def backtrack_grid(rng=None):
+    # random complete grid by depth-first search that tries digits in random order
+    rng = get_rng(rng)
+    values = _fill(list([bitsolver.ALL] * 81), rng)
+    return "".join(bitsolver.DIGIT[v] for v in values)
+
+def _fill(values, rng):
+    # first solution of values found by the randomized search
+    # (an empty grid always has a solution, so this doesn't need to go deep into backtracking)
+    s = -1
+    n = 10
+    for i in range(81):
+        c = bitsolver.COUNT[values[i]]
+        if 1 < c < n:
+            n = c
+            s = i
+            if c == 2:
+                break
+
+    if s == -1:
+        return values
+
+    v = values[s]
+    bits = [1 << i for i in range(9) if v & (1 << i)]
+    rng.shuffle(bits)
+    for d in bits:
+        new_values = bitsolver.assign(values[:], s, d)
+        if new_values:
+            new_values = _fill(new_values, rng)
+            if new_values:
+                return new_values
+    return False
+
+def random_transform(rng):
+    # random symmetry of sudoku -> (rows, cols, transpose, relabel)
+    # rows / cols = new order of old rows / columns (bands and rows inside bands are shuffled)
+    # relabel = dict old digit -> new digit
+    choice = rng.choice
+    rows = [b * 3 + i for b in choice(PERMS3) for i in choice(PERMS3)]
+    cols = [b * 3 + i for b in choice(PERMS3) for i in choice(PERMS3)]
+    transpose = rng.random() < 0.5
+    new_digits = list(digits)
+    rng.shuffle(new_digits)
+    relabel = dict(zip(digits, new_digits))
+    return rows, cols, transpose, relabel
+
+def transform_indexes(rows, cols, transpose):
+    # index of the old square for every new square
+    if transpose:
+        return [cols[c] * 9 + rows[r] for r in range(9) for c in range(9)]
+    return [rows[r] * 9 + cols[c] for r in range(9) for c in range(9)]
+
+def apply_transform(grid, transform):
+    # transformed grid string (blank squares stay blank)
+    rows, cols, transpose, relabel = transform
+    chars = [c for c in grid if c in digits or c in "0."]
+    return "".join([chars[i] for i in transform_indexes(rows, cols, transpose)]).translate(str.maketrans(relabel))
+
+def shuffle_grid(grid, rng=None):
+    # grid after a random symmetry transform (still a valid sudoku with the same number of solutions)
+    rng = get_rng(rng)
+    return apply_transform(grid, random_transform(rng))
+
+def complete_grid(rng=None, method="backtrack"):
+    # one random complete grid
+    rng = get_rng(rng)
+    if method == "backtrack":
+        return backtrack_grid(rng)
+    elif method == "shuffle":
+        return shuffle_grid(backtrack_grid(rng), rng)
+    raise ValueError("unknown method: %r" % (method,))
+
+def generate_complete(n=None, rng=None, method="shuffle", fresh_every=1000):
+    # iterator of n random complete grids (endless for n = None)
+    rng = get_rng(rng)
+    if method not in METHODS:
+        raise ValueError("unknown method: %r" % (method,))
+
+    base = None
+    for i in itertools.islice(itertools.count(), n):
+        if method == "backtrack":
+            yield backtrack_grid(rng)
+        else:
+            if i % fresh_every == 0:
+                base = backtrack_grid(rng)
+            yield shuffle_grid(base, rng)
+
+def derive_seed(seed, index):
+    # seed of chunk number index of a run with master seed seed (string seeds are hashed by random.Random)
+    return "%s:%d" % (seed, index)
+
+def count_clues(puzzle):
+    return sum(1 for c in puzzle if c in digits)
+
+def generate_chunk(task):
+    # worker function -> generates count puzzles from its own seed
+    # returns worker pid, time spent generating and list of puzzles
+    seed, count, backend = task
+    rng = get_rng(seed)
+    start = time.perf_counter()
+    puzzles = [solver.generator(backend, rng) for _ in range(count)]
+    return os.getpid(), time.perf_counter() - start, puzzles
+
+def generate_puzzles(n=None, seed=None, workers=0, chunk_size=16, backend="strings",
+                     min_clues=None, max_clues=None, stats=None):
+    # generator of n puzzles (endless for n = None) with min_clues to max_clues input digits
+    # chunks of chunk_size puzzles are generated in a pool of workers processes (workers = 0 -> in this process)
+    # and come back in chunk order, so the same seed always gives the same puzzles
+    # stats -> dict that gets filled with "seed", "generated" (puzzles made before the clue filter),
+    # "clues" (Counter of clue counts of the yielded puzzles) and "workers" (pid: [puzzles, seconds spent])
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    if stats is not None:
+        stats.setdefault("seed", seed)
+        stats.setdefault("generated", 0)
+        stats.setdefault("clues", collections.Counter())
+        stats.setdefault("workers", {})
+    tasks = ((derive_seed(seed, i), chunk_size, backend) for i in itertools.count())
+
+    if workers > 0:
+        results = pool_imap(generate_chunk, tasks, workers)
+    else:
+        results = map(generate_chunk, tasks)
+
+    left = n
+    try:
+        for pid, elapsed, puzzles in results:
+            if stats is not None:
+                worker = stats["workers"].setdefault(pid, [0, 0.0])
+                worker[0] += len(puzzles)
+                worker[1] += elapsed
+                stats["generated"] += len(puzzles)
+            for puzzle in puzzles:
+                clues = count_clues(puzzle)
+                if (min_clues is not None and clues < min_clues) or (max_clues is not None and clues > max_clues):
+                    continue
+                if left is not None:
+                    if left <= 0:
+                        return
+                    left -= 1
+                if stats is not None:
+                    stats["clues"][clues] += 1
+                yield puzzle
+            if left is not None and left <= 0:
+                return
+    finally:
+        # stopped early -> the pool drops the chunks that aren't needed anymore
+        if workers > 0:
+            results.close()
+
+def print_stats(stats, wall_time, out=sys.stderr):
+    # puzzles/sec of the run and distribution of clue counts
+    kept = sum(stats["clues"].values())
+    rate = kept / wall_time if wall_time else 0
+    out.write("seed %s: %d puzzles (%d generated) in %.2f s, %.1f puzzles/sec with %d workers\n"
+              % (stats["seed"], kept, stats["generated"], wall_time, rate, len(stats["workers"])))
+    for clues, count in sorted(stats["clues"].items()):
+        out.write("%2d clues: %6d %s\n" % (clues, count, "#" * (60 * count // kept)))
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Generate sudoku puzzles, one puzzle per line.")
+    parser.add_argument("-n", "--count", type=int, default=None, help="number of puzzles (default: until stopped)")
+    parser.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+    parser.add_argument("--seed", default=None, help="master seed (default: random, printed with --stats)")
+    parser.add_argument("--workers", type=int, default=0, help="number of worker processes (default: generate in this process)")
+    parser.add_argument("--chunk-size", type=int, default=16, help="puzzles generated by a worker at once (default: 16)")
+    parser.add_argument("--min-clues", type=int, default=None, help="skip puzzles with fewer input digits")
+    parser.add_argument("--max-clues", type=int, default=None, help="skip puzzles with more input digits")
+    parser.add_argument("--backend", choices=sorted(solver.BACKENDS), default="strings", help="solver backend (default: strings)")
+    parser.add_argument("--stats", action="store_true", help="print puzzles/sec and clue counts to stderr")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.output.endswith(corpus.EXTENSION):
+        # packed corpus (corpus.py), every generated puzzle is stored with the unique status
+        f_out = corpus.CorpusWriter(args.output, statuses=True)
+        write = lambda puzzle: f_out.add(puzzle, status=solver.UNIQUE)
+    else:
+        f_out = sys.stdout if args.output == "-" else open(args.output, "w")
+        write = lambda puzzle: f_out.write(puzzle + "\n")
+    start = time.perf_counter()
+    stats = {}
+    try:
+        for puzzle in generate_puzzles(args.count, args.seed, args.workers, args.chunk_size, args.backend,
+                                       args.min_clues, args.max_clues, stats):
+            write(puzzle)
+    except BrokenPipeError:
+        # output was closed early -> stop quietly (same as batch.py)
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    except KeyboardInterrupt:
+        # endless run stopped by the user -> keep what was written and print the stats
+        pass
+    finally:
+        if f_out is not sys.stdout:
+            f_out.close()
+
+    if args.stats and stats["clues"]:
+        print_stats(stats, time.perf_counter() - start)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# Background worker of the GUI -> solving and generating run in a separate process and the results come back
+# through a queue that the main loop polls, so the window keeps redrawing and handling keys meanwhile
+# only one job runs at a time -> a new job replaces (terminates) the running one, cancel() stops it
+# (headless, doesn't import pygame)
+
+import multiprocessing
+import queue
+import time
+
+def _run(results, func, args):
+    # worker process -> runs func(*args) and sends back (result, error message)
+    try:
+        results.put((func(*args), None))
+    except Exception as e:
+        results.put((None, "%s: %s" % (type(e).__name__, e)))
+
+class Worker:
+    # runs one job at a time in a background process
+    # every job gets its own result queue -> a terminated job can't leave anything behind for the next one
+
+    def __init__(self):
+        self.process = None
+        self.results = None
+        self.name = None        # name of the running job (None when idle)
+        self.started = 0.0
+
+    def submit(self, name, func, *args):
+        # start func(*args) in the background, a job that is still running is cancelled
+        # func has to be a module level function (it's sent to the worker process)
+        self.cancel()
+        self.name = name
+        self.started = time.perf_counter()
+        self.results = multiprocessing.Queue()
+        self.process = multiprocessing.Process(target=_run, args=(self.results, func, args), daemon=True)
+        self.process.start()
+
+    def cancel(self):
+        # stop the running job, returns its name (None if nothing was running)
+        name = self.name
+        if self.process is not None:
+            if self.process.is_alive():
+                self.process.terminate()
+            self.process.join()
+        self._reset()
+        return name
+
+    def _reset(self):
+        self.process = None
+        if self.results is not None:
+            self.results.close()
+        self.results = None
+        self.name = None
+
+    @property
+    def busy(self):
+        return self.name is not None
+
+    def elapsed(self):
+        # seconds the running job has been running
+        return time.perf_counter() - self.started if self.busy else 0.0
+
+    def poll(self):
+        # finished job -> (name, result, error message or None), None if no job finished since the last call
+        if not self.busy:
+            return None
+        try:
+            result, error = self.results.get_nowait()
+        except queue.Empty:
+            if self.process.is_alive():
+                return None
+            # the process is done, but its result can still be on the way through the pipe
+            try:
+                result, error = self.results.get(timeout=0.1)
+            except queue.Empty:
+                result, error = None, "worker process ended without a result"
+
+        name = self.name
+        self.process.join()
+        self._reset()
+        return name, result, error
+
+    def close(self):
+        self.cancel()
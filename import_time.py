@@ -0,0 +1,54 @@
+# Measures how long it takes a fresh python process to import the headless solver
+# usage: python import_time.py [budget in ms] [number of runs]
+# exits with code 1 when the median import time is over the budget or when a GUI module got imported
+
+import statistics
+import subprocess
+import sys
+
+# modules that have to be importable without a display
+MODULES = ["solver", "bitsolver"]
+
+# modules that must never be imported by the headless solver
+GUI_MODULES = ["pygame", "tkinter"]
+
+# default budget in milliseconds
+BUDGET_MS = 25
+
+# code run in the child process -> prints import time in ms and the GUI modules that got imported
+CHILD = """
+import sys, time
+start = time.perf_counter()
+for name in %r:
+    __import__(name)
+print((time.perf_counter() - start) * 1000)
+print(" ".join(m for m in %r if m in sys.modules))
+"""
+
+def measure(runs=5):
+    # import the solver modules in fresh processes, return list of import times (ms) and imported GUI modules
+    times = []
+    gui = set()
+    for i in range(runs):
+        out = subprocess.run([sys.executable, "-c", CHILD % (MODULES, GUI_MODULES)],
+                             capture_output=True, text=True, check=True).stdout.split("\n")
+        times.append(float(out[0]))
+        gui.update(out[1].split())
+    return times, gui
+
+if __name__ == "__main__":
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else BUDGET_MS
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    times, gui = measure(runs)
+    median = statistics.median(times)
+    print("import %s: median %.1f ms, min %.1f ms, max %.1f ms (budget %.1f ms)"
+          % (", ".join(MODULES), median, min(times), max(times), budget))
+
+    if gui:
+        print("FAIL: GUI modules imported: " + ", ".join(sorted(gui)))
+        sys.exit(1)
+    if median > budget:
+        print("FAIL: import time over budget")
+        sys.exit(1)
+    print("OK")
@@ -0,0 +1,201 @@
+# Puzzle file loader shared by the GUI and the batch tools
+# reads files in large blocks (or whole at once with load()) and detects their format from the first puzzle line
+# that is a row of 9 squares (grid) or a whole puzzle (line), lines before it that are neither become errors:
+#   line -> one puzzle per line, 81 squares (digits and blanks 0 / .), anything after the first space or tab is ignored
+#   grid -> 9 rows of 9 squares for each puzzle: the pretty format of test_data/input1.txt (". . . |3 . . |6 . 7",
+#           ------+------+------ lines), SDK ("..3.5...." rows) and SS ("..3|.5.|..." rows, ---+---+--- lines),
+#           a line with a whole puzzle is read as one puzzle in this format too
+# lines starting with # (comments) or [ (section headers like [Puzzle]) are skipped, empty lines end a grid puzzle
+# every puzzle comes as Record(puzzle, line, error) with the number of its first line in the file,
+# records that can't be read have puzzle None and an error message (so one bad record doesn't stop the rest)
+# a packed corpus (corpus.py) is read too, line = index of the puzzle + 1
+
+import collections
+import itertools
+import re
+import sys
+
+from solver import digits
+
+LINE = "line"
+GRID = "grid"
+FORMATS = (LINE, GRID)
+
+# characters of one square
+SQUARE_CHARS = digits + "0."
+
+# one-line puzzle with nothing else on the line
+_PUZZLE = re.compile(r"[0-9.]{81}").fullmatch
+
+# bytes read at once when streaming a file
+BLOCK_SIZE = 1 << 20
+
+# lines read to find the format, a file without a row or a whole puzzle in them is read as line format
+DETECT_LINES = 100
+
+Record = collections.namedtuple("Record", ["puzzle", "line", "error"])
+
+def _is_comment(line):
+    return line[:1] in ("#", "[")
+
+def _count_squares(text):
+    return sum(1 for c in text if c in SQUARE_CHARS)
+
+def _whole_puzzle(line):
+    # the 81 squares of a line holding a whole puzzle (maybe with something after it), None for other lines
+    token = line.split(None, 1)[0]
+    if _PUZZLE(token):
+        return token
+    if _count_squares(line) == 81:
+        return "".join(c for c in line if c in SQUARE_CHARS)
+    return None
+
+def detect_format(line):
+    # format of a file from a puzzle line: a whole puzzle (81 squares or more) -> LINE, a row of 9 squares -> GRID,
+    # None for a line that is neither (a truncated puzzle or row)
+    token = line.split(None, 1)[0]
+    count = _count_squares(line)
+    if _count_squares(token) >= 81 or count >= 81:
+        return LINE
+    if count == 9:
+        return GRID
+    return None
+
+def read_lines(f, block_size=BLOCK_SIZE):
+    # lines of a text file read in blocks of block_size characters (without line ends)
+    # f can also be any iterable of lines
+    if not hasattr(f, "read"):
+        for line in f:
+            yield line.rstrip("\r\n")
+        return
+    rest = ""
+    while True:
+        block = f.read(block_size)
+        if not block:
+            break
+        block = rest + block
+        end = block.rfind("\n") + 1
+        rest = block[end:]
+        yield from block[:end].splitlines()
+    if rest:
+        yield rest.rstrip("\r")
+
+def _line_records(lines):
+    # line format -> one record for every puzzle line
+    for number, line in lines:
+        # fast path: the line is just the 81 squares
+        if not _PUZZLE(line):
+            line = line.strip()
+            if not line or _is_comment(line):
+                continue
+            token = line.split(None, 1)[0]
+            if not _PUZZLE(token):
+                count = _count_squares(line)
+                if count != 81:
+                    yield Record(None, number, "expected 81 squares, found %d" % count)
+                    continue
+                token = "".join(c for c in line if c in SQUARE_CHARS)
+            line = token
+        yield Record(line, number, None)
+
+def _grid_records(lines):
+    # grid format -> every 9 rows with 9 squares make a record (lines without squares are separators)
+    rows = []
+    start = None
+    for number, line in lines:
+        line = line.strip()
+        if _is_comment(line):
+            continue
+        squares = [c for c in line if c in SQUARE_CHARS]
+        if len(squares) > 9:
+            puzzle = _whole_puzzle(line)
+            if puzzle is not None:
+                # whole puzzle on one line -> a puzzle of its own (ends an unfinished one)
+                if rows:
+                    yield Record(None, start, "puzzle ends after %d rows" % len(rows))
+                    rows = []
+                    start = None
+                yield Record(puzzle, number, None)
+                continue
+        if not squares:
+            # an empty line ends an unfinished puzzle, other lines without squares are separators
+            if not line and rows:
+                yield Record(None, start, "puzzle ends after %d rows" % len(rows))
+                rows = []
+            continue
+        if len(squares) != 9:
+            # bad row -> error for the puzzle it belongs to, the next row starts a new puzzle
+            yield Record(None, start if rows else number, "line %d: expected 9 squares in a row, found %d" % (number, len(squares)))
+            rows = []
+            start = None
+            continue
+        if not rows:
+            start = number
+        rows.append("".join(squares))
+        if len(rows) == 9:
+            yield Record("".join(rows), start, None)
+            rows = []
+            start = None
+    if rows:
+        yield Record(None, start, "puzzle ends after %d rows" % len(rows))
+
+def _records(lines, fmt):
+    if fmt is None:
+        # the first line that is a row or a whole puzzle decides
+        head = []
+        for number, line in lines:
+            head.append((number, line))
+            line = line.strip()
+            if line and not _is_comment(line):
+                fmt = detect_format(line)
+                if fmt is not None:
+                    break
+            if len(head) >= DETECT_LINES:
+                break
+        lines = itertools.chain(head, lines)
+    if fmt == GRID:
+        yield from _grid_records(lines)
+    else:
+        yield from _line_records(lines)
+
+def iter_records(f, fmt=None, block_size=BLOCK_SIZE):
+    # records of a text file (or iterable of lines), fmt = LINE, GRID or None (detected from the first puzzle lines)
+    # nothing is read before the first record is taken
+    if fmt is not None and fmt not in FORMATS:
+        raise ValueError("unknown puzzle format: %r" % (fmt,))
+    return _records(enumerate(read_lines(f, block_size), 1), fmt)
+
+def open_records(path, fmt=None, block_size=BLOCK_SIZE):
+    # records of a file ("-" = stdin), a corpus is detected by its header
+    import corpus
+
+    if path != "-" and corpus.is_corpus(path):
+        data = corpus.Corpus(path)
+        try:
+            for i, puzzle in enumerate(data):
+                if puzzle is None:
+                    yield Record(None, i + 1, "record couldn't be read when the corpus was written")
+                else:
+                    yield Record(puzzle, i + 1, None)
+        finally:
+            data.close()
+        return
+    if path == "-":
+        yield from iter_records(sys.stdin, fmt, block_size)
+        return
+    with open(path, "r") as f:
+        yield from iter_records(f, fmt, block_size)
+
+def load(path, fmt=None):
+    # all records of a file at once (the whole file is read with one read() call)
+    import corpus
+
+    if corpus.is_corpus(path):
+        return list(open_records(path))
+    with open(path, "r") as f:
+        text = f.read()
+    return list(iter_records(text.splitlines(), fmt))
+
+def puzzles(records):
+    # puzzle strings of the records that could be read
+    return (record.puzzle for record in records if record.puzzle is not None)
@@ -0,0 +1,103 @@
+# Load generator for server.py -> sends requests from many connections at once and reports throughput and latency
+# usage: python loadgen.py [puzzles file, default test_data/input2.txt] [--url http://127.0.0.1:8080]
+#                         [--endpoint solve|validate|count|generate] [--concurrency N] [--requests N] [--batch N]
+#                         [--deadline MS]
+# every connection sends its next request as soon as the last one is answered (keep-alive)
+# puzzles are read with loader.py and used in turns, --batch puzzles go in one request
+
+import argparse
+import asyncio
+import collections
+import itertools
+import json
+import sys
+import time
+import urllib.parse
+
+import loader
+from server import percentile
+
+async def request(reader, writer, host, path, payload):
+    # one POST on an open connection -> (status code, response body)
+    body = json.dumps(payload).encode()
+    writer.write(("POST %s HTTP/1.1\r\nHost: %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n"
+                  % (path, host, len(body))).encode("latin-1") + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+async def client(args, host, port, payloads, latencies, statuses):
+    # one connection, takes requests from payloads until there are none left
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for payload in payloads:
+            start = time.perf_counter()
+            status, _ = await request(reader, writer, host, "/" + args.endpoint, payload)
+            statuses[status] += 1
+            if status == 200:
+                latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+def make_payloads(args, puzzles):
+    # body of every request (a shared iterator -> each request is sent by one of the clients)
+    for i in range(args.requests):
+        if args.endpoint == "generate":
+            payload = {"count": args.batch, "seed": i}
+        else:
+            batch = [next(puzzles) for _ in range(args.batch)]
+            payload = {"puzzle": batch[0]} if args.batch == 1 else {"puzzles": batch}
+        if args.deadline is not None:
+            payload["deadline_ms"] = args.deadline
+        yield payload
+
+async def run(args):
+    url = urllib.parse.urlsplit(args.url)
+    host, port = url.hostname, url.port or 80
+    puzzles = []
+    if args.endpoint != "generate":
+        puzzles = list(loader.puzzles(loader.load(args.input)))
+        if not puzzles:
+            sys.exit("no puzzles in %s" % args.input)
+    payloads = make_payloads(args, itertools.cycle(puzzles))
+
+    latencies = []
+    statuses = collections.Counter()
+    start = time.perf_counter()
+    await asyncio.gather(*(client(args, host, port, payloads, latencies, statuses) for _ in range(args.concurrency)))
+    return time.perf_counter() - start, latencies, statuses
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Measure latency and throughput of server.py.")
+    parser.add_argument("input", nargs="?", default="test_data/input2.txt", help="puzzles file (default: test_data/input2.txt)")
+    parser.add_argument("--url", default="http://127.0.0.1:8080", help="server address (default: http://127.0.0.1:8080)")
+    parser.add_argument("--endpoint", choices=["solve", "validate", "count", "generate"], default="solve",
+                        help="endpoint to load (default: solve)")
+    parser.add_argument("--concurrency", type=int, default=16, help="connections sending requests at once (default: 16)")
+    parser.add_argument("--requests", type=int, default=1000, help="number of requests (default: 1000)")
+    parser.add_argument("--batch", type=int, default=1, help="puzzles in one request (default: 1)")
+    parser.add_argument("--deadline", type=float, default=None, help="deadline_ms of every request (default: server's)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    elapsed, latencies, statuses = asyncio.run(run(args))
+
+    ok = statuses[200]
+    print("%d requests in %.2f s: %.1f requests/s, %.1f puzzles/s"
+          % (sum(statuses.values()), elapsed, ok / elapsed, ok * args.batch / elapsed))
+    print("status codes: " + ", ".join("%d: %d" % item for item in sorted(statuses.items())))
+    if latencies:
+        print("latency: p50 %.2f ms, p99 %.2f ms, max %.2f ms"
+              % (percentile(latencies, 50) * 1000, percentile(latencies, 99) * 1000, max(latencies) * 1000))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# NumPy batch solver engine
+# loads N puzzles into a (N, 81, 9) boolean array of possible values and runs the same propagation as
+# assign() / eliminate() (naked singles and hidden singles) on the whole batch with array operations
+# only the puzzles that propagation can't finish are searched one by one with bitsolver.search()
+# requires numpy
+
+import numpy as np
+
+import bitsolver
+from solver import digits, squares, unitlist
+
+# puzzles propagated at once -> limits memory of the (N, 27, 9, 9) unit arrays
+BATCH_SIZE = 1024
+
+# index matrices built from the square names in solver.py
+_index = dict((s, i) for i, s in enumerate(squares))
+# units as (27, 9) array of square indexes
+UNITS = np.array([[_index[s] for s in u] for u in unitlist])
+# for each square the 3 units that contain it and the position of the square in them, both (81, 3)
+UNIT_OF = np.array([[k for k in range(27) if i in UNITS[k]] for i in range(81)])
+POS_IN = np.array([[list(UNITS[k]).index(i) for k in UNIT_OF[i]] for i in range(81)])
+
+# bit value of each digit (for converting to bitsolver values)
+BITS = 1 << np.arange(9)
+
+def load(grids):
+    # converts grid strings to a (N, 81) array of digits (0 = empty square)
+    rows = []
+    for grid in grids:
+        # same characters as grid_values() accepts, missing squares are empty
+        chars = "".join(bitsolver.grid_chars(grid)).replace(".", "0")
+        rows.append(chars.ljust(81, "0"))
+    return (np.frombuffer("".join(rows).encode(), dtype=np.uint8).reshape(len(rows), 81) - ord("0")).astype(np.int8)
+
+def candidates(puzzles):
+    # (N, 81) digits -> (N, 81, 9) possible values, input squares have only their digit possible
+    cand = np.ones(puzzles.shape + (9,), dtype=bool)
+    filled = puzzles > 0
+    cand[filled] = np.arange(1, 10) == puzzles[filled][:, None]
+    return cand
+
+def enough_clues(puzzles):
+    # same rule as solver.enough_clues() -> at least 17 input digits and 8 different digits
+    used = (puzzles[:, :, None] == np.arange(1, 10)).any(1)
+    return ((puzzles > 0).sum(1) >= 17) & (used.sum(1) >= 8)
+
+def propagate(cand):
+    # eliminates naked singles from peers and places hidden singles until nothing changes
+    # cand is changed in place, returns (N,) array of puzzles with a contradiction
+    bad = np.zeros(len(cand), dtype=bool)
+    # puzzles that changed in the last round
+    active = np.arange(len(cand))
+
+    while len(active):
+        c = cand[active]
+
+        # squares with one possible value -> remove their digit from all peers
+        # (digits placed in each unit are removed from the unit's squares, each single square keeps its own digit)
+        single = c & (c.sum(2) == 1)[:, :, None]
+        placed = single[:, UNITS, :].sum(2)                  # (n, 27, 9 digits)
+        new = (c & ~(placed > 0)[:, UNIT_OF, :].any(2)) | single
+
+        # digits with only one place in a unit -> that square gets the digit
+        in_units = new[:, UNITS, :]                          # (n, 27, 9 squares, 9 digits)
+        places = in_units.sum(2)                             # (n, 27, 9 digits)
+        only = in_units & (places == 1)[:, :, None, :]
+        hidden = only[:, UNIT_OF, POS_IN, :].any(2)          # (n, 81, 9)
+        has_hidden = hidden.any(2)
+        new = np.where(has_hidden[:, :, None], hidden, new)
+
+        # contradictions -> square without possible values, digit placed twice or without place in a unit
+        # or square that is the only place for two digits
+        contra = ((new.sum(2) == 0).any(1) | (placed > 1).any((1, 2)) | (places == 0).any((1, 2))
+                  | (hidden.sum(2) > 1).any(1))
+        bad[active[contra]] = True
+
+        changed = (new != c).any((1, 2)) & ~contra
+        cand[active] = new
+        active = active[changed]
+
+    return bad
+
+def to_solution(cand_row):
+    # (81, 9) solved candidates -> solution dict (same format as solver.solve())
+    return dict(zip(squares, (digits[i] for i in cand_row.argmax(1))))
+
+def solve_batch(grids):
+    # solve a list of grids, returns list of results in the same format as solver.solve()
+    # (solution dict, False for no solution, 2 for multiple solutions or too few input digits)
+    results = []
+    for start in range(0, len(grids), BATCH_SIZE):
+        results.extend(_solve_batch(grids[start:start + BATCH_SIZE]))
+    return results
+
+def _solve_batch(grids):
+    puzzles = load(grids)
+    cand = candidates(puzzles)
+    bad = propagate(cand)
+    clues = enough_clues(puzzles)
+    solved = (cand.sum(2) == 1).all(1)
+
+    results = []
+    for i in range(len(grids)):
+        if bad[i]:
+            results.append(False)
+        elif not clues[i]:
+            results.append(2)
+        elif solved[i]:
+            results.append(to_solution(cand[i]))
+        else:
+            # propagation wasn't enough -> search from the propagated state
+            answer = bitsolver.search([int(v) for v in (cand[i] * BITS).sum(1)])
+            if answer is False or answer == 2:
+                results.append(answer)
+            else:
+                results.append(bitsolver.to_solution(answer))
+    return results
+
+def solve(grid):
+    # solve one puzzle (same contract as solver.solve())
+    return solve_batch([grid])[0]
@@ -0,0 +1,455 @@
+# HTTP / JSON service for the solver and generator (standard library only, doesn't import the GUI)
+# usage: python server.py [--host 127.0.0.1] [--port 8080] [--workers N] [--engine strings|bits|dlx]
+#                        [--queue-size N] [--batch-size N] [--batch-wait MS] [--timeout MS] [--max-nodes N]
+# endpoints (POST with JSON body, a single puzzle or a list of them):
+#   /solve     {"puzzle": "..."} or {"puzzles": [...]} -> {"status": ..., "solution": ...} or {"results": [...]}
+#   /validate  same input -> {"status": ..., "unique": true / false}
+#   /count     same input and "limit" (default 1000) -> {"count": n, "limit": limit}
+#   /generate  {"count": n, "seed": ...} -> {"puzzles": [...]} (same seed gives the same puzzles)
+#   GET /health, GET /metrics
+# every request can set "deadline_ms" (default --timeout) -> 504 when its results aren't ready in time
+# every puzzle of a request is one job, jobs wait in a bounded queue -> 503 when it can't take all jobs of a request
+# a batcher takes the jobs waiting in the queue (up to --batch-size, waiting at most --batch-wait for more)
+# and runs them in a worker process pool, so the event loop never runs a search itself
+# (there is at most one batch for every worker process, jobs that come meanwhile are batched together)
+# every job is searched with a solver.Budget of its request's deadline (and --max-nodes search nodes)
+# -> a worker stops a search nobody waits for anymore, solve / validate give status "budget exceeded"
+#    and count / generate a 504 (deadline) or 422 (node budget) when the budget runs out
+# a batch whose worker process dies (or that can't be sent to the pool) fails with 500 and the pool is started
+# again, GET /health answers 503 while the batcher is stopped or the pool is broken
+
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+from concurrent.futures.process import BrokenProcessPool
+import json
+import os
+import sys
+import time
+
+import solver
+from solver import digits, squares
+
+# jobs of one batch are run by these functions in the worker process -> (argument, engine, budget) -> JSON result
+def _solve(puzzle, engine, budget):
+    result = solver.solve_grid(puzzle, backend=engine, budget=budget)
+    solution = "".join(result.solution[s] for s in squares) if result.solution else None
+    return {"status": result.status, "solution": solution}
+
+def _validate(puzzle, engine, budget):
+    status = solver.solve_grid(puzzle, backend=engine, budget=budget).status
+    return {"status": status, "unique": status == solver.UNIQUE}
+
+def _count(task, engine, budget):
+    puzzle, limit = task
+    return {"count": solver.count_solutions(puzzle, limit, backend=engine, budget=budget), "limit": limit}
+
+def _generate(seed, engine, budget):
+    # puzzles are always generated with the strings backend (the fastest generator)
+    return solver.generator(rng=seed, budget=budget)
+
+OPERATIONS = {"solve": _solve, "validate": _validate, "count": _count, "generate": _generate}
+
+# limit of solutions counted by /count when the request doesn't set one
+COUNT_LIMIT = 1000
+
+# biggest request body in bytes
+MAX_BODY = 1 << 20
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large",
+           422: "Unprocessable Entity",
+           500: "Internal Server Error", 503: "Service Unavailable", 504: "Gateway Timeout"}
+
+def run_batch(task):
+    # worker process -> results of one batch of (operation, argument, deadline) jobs as (result, error) pairs
+    # error = (HTTP status, message) or None, deadline = time.monotonic() value (the event loop's clock)
+    engine, max_nodes, jobs = task
+    results = []
+    for op, arg, deadline in jobs:
+        budget = solver.Budget(max_nodes, deadline=deadline)
+        try:
+            results.append((OPERATIONS[op](arg, engine, budget), None))
+        except solver.BudgetExceeded:
+            status = 504 if budget.reason == "deadline" else 422
+            results.append((None, (status, "search budget exceeded (%s)" % budget.reason)))
+        except Exception as e:
+            results.append((None, (500, "%s: %s" % (type(e).__name__, e))))
+    return results
+
+def pool_broken(pool):
+    # True when a worker process of the pool died -> the pool can't run anything anymore
+    # the executor only says so by raising BrokenProcessPool on submit() -> _broken (reason or False) is a CPython
+    # internal, without it a broken pool is found on the next submit() (which fails that batch)
+    return bool(getattr(pool, "_broken", False))
+
+def percentile(values, q):
+    # q-th percentile (nearest rank) of values, None for no values
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q / 100 * len(values)))]
+
+class HttpError(Exception):
+    # request that gets an error response (status code and message)
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+class Job:
+    # one puzzle (or generated puzzle) of a request, future gets the result
+    __slots__ = ("op", "arg", "deadline", "future")
+
+    def __init__(self, op, arg, deadline, future):
+        self.op = op
+        self.arg = arg
+        self.deadline = deadline
+        self.future = future
+
+class Metrics:
+    # counters and latencies of the last requests for /metrics
+
+    def __init__(self, window=10000):
+        self.started = time.time()
+        self.requests = collections.Counter()       # requests by endpoint
+        self.responses = collections.Counter()      # responses by status code
+        self.jobs = 0
+        self.batches = 0
+        self.expired = 0                            # jobs dropped because their deadline passed in the queue
+        self.failed_batches = 0                     # batches lost with a worker process or the pool
+        self.pool_restarts = 0
+        self.latencies = collections.deque(maxlen=window)
+
+    def snapshot(self, service):
+        latencies = list(self.latencies)
+        return {"uptime": round(time.time() - self.started, 3),
+                "requests": dict(self.requests),
+                "responses": dict((str(code), n) for code, n in self.responses.items()),
+                "jobs": self.jobs, "batches": self.batches, "expired": self.expired,
+                "mean_batch_size": round(self.jobs / self.batches, 2) if self.batches else None,
+                "queue": service.queue.qsize(), "queue_size": service.queue.maxsize,
+                "running_batches": service.running,
+                "failed_batches": self.failed_batches, "pool_restarts": self.pool_restarts,
+                "latency_ms": {"p50": _ms(percentile(latencies, 50)), "p99": _ms(percentile(latencies, 99)),
+                               "max": _ms(max(latencies) if latencies else None)}}
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 3)
+
+class Service:
+    # queue, batcher and worker pool behind the HTTP endpoints
+
+    def __init__(self, workers=None, engine="bits", queue_size=1024, batch_size=64, batch_wait=0.002, timeout=5.0,
+                 max_nodes=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.engine = engine
+        self.max_nodes = max_nodes
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.timeout = timeout
+        self.queue = asyncio.Queue(queue_size)
+        self.running = 0
+        self.metrics = Metrics()
+        self.pool = None
+        self.batcher = None
+
+    async def start(self):
+        self.pool = concurrent.futures.ProcessPoolExecutor(self.workers)
+        self.slots = asyncio.Semaphore(self.workers)
+        self.batcher = asyncio.ensure_future(self._batches())
+        self.batcher.add_done_callback(self._batcher_stopped)
+
+    def _batcher_stopped(self, task):
+        # the batcher only ends when it is cancelled by close() -> anything else is logged (/health reports it)
+        if not task.cancelled() and task.exception() is not None:
+            sys.stderr.write("batcher stopped: %s: %s\n" % (type(task.exception()).__name__, task.exception()))
+
+    def problem(self):
+        # why the service can't run jobs right now, None when it can
+        if self.batcher is None or self.batcher.done():
+            return "batcher stopped"
+        if pool_broken(self.pool):
+            return "worker pool broken"
+        return None
+
+    def _restart_pool(self, pool):
+        # a broken pool (a worker process died) can't run anything anymore -> new pool with new workers
+        # (several failed batches can report the same pool, only the first one replaces it)
+        if pool is not self.pool:
+            return
+        sys.stderr.write("restarting worker pool\n")
+        pool.shutdown(wait=False, cancel_futures=True)
+        self.pool = concurrent.futures.ProcessPoolExecutor(self.workers)
+        self.metrics.pool_restarts += 1
+
+    async def close(self):
+        self.batcher.cancel()
+        try:
+            await self.batcher
+        except (asyncio.CancelledError, Exception):
+            # a batcher that stopped with an error was already logged
+            pass
+        self.pool.shutdown(cancel_futures=True)
+
+    async def run(self, op, args, deadline):
+        # queue one job for each argument and wait for all their results (in the same order)
+        if self.batcher.done():
+            raise HttpError(503, "batcher stopped")
+        if len(args) > self.queue.maxsize:
+            raise HttpError(413, "too many puzzles in one request (at most %d)" % self.queue.maxsize)
+        if self.queue.maxsize - self.queue.qsize() < len(args):
+            # backpressure -> the client should retry later
+            raise HttpError(503, "server is busy, queue is full")
+        loop = asyncio.get_running_loop()
+        jobs = [Job(op, arg, deadline, loop.create_future()) for arg in args]
+        for job in jobs:
+            self.queue.put_nowait(job)
+        try:
+            return await asyncio.wait_for(asyncio.gather(*(job.future for job in jobs)), deadline - loop.time())
+        except asyncio.TimeoutError:
+            raise HttpError(504, "deadline exceeded")
+
+    async def _batches(self):
+        # takes a free worker, then the next jobs from the queue -> one batch in the pool
+        loop = asyncio.get_running_loop()
+        while True:
+            await self.slots.acquire()
+            batch = [await self.queue.get()]
+            end = loop.time() + self.batch_wait
+            while len(batch) < self.batch_size:
+                if self.queue.empty():
+                    wait = end - loop.time()
+                    if wait <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self.queue.get(), wait))
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    batch.append(self.queue.get_nowait())
+
+            # requests that already timed out (their futures are cancelled) or will time out aren't run
+            now = loop.time()
+            live = [job for job in batch if not job.future.done() and job.deadline > now]
+            self.metrics.expired += len(batch) - len(live)
+            if not live:
+                self.slots.release()
+                continue
+
+            self.metrics.jobs += len(live)
+            self.metrics.batches += 1
+            self.running += 1
+            jobs = [(job.op, job.arg, job.deadline) for job in live]
+            if pool_broken(self.pool):
+                # a worker died while the pool was idle
+                self._restart_pool(self.pool)
+            pool = self.pool
+            try:
+                task = loop.run_in_executor(pool, run_batch, (self.engine, self.max_nodes, jobs))
+            except Exception as e:
+                # the pool broke after the check above or can't take jobs -> this batch fails, the batcher goes on
+                task = loop.create_future()
+                task.set_exception(e)
+            task.add_done_callback(lambda task, live=live, pool=pool: self._finish(live, task, pool))
+
+    def _finish(self, jobs, task, pool):
+        # results of a batch -> futures of its jobs
+        self.running -= 1
+        self.slots.release()
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            self.metrics.failed_batches += 1
+            sys.stderr.write("batch of %d jobs failed: %s: %s\n" % (len(jobs), type(error).__name__, error))
+            if isinstance(error, BrokenProcessPool):
+                self._restart_pool(pool)
+        results = [(None, (500, "worker failed: %s" % error))] * len(jobs) if error is not None else task.result()
+        for job, (result, error) in zip(jobs, results):
+            if job.future.done():
+                continue
+            if error is not None:
+                job.future.set_exception(HttpError(*error))
+            else:
+                job.future.set_result(result)
+
+    # endpoints -> (status code, JSON object)
+
+    def deadline(self, body):
+        # time of the event loop when the request's results have to be ready
+        deadline_ms = body.get("deadline_ms")
+        if deadline_ms is None:
+            timeout = self.timeout
+        elif isinstance(deadline_ms, (int, float)) and not isinstance(deadline_ms, bool) and deadline_ms > 0:
+            timeout = deadline_ms / 1000
+        else:
+            raise HttpError(400, "deadline_ms has to be a positive number")
+        return asyncio.get_running_loop().time() + timeout
+
+    async def puzzle_endpoint(self, op, body):
+        # /solve, /validate, /count -> "puzzle" (one result) or "puzzles" (list of results)
+        single = "puzzle" in body
+        puzzles = [body["puzzle"]] if single else body.get("puzzles")
+        if not isinstance(puzzles, list) or not puzzles:
+            raise HttpError(400, "expected \"puzzle\" or a non-empty list \"puzzles\"")
+        for i, puzzle in enumerate(puzzles):
+            if not isinstance(puzzle, str) or sum(1 for c in puzzle if c in digits or c in "0.") != 81:
+                raise HttpError(400, "puzzle %d doesn't have 81 squares" % i)
+        args = puzzles
+        if op == "count":
+            limit = body.get("limit", COUNT_LIMIT)
+            if not isinstance(limit, int) or isinstance(limit, bool) or limit < 1:
+                raise HttpError(400, "limit has to be a positive integer")
+            args = [(puzzle, limit) for puzzle in puzzles]
+
+        results = await self.run(op, args, self.deadline(body))
+        return results[0] if single else {"results": results}
+
+    async def generate_endpoint(self, body):
+        count = body.get("count", 1)
+        if not isinstance(count, int) or isinstance(count, bool) or count < 1:
+            raise HttpError(400, "count has to be a positive integer")
+        if count > self.queue.maxsize:
+            # checked before the seeds are made -> a huge count can't hold up the event loop
+            raise HttpError(413, "too many puzzles in one request (at most %d)" % self.queue.maxsize)
+        seed = body.get("seed")
+        if seed is not None and not isinstance(seed, (int, str)):
+            raise HttpError(400, "seed has to be an integer or a string")
+        # every puzzle gets its own seed derived from the request seed (same as generate.py chunks)
+        seeds = [None if seed is None else "%s:%d" % (seed, i) for i in range(count)]
+        return {"puzzles": await self.run("generate", seeds, self.deadline(body))}
+
+    async def dispatch(self, method, path, body):
+        path = path.split("?", 1)[0]
+        if path in ("/health", "/metrics"):
+            if method != "GET":
+                raise HttpError(405, "use GET")
+            if path == "/health":
+                problem = self.problem()
+                if problem is not None:
+                    raise HttpError(503, problem)
+                return {"status": "ok", "workers": self.workers, "queue": self.queue.qsize()}
+            return self.metrics.snapshot(self)
+
+        op = path.strip("/")
+        if op not in OPERATIONS:
+            raise HttpError(404, "unknown endpoint %s" % path)
+        if method != "POST":
+            raise HttpError(405, "use POST")
+        try:
+            body = json.loads(body or b"{}")
+        except ValueError:
+            raise HttpError(400, "body isn't valid JSON")
+        if not isinstance(body, dict):
+            raise HttpError(400, "body has to be a JSON object")
+        if op == "generate":
+            return await self.generate_endpoint(body)
+        return await self.puzzle_endpoint(op, body)
+
+    # HTTP/1.1 with keep-alive, only what the endpoints need (Content-Length bodies)
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except HttpError as e:
+                    await write_response(writer, e.status, {"error": str(e)}, False)
+                    break
+                if request is None:
+                    break
+                method, path, keep_alive, body = request
+
+                start = time.perf_counter()
+                endpoint = path.split("?", 1)[0]
+                self.metrics.requests[endpoint] += 1
+                try:
+                    status, payload = 200, await self.dispatch(method, path, body)
+                except HttpError as e:
+                    status, payload = e.status, {"error": str(e)}
+                self.metrics.responses[status] += 1
+                if status == 200:
+                    self.metrics.latencies.append(time.perf_counter() - start)
+
+                await write_response(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+async def read_request(reader):
+    # next request of the connection -> (method, path, keep alive, body), None when the client closed it
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, path, version = line.decode("latin-1").split()
+    except ValueError:
+        raise HttpError(400, "bad request line")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise HttpError(400, "bad Content-Length")
+    if length > MAX_BODY:
+        raise HttpError(413, "body too large")
+    body = await reader.readexactly(length) if length else b""
+
+    connection = headers.get("connection", "").lower()
+    keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+    return method, path, keep_alive, body
+
+async def write_response(writer, status, payload, keep_alive):
+    body = json.dumps(payload).encode()
+    head = ("HTTP/1.1 %d %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\n"
+            % (status, REASONS.get(status, ""), len(body)))
+    if status == 503:
+        head += "Retry-After: 1\r\n"
+    head += "Connection: %s\r\n\r\n" % ("keep-alive" if keep_alive else "close")
+    writer.write(head.encode("latin-1") + body)
+    await writer.drain()
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="HTTP / JSON service for solving and generating sudoku.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8080, help="port to listen on (default: 8080)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: number of CPUs)")
+    parser.add_argument("--engine", choices=sorted(solver.BACKENDS), default="bits",
+                        help="solver backend used by solve, validate and count (default: bits)")
+    parser.add_argument("--queue-size", type=int, default=1024, help="puzzles that can wait for a worker (default: 1024)")
+    parser.add_argument("--batch-size", type=int, default=64, help="most puzzles sent to a worker at once (default: 64)")
+    parser.add_argument("--batch-wait", type=float, default=2, help="ms a batch waits for more puzzles (default: 2)")
+    parser.add_argument("--timeout", type=float, default=5000, help="deadline of requests without deadline_ms (default: 5000 ms)")
+    parser.add_argument("--max-nodes", type=int, default=None, help="search nodes of one puzzle (default: no limit)")
+    return parser.parse_args(argv)
+
+async def serve(args):
+    service = Service(args.workers, args.engine, args.queue_size, args.batch_size, args.batch_wait / 1000,
+                      args.timeout / 1000, args.max_nodes)
+    await service.start()
+    server = await asyncio.start_server(service.handle, args.host, args.port)
+    sys.stderr.write("listening on http://%s:%d (%d workers, engine %s)\n" % (args.host, args.port, service.workers, args.engine))
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,785 @@
+# Sudoku solver and generator (headless, no GUI imports)
+# Jiri Kruchina, I.rocnik
+# zimni semestr 2022/23
+
+import collections
+import contextlib
+import importlib
+import itertools
+import random
+import threading
+import time
+
+def square_gen(A,B):
+    # takes rows and columns and outputs list of square names in them
+    return [a+b for a in A for b in B]
+
+cols = '123456789'
+rows = 'ABCDEFGHI'
+
+digits = '123456789'
+# list of all square names (each is a string with a letter and a digit)
+squares = square_gen(rows, cols)
+
+# list of all units (rows, cols, 3x3 squares)
+unitlist = ([square_gen(rows, c) for c in cols] +        # rows
+            [square_gen(r, cols) for r in rows] +        # columns
+            [square_gen(rs, cs) for rs in ('ABC','DEF','GHI') for cs in ('123','456','789')])        # squares
+
+# dictionary where each square maps to the list of units that contain the square
+units = dict((s, [u for u in unitlist if s in u]) for s in squares)
+
+# dictionary where each square s maps to the set of squares formed by the union of the squares in the units of s, but not s itself
+# squares that could affect certain square (set of squares in rows, cols and square) -> 20 peers for each square
+# sum combines the lists
+peers = dict((s, set(sum(units[s],[]))-set([s])) for s in squares)
+
+# grid =  the initial state of a puzzle in text format
+# values = dict with all the remaining possible values for each square
+
+# status of a solved grid
+UNIQUE = "unique"                   # exactly one solution
+MULTIPLE = "multiple"               # two or more solutions
+NONE = "none"                       # no solution
+TOO_FEW_CLUES = "too few clues"     # less than 17 input digits or 8 different digits
+BUDGET_EXCEEDED = "budget exceeded" # search stopped by its Budget (node budget, deadline or cancellation)
+
+# result of solve_grid() -> status, solution dict (None if status isn't UNIQUE), solving time in seconds
+# and instrumentation counters (dict, None if the solve wasn't instrumented)
+SolveResult = collections.namedtuple("SolveResult", ["status", "solution", "elapsed", "stats"], defaults=[None])
+
+# instrumentation counters (stats dicts)
+# assign / eliminate = calls, contradictions = squares or unit places left empty by eliminate(),
+# nodes = search nodes, backtracks = tried digits that failed, max_depth = deepest search node,
+# parse_time / propagate_time / search_time = seconds spent reading the grid, assigning input digits and searching
+STAT_COUNTERS = ("assign", "eliminate", "contradictions", "nodes", "backtracks", "max_depth")
+STAT_TIMES = ("parse_time", "propagate_time", "search_time")
+
+def new_stats():
+    # stats dict with all counters at zero
+    stats = dict((key, 0) for key in STAT_COUNTERS)
+    stats.update((key, 0.0) for key in STAT_TIMES)
+    return stats
+
+def add_stats(total, stats):
+    # add counters of stats to total (max_depth is the maximum of both), returns total
+    for key, value in stats.items():
+        if key == "max_depth":
+            total[key] = max(total.get(key, 0), value)
+        else:
+            total[key] = total.get(key, 0) + value
+    return total
+
+# collectors of the running collect_stats() blocks, separate for each thread
+_collectors = threading.local()
+
+@contextlib.contextmanager
+def collect_stats(callback=None):
+    # instruments every solve_grid() / solve() of this thread inside the with block
+    # -> yields a stats dict with counters summed over all solves, callback(stats) gets the stats of each solve
+    # (use the callback to send them to a metrics system)
+    total = new_stats()
+    outer = getattr(_collectors, "active", ())
+    _collectors.active = outer + ((total, callback),)
+    try:
+        yield total
+    finally:
+        _collectors.active = outer
+
+class CancelToken:
+    # cooperative cancellation -> cancel() from any thread, searches using a Budget with this token stop at their next node
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+class BudgetExceeded(Exception):
+    # raised by a search when its Budget ran out (budget.reason says which limit was hit)
+    # stats = counters of the search up to that point (search nodes and time at least)
+    # solve_grid() returns status BUDGET_EXCEEDED instead, solve(), count_solutions() and the generators raise it
+
+    def __init__(self, stats=None):
+        super().__init__("search budget exceeded")
+        self.stats = stats
+
+class Budget:
+    # limits of a search -> max_nodes search nodes, timeout seconds from now or deadline (time.monotonic() value)
+    # and a CancelToken, all checked at every search node (None = no limit)
+    # one Budget can be shared by several searches, for example all uniqueness checks of a generator
+
+    def __init__(self, max_nodes=None, timeout=None, deadline=None, cancel=None):
+        self.started = time.monotonic()
+        if timeout is not None:
+            end = self.started + timeout
+            deadline = end if deadline is None else min(deadline, end)
+        self.max_nodes = max_nodes
+        self.deadline = deadline
+        self.cancel = cancel
+        self.nodes = 0
+        self.reason = None      # "nodes", "deadline" or "cancelled" once the budget ran out
+
+    def charge(self):
+        # one more search node, raises BudgetExceeded when a limit is hit
+        self.nodes += 1
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            # the node over the budget isn't searched
+            self.nodes -= 1
+            self.reason = "nodes"
+            raise BudgetExceeded(self.partial_stats())
+        self.check()
+
+    def check(self):
+        # deadline and cancellation only (no node is counted) -> for work between searches, raises BudgetExceeded
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            self.reason = "deadline"
+        elif self.cancel is not None and self.cancel.cancelled:
+            self.reason = "cancelled"
+        else:
+            return
+        raise BudgetExceeded(self.partial_stats())
+
+    def partial_stats(self):
+        # stats dict with the search nodes and time used so far
+        stats = new_stats()
+        stats["nodes"] = self.nodes
+        stats["search_time"] = time.monotonic() - self.started
+        return stats
+
+def start_stats(instrument=False):
+    # stats dict for one solve when it is instrumented (instrument=True or inside a collect_stats() block), else None
+    if instrument or getattr(_collectors, "active", ()):
+        return new_stats()
+    return None
+
+def report_stats(stats):
+    # stats of one finished solve -> summed into every running collect_stats() block of this thread
+    for total, callback in getattr(_collectors, "active", ()):
+        add_stats(total, stats)
+        if callback is not None:
+            callback(stats)
+
+def _init_stats(stats):
+    # make sure all counters exist (stats can be any dict, for example an empty one)
+    for key in STAT_COUNTERS + STAT_TIMES:
+        stats.setdefault(key, 0)
+
+# perses an input grid (assigns all input digits)
+# stats = dict where the instrumentation counters are added (see new_stats()), or None
+def grid_parser(grid, stats=None):
+    values = parse_values(grid, stats)
+    if values is False:
+        return False
+
+    if not enough_clues(grid):
+        return 2
+
+    return values
+
+def parse_values(grid, stats=None):
+    # assigns all input digits without checking their count, returns values or False
+    if stats is not None:
+        _init_stats(stats)
+        start = time.perf_counter()
+
+    # each square can be initially all digits
+    values = dict((s, digits) for s in squares)
+    input_values = grid_values(grid)
+
+    if stats is not None:
+        propagate_start = time.perf_counter()
+        stats["parse_time"] += propagate_start - start
+
+    # go through dict of input gird, s = each square, d = input digit
+    for s, d in input_values.items():
+        if d in digits:
+            if not assign(values, s, d, None, None, stats):
+                # we can't assign d to square s -> bad sudoku input puzzle (for example two same digits in one unit -> unsolvable)
+                values = False
+                break
+
+    if stats is not None:
+        stats["propagate_time"] += time.perf_counter() - propagate_start
+    return values
+
+def enough_clues(grid):
+    # the minimum number of cells that need to be populated to generate a solvable Sudoku is 17
+    # also there need to be at least 8 different digits (so at maximum one unused) to have an unique solution
+    input_digs = [d for d in grid_values(grid).values() if d in digits]
+    return len(input_digs) >= 17 and len(set(input_digs)) >= 8
+
+def grid_values(grid):
+    # go through input grid and save all numbers or blank spaces (0, .), ignore all other characters
+    chars = [c for c in grid if c in digits or c in "0."]
+    # zip -> create tuples, takes i-th element from each list ==> assigns each square a digit from input
+    return dict(zip(squares, chars))
+
+
+def assign(values, s, d, trail=None, counts=None, stats=None):
+    # set square s to input digit d, returns values or False (contradiction)
+    # trail = list where every change of values is recorded (square, old value, eliminated digit) so it can be undone, or None
+    # counts = Counts kept up to date with every eliminated digit, or None
+    # stats = dict of instrumentation counters, or None
+    # without any of them the plain functions run (no checks for them on the hot path)
+    if trail is None and counts is None and stats is None:
+        return _assign(values, s, d)
+    return _assign_tracked(values, s, d, trail, counts, stats)
+
+def eliminate(values, s, d, trail=None, counts=None, stats=None):
+    # d is eliminated from possible values of square s (same arguments as assign())
+    if trail is None and counts is None and stats is None:
+        return _eliminate(values, s, d)
+    return _eliminate_tracked(values, s, d, trail, counts, stats)
+
+def _assign(values, s, d):
+    # all possible values except input digit d for square s
+    other_values = values[s].replace(d, "")
+    # call eliminate function on all other values which are now not gonna be possible -> propagate to units
+    if all(_eliminate(values, s, d2) for d2 in other_values):
+        return values
+    else:
+        # contradiction detected (at least one elimination failed)
+        return False
+
+
+def _eliminate(values, s, d):
+    # d is eliminated from possible values of square s, propagate when values or places <= 2
+
+    # digit d already eliminated, we're done
+    if d not in values[s]:
+        return values
+
+    # remove digit d from possible values of square s
+    values[s] = values[s].replace(d, "")
+
+    if len(values[s]) == 0:
+        # contradiction -> last possible value was removed -> there is no digit suitable for this square
+        return False
+    elif len(values[s]) == 1:
+        # square s is reduced to one value d2 -> eliminate d2 from peers
+        d2 = values[s]
+        if not all(_eliminate(values, s2, d2) for s2 in peers[s]):
+            return False
+
+    for u in units[s]:
+        # list of all places (squares) where digit d is a possible value that are in units containing square s (possible affected squares)
+        dplaces = [s for s in u if d in values[s]]
+        if len(dplaces) == 0:
+            # contradiction -> no place for this value
+            return False
+        elif len(dplaces) == 1:
+            # digit d is a possible value for only one square -> place it there
+            if not _assign(values, dplaces[0], d):
+                return False
+
+    return values
+
+def _assign_tracked(values, s, d, trail, counts, stats):
+    # _assign() that also records its changes on the trail, updates the counts and counts the calls
+    if stats is not None:
+        stats["assign"] += 1
+
+    other_values = values[s].replace(d, "")
+    if all(_eliminate_tracked(values, s, d2, trail, counts, stats) for d2 in other_values):
+        return values
+    else:
+        return False
+
+
+def _eliminate_tracked(values, s, d, trail, counts, stats):
+    # _eliminate() with the trail, counts and stats of _assign_tracked()
+    if stats is not None:
+        stats["eliminate"] += 1
+
+    if d not in values[s]:
+        return values
+
+    # remember old value (and the eliminated digit) so the change can be undone
+    if trail is not None:
+        trail.append((s, values[s], d))
+    if counts is not None:
+        counts.remove(s, d, len(values[s]))
+
+    values[s] = values[s].replace(d, "")
+
+    if len(values[s]) == 0:
+        if stats is not None:
+            stats["contradictions"] += 1
+        return False
+    elif len(values[s]) == 1:
+        d2 = values[s]
+        if not all(_eliminate_tracked(values, s2, d2, trail, counts, stats) for s2 in peers[s]):
+            return False
+
+    for u in units[s]:
+        dplaces = [s for s in u if d in values[s]]
+        if len(dplaces) == 0:
+            if stats is not None:
+                stats["contradictions"] += 1
+            return False
+        elif len(dplaces) == 1:
+            if not _assign_tracked(values, dplaces[0], d, trail, counts, stats):
+                return False
+
+    return values
+
+def undo(values, trail, mark, counts=None):
+    # roll values back to the state when the trail had mark items
+    while len(trail) > mark:
+        s, old, d = trail.pop()
+        if counts is not None:
+            counts.restore(s, d, len(old))
+        values[s] = old
+
+# bit of every square in the Counts size masks (bit order = order of the square names -> lowest bit = min() square)
+_square_bit = dict((s, 1 << i) for i, s in enumerate(squares))
+
+class Counts:
+    # candidate counts that eliminate() keeps up to date while searching
+    # -> the search chooses its square and orders the digits without going through the whole board
+    # log = list where every change is recorded so rollback() can undo it (copy mode),
+    # None when undo() restores the counts from the trail (trail mode)
+
+    def __init__(self, values, log=None):
+        # number of squares where each digit is still possible
+        self.freq = dict((d, 0) for d in digits)
+        # squares by their number of possible values, as masks of square bits
+        self.sizes = [0] * 10
+        for s in squares:
+            for d in values[s]:
+                self.freq[d] += 1
+            self.sizes[len(values[s])] |= _square_bit[s]
+        self.log = log
+
+    def remove(self, s, d, n):
+        # digit d was eliminated from square s that had n possible values
+        self.freq[d] -= 1
+        bit = _square_bit[s]
+        self.sizes[n] ^= bit
+        self.sizes[n - 1] |= bit
+        if self.log is not None:
+            self.log.append((s, d, n))
+
+    def restore(self, s, d, n):
+        # digit d was put back to square s that has n possible values again
+        self.freq[d] += 1
+        bit = _square_bit[s]
+        self.sizes[n - 1] ^= bit
+        self.sizes[n] |= bit
+
+    def rollback(self, mark):
+        # undo the logged changes until the log has mark items (restore() inlined, this runs for every change)
+        log, freq, sizes = self.log, self.freq, self.sizes
+        while len(log) > mark:
+            s, d, n = log.pop()
+            freq[d] += 1
+            bit = _square_bit[s]
+            sizes[n - 1] ^= bit
+            sizes[n] |= bit
+
+    def choose_square(self):
+        # square with the fewest possible values above 1 (same one as min() in the board scan), None if solved
+        for n in range(2, 10):
+            mask = self.sizes[n]
+            if mask:
+                return squares[(mask & -mask).bit_length() - 1]
+        return None
+
+    def order_values(self, vals):
+        # digits of vals sorted by their frequency (lowest first), same order as order_values()
+        return sorted(vals, key=self.freq.__getitem__)
+
+# solver engines that can be chosen with backend= and the module of each one (imported when first used)
+# strings = this module, bits = 9-bit candidates, dlx = exact cover (Algorithm X)
+BACKENDS = {"strings": None, "bits": "bitsolver", "dlx": "dlx"}
+
+def get_backend(backend):
+    # module of the chosen backend, None for this module
+    if backend not in BACKENDS:
+        raise ValueError("unknown backend: %r" % (backend,))
+    if BACKENDS[backend] is None:
+        return None
+    return importlib.import_module(BACKENDS[backend])
+
+# function to solve sudoku -> first it parses the input grid and then it searches for a solution
+# all search state is kept in the call (no globals) -> can be used from more threads at once
+# mode and ordering are used only by the strings backend
+# instrument = count assign / eliminate calls, search nodes... and return them in result.stats
+# (also done for all solves inside a collect_stats() block), the bits and dlx backends count search nodes,
+# backtracks, max depth and phase times (their assign / eliminate / contradictions counters stay 0)
+# budget = Budget that limits the search -> status BUDGET_EXCEEDED with the stats collected so far when it runs out
+def solve_grid(grid, mode="copy", ordering="scan", backend="strings", instrument=False, budget=None):
+    module = get_backend(backend)
+    if module is not None:
+        return module.solve_grid(grid, budget, instrument)
+
+    stats = start_stats(instrument)
+
+    start = time.perf_counter()
+    values = grid_parser(grid, stats)
+    search_start = time.perf_counter()
+    try:
+        answer = search(values, mode, stats, ordering, budget)
+        status = result_status(values, answer)
+    except BudgetExceeded as e:
+        answer = None
+        status = BUDGET_EXCEEDED
+        if stats is None:
+            # not instrumented -> the budget's own node count (search time is added below)
+            stats = e.stats
+            stats["search_time"] = 0.0
+    end = time.perf_counter()
+
+    if stats is not None:
+        stats["search_time"] += end - search_start
+        report_stats(stats)
+    return SolveResult(status, answer if status == UNIQUE else None, end - start, stats)
+
+def result_status(values, answer):
+    # status of a grid from its parsed values and the output of search() on them
+    if values is False or answer is False:
+        # parsing failed or search found no solution
+        return NONE
+    elif values == 2:
+        # parsing already checked there are not enough input digits
+        return TOO_FEW_CLUES
+    elif answer == 2:
+        return MULTIPLE
+    return UNIQUE
+
+def legacy_answer(result):
+    # converts SolveResult to the old return value of solve() -> solution dict, False (no solution) or 2 (multiple / too few digits)
+    # the old return value has nothing for BUDGET_EXCEEDED -> BudgetExceeded is raised
+    if result.status == BUDGET_EXCEEDED:
+        raise BudgetExceeded(result.stats)
+    if result.status == UNIQUE:
+        return result.solution
+    elif result.status == NONE:
+        return False
+    else:
+        return 2
+
+def solve(grid, mode="copy", ordering="scan", backend="strings", budget=None):
+    # old interface of solve_grid() -> solution dict, False or 2 (raises BudgetExceeded when budget runs out)
+    # (instrumented inside a collect_stats() block like solve_grid())
+    return legacy_answer(solve_grid(grid, mode, ordering, backend, budget=budget))
+
+# search modes
+# copy = every branch gets its own copy of values
+# trail = one values dict is changed in place, changes are recorded on a trail and undone when backtracking
+MODES = ("copy", "trail")
+
+# how the search chooses its square and orders the digits
+# scan = go through the whole board at every node (min() and order_values())
+# incremental = use Counts updated by eliminate()
+ORDERINGS = ("scan", "incremental")
+
+def search(values, mode="copy", stats=None, ordering="scan", budget=None):
+    # depth-first search from parsed values, returns solved values, False (no solution) or 2 (multiple solutions)
+    # stats = dict where the instrumentation counters (search nodes, backtracks...) are added, or None
+    # budget = Budget checked at every search node (raises BudgetExceeded), or None
+
+    if values is False:
+        # parsing already failed, bad sudoku
+        return False
+
+    elif values == 2:
+        # parsing already checked there are multiple or none solutions
+        return 2
+
+    # uniqueness check = search for at most 2 solutions (found solutions are state of this search only)
+    found = list(itertools.islice(_solutions(values, mode, stats, ordering, budget), 2))
+    if len(found) > 1:
+        # second solution found -> return 2 as an error
+        return 2
+    elif found:
+        return found[0]
+    else:
+        return False
+
+def _solutions(values, mode="copy", stats=None, ordering="scan", budget=None):
+    # generator of all solutions of parsed values with the chosen search mode and ordering
+    if stats is not None:
+        _init_stats(stats)
+    if ordering not in ORDERINGS:
+        raise ValueError("unknown ordering: %r" % (ordering,))
+    incremental = ordering == "incremental"
+
+    if mode == "copy":
+        # values are copied for every branch, counts are shared and rolled back with their own log
+        return _search(values, stats, Counts(values, []) if incremental else None, budget=budget)
+    elif mode == "trail":
+        # values are changed in place -> work on own copy so the caller's values stay untouched
+        # (undo() restores the counts together with the values)
+        return _search_trail(dict(values), [], stats, Counts(values) if incremental else None, budget=budget)
+    raise ValueError("unknown search mode: %r" % (mode,))
+
+def _branch(values, counts):
+    # square to branch on and its digits in the order to try them, (None, "") when values are solved
+    if counts is not None:
+        s = counts.choose_square()
+        if s is None:
+            return None, ""
+        return s, counts.order_values(values[s])
+
+    if all(len(values[s]) == 1 for s in squares):
+        # solved sudoku, each square has only one possible value
+        return None, ""
+
+    # find square s with the fewest possible values (n is the number of possible values) above 1 (empty square)
+    n, s = min((len(values[s]), s) for s in squares if len(values[s]) > 1)
+
+    # count frequencies of all possible digits in the sudoku and order them (lowest freq first)
+    # put digits in values[s] in this order of lowest frequency first -> better search
+    return s, order_values(values, s)
+
+def _search(values, stats=None, counts=None, depth=1, budget=None):
+    # generator of all solutions (solved values) in the order the depth-first search finds them
+    if budget is not None:
+        budget.charge()
+    if stats is not None:
+        stats["nodes"] += 1
+        if depth > stats["max_depth"]:
+            stats["max_depth"] = depth
+
+    s, s_ord_val = _branch(values, counts)
+    if s is None:
+        yield values
+        return
+
+    # create a new copy of values (so it doesnt affect the old one -> no need to track changes)
+    # try to assign possible values to square s
+    # and also immediately continue the search if assign doesnt return False -> DFS
+    # the search is lazy -> it stops when the caller doesn't want more solutions
+    for d in s_ord_val:
+        mark = len(counts.log) if counts is not None else 0
+        new_values = assign(values.copy(), s, d, None, counts, stats)
+        if new_values:
+            yield from _search(new_values, stats, counts, depth + 1, budget)
+        elif stats is not None:
+            stats["backtracks"] += 1
+        if counts is not None:
+            # the counts belong to values again (not to the discarded copy)
+            counts.rollback(mark)
+
+def _search_trail(values, trail, stats=None, counts=None, depth=1, budget=None):
+    # same search as _search(), but without copies -> values are changed in place and every change goes on the trail
+    # when a branch is done the trail is rolled back to the mark saved before the branch
+    if budget is not None:
+        budget.charge()
+    if stats is not None:
+        stats["nodes"] += 1
+        if depth > stats["max_depth"]:
+            stats["max_depth"] = depth
+
+    s, s_ord_val = _branch(values, counts)
+    if s is None:
+        # values will still change -> give out a copy of the solution
+        yield values.copy()
+        return
+
+    for d in s_ord_val:
+        mark = len(trail)
+        if assign(values, s, d, trail, counts, stats):
+            yield from _search_trail(values, trail, stats, counts, depth + 1, budget)
+        elif stats is not None:
+            stats["backtracks"] += 1
+        undo(values, trail, mark, counts)
+
+def iter_solutions(grid, mode="copy", ordering="scan", backend="strings", budget=None):
+    # generator of all solutions (solution dicts) of grid, found one by one when asked for
+    # works for any number of input digits (no minimum of 17 like in solve())
+    # budget = Budget of the whole iteration (raises BudgetExceeded when it runs out)
+    module = get_backend(backend)
+    if module is not None:
+        yield from module.iter_solutions(grid, budget)
+        return
+
+    values = parse_values(grid)
+    if values is not False:
+        yield from _solutions(values, mode, None, ordering, budget)
+
+def count_solutions(grid, limit=None, mode="copy", ordering="scan", backend="strings", budget=None):
+    # number of solutions of grid, the search stops once limit solutions were found
+    count = 0
+    for solution in itertools.islice(iter_solutions(grid, mode, ordering, backend, budget), limit):
+        count += 1
+    return count
+
+def order_values(values, s):
+    # takes all values and returns list of digits, sorted by their frequency in values
+
+    # put all possible values into string
+    val_str = "".join(values.values())
+    # create dict with digits as keys and their frequency as value
+    # (digits go in sorted order -> digits with the same frequency keep their order and the search is repeatable)
+    res = {i: val_str.count(i) for i in sorted(set(val_str))}
+    # sort this dictionary by values and return a string with ordered digits that are in values[s]
+    res = sorted(res.items(), key=lambda item: item[1])
+    res = map(lambda x: x[0], res)
+    res = "".join(x for x in res if x in values[s])
+    return res
+
+def get_pencilmarks(grid):
+    # similar to parse, but don't fill in obvious spaces that have only one option
+    values = dict((s, digits) for s in squares)
+
+    # put in all the input digits
+    for s, d in grid_values(grid).items():
+        if d in digits:
+            values[s] = d
+
+    # save copy of input values for next loop
+    orig_values = values.copy()
+
+    # for each square that is empty look at surrounding non empty digits (peers with only one possible value at input) and remove these from pencilmarks
+    for s in squares:
+        # check if square is not an input value
+        if len(values[s]) > 1:
+            for peer in peers[s]:
+                # find peers that have input digits
+                if len(orig_values[peer]) == 1:
+                    # remove this digit from possible values
+                    values[s] = values[s].replace(orig_values[peer], "")
+
+    for s in squares:
+        if len(orig_values[s]) == 1:
+            # remove input digits from pencilmarks -> to not show duplicates (digit is already on screen)
+            values[s] = ""
+
+    return values
+
+def check_user_solution(user_grid, solution_vals):
+    # compares filled squares by user with solution and returns a list of squares with wrong digits
+    if solution_vals == 2 or solution_vals == False:
+        # no solution provided
+        return []
+
+    solut_str = "".join(solution_vals.values())
+
+    wrong_squares = []
+    for i in range(len(user_grid)):
+        # check if square is not empty (don't compare empty spaces)
+        if user_grid[i] in digits:
+            if user_grid[i] != solut_str[i]:
+                # incorrect digit found
+                wrong_squares.append(squares[i])
+
+    return wrong_squares
+
+def complete_generator(backend="strings"):
+    # generate random complete valid sudoku
+    values = dict((s, digits) for s in squares)
+    grid = "."*81
+
+    while True:
+        while True:
+            # pick random square
+            pos = random.randint(0,80)
+            rand_square = squares[pos]
+            # check if that square hasnt already been picked
+            if len(values[rand_square]) > 1:
+                # pick random digit from valid digits for that square
+                rand_digit = random.choice(values[rand_square])
+                # try to add this value to the grid
+                answ = assign(values.copy(), rand_square, rand_digit)
+                
+                if answ == False:
+                    # cant add this digit -> try different digit
+                    pass
+                else:
+                    # digit can be added -> update values and grid
+                    values = answ
+                    grid = grid[:pos] + str(rand_digit) + grid[pos+1:]
+                    # break out of generating more digits and try to solve the sudoku
+                    break
+        sol = solve(grid, backend=backend)
+        if sol != 2 and sol != False:
+            # solution found == valid complete sudoku found -> we can break and return
+            break
+        elif sol == False:
+            # unsolvable, try again
+            return complete_generator(backend)
+
+        """ if sol == 2 -> try generating another digit 
+        case: multiple solutions -> reduces the number of solutions by adding another digit
+        case: not enough digits -> adds enough digits to get one of the options above
+        """
+
+    # return grid string with solved sudoku
+    return "".join(sol[s] for s in squares)
+
+def puzzle_generator(complete, backend="strings", rng=None, budget=None):
+    # remove values from complete sudoku -> leaves less digits in the sudoku than the base sudoku generated by complete_generator()
+    # rng = random.Random instance for reproducible puzzles, None uses the random module
+    # budget = Budget shared by all uniqueness checks (raises BudgetExceeded when it runs out)
+
+    if rng is None:
+        rng = random
+
+    # get random list of numbers from 0 to 80 to represent idexes of squares in grid string
+    rand_squares = list(range(81))
+    rng.shuffle(rand_squares)
+
+    if backend != "strings":
+        return _puzzle_generator_solve(complete, rand_squares, backend, budget)
+
+    # propagated values of the digits in rand_squares[i:] for every i, built once from the end
+    # (each one from the next by one more assign) and kept for all the removals
+    suffix = [dict((s, digits) for s in squares)]
+    for pos in reversed(rand_squares):
+        suffix.append(assign(suffix[-1].copy(), squares[pos], complete[pos]))
+    suffix.reverse()
+
+    # digits that were tried and have to stay
+    kept = []
+    puzzle = list(complete)
+
+    # for each square try removing it's digit and check if sudoku is still valid
+    for i, pos in enumerate(rand_squares):
+        s = squares[pos]
+        d = complete[pos]
+
+        # complete is a solution of the puzzle without digit d -> any other solution must have another digit in square s
+        # so the puzzle stays valid if there is no solution with d eliminated from square s
+        # start from the digits that weren't tried yet (already propagated) and add the kept ones
+        values = eliminate(suffix[i+1].copy(), s, d)
+        for s2, d2 in kept:
+            if values is False:
+                break
+            values = assign(values, s2, d2)
+
+        if values is not False and next(_search(values, budget=budget), None) is not None:
+            # another solution exists -> the digit has to stay
+            kept.append((s, d))
+        else:
+            # unique without this digit -> remove it
+            puzzle[pos] = "."
+
+    return "".join(puzzle)
+
+def _puzzle_generator_solve(complete, rand_squares, backend, budget=None):
+    # removes digits in the order of rand_squares and checks every removal by solving the whole puzzle again
+    for s in rand_squares:
+        rem_val = complete[s]
+        complete = complete[:s] + "." + complete[s+1:]
+        answ = solve(complete, backend=backend, budget=budget)
+        if answ == 2 or answ == False:
+            # sudoku is not valid -> return digit back and go to another square
+            complete = complete[:s] + rem_val + complete[s+1:]
+
+    return complete
+
+def generator(backend="strings", rng=None, budget=None):
+    # generates random sudoku
+    # first it generates complete solved valid sudoku and then it removes some digits while keeping the sudoku valid
+    # rng = seed or random.Random instance for reproducible puzzles
+    # budget = Budget of the digit removal checks (raises BudgetExceeded when it runs out)
+    import generate
+    rng = generate.get_rng(rng)
+    return puzzle_generator(generate.complete_grid(rng), backend, rng, budget)
@@ -1,764 +1,757 @@
-# Sudoku solver and generator with GUI
-# Jiri Kruchina, I.rocnik
-# zimni semestr 2022/23
-
-import random
-import time
-
-def square_gen(A,B):
-    # takes rows and columns and outputs list of square names in them
-    return [a+b for a in A for b in B]
-
-cols = '123456789'
-rows = 'ABCDEFGHI'
-
-digits = '123456789'
-# list of all square names (each is a string with a letter and a digit)
-squares = square_gen(rows, cols)
-
-# list of all units (rows, cols, 3x3 squares)
-unitlist = ([square_gen(rows, c) for c in cols] +        # rows
-            [square_gen(r, cols) for r in rows] +        # columns
-            [square_gen(rs, cs) for rs in ('ABC','DEF','GHI') for cs in ('123','456','789')])        # squares
-
-# dictionary where each square maps to the list of units that contain the square
-units = dict((s, [u for u in unitlist if s in u]) for s in squares)
-
-# dictionary where each square s maps to the set of squares formed by the union of the squares in the units of s, but not s itself
-# squares that could affect certain square (set of squares in rows, cols and square) -> 20 peers for each square
-# sum combines the lists
-peers = dict((s, set(sum(units[s],[]))-set([s])) for s in squares)
-
-# grid =  the initial state of a puzzle in text format
-# values = dict with all the remaining possible values for each square
-
-# already found any solution?
-solutions = False
-
-# store found solution of sudoku
-solution = ""
-
-# perses an input grid (assigns all input digits)
-def grid_parser(grid):
-    # each square can be initially all digits
-    values = dict((s, digits) for s in squares)
-    
-    # counts number of input digits (non empty squares)
-    input_d_count = 0
-    # tracks unused digits in input
-    unused_digs = "123456789"
-
-    # go through dict of input gird, s = each square, d = input digit
-    for s, d in grid_values(grid).items():
-        if d in digits:
-            unused_digs = unused_digs.replace(d, "")
-            input_d_count += 1
-            if not assign(values, s, d):
-                # we can't assign d to square s -> bad sudoku input puzzle (for example two same digits in one unit -> unsolvable)
-                return False
-    
-    # the minimum number of cells that need to be populated to generate a solvable Sudoku is 17
-    # also there need to be at least 8 different digits (so at maximum one unused) to have an unique solution
-    if input_d_count < 17 or len(unused_digs) > 1:
-        return 2
-
-    return values
-
-def grid_values(grid):
-    # go through input grid and save all numbers or blank spaces (0, .), ignore all other characters
-    chars = [c for c in grid if c in digits or c in "0."]
-    # zip -> create tuples, takes i-th element from each list ==> assigns each square a digit from input
-    return dict(zip(squares, chars))
-
-
-def assign(values, s, d):
-    # set square s to input digit d
-    
-    # all possible values except input digit d for square s
-    other_values = values[s].replace(d, "")
-    # call eliminate function on all other values which are now not gonna be possible -> propagate to units
-    if all(eliminate(values, s, d2) for d2 in other_values):
-        return values
-    else:
-        # contradiction detected (at least one elimination failed)
-        return False
-
-
-def eliminate(values, s, d):
-    # d is eliminated from possible values of square s, propagate when values or places <= 2
-
-    # digit d already eliminated, we're done
-    if d not in values[s]:
-        return values
-
-    # remove digit d from possible values of square s
-    values[s] = values[s].replace(d, "")
-
-    if len(values[s]) == 0:
-        # contradiction -> last possible value was removed -> there is no digit suitable for this square
-        return False
-    elif len(values[s]) == 1:
-        # square s is reduced to one value d2 -> eliminate d2 from peers
-        d2 = values[s]
-        if not all(eliminate(values, s2, d2) for s2 in peers[s]):
-            return False
-
-    for u in units[s]:
-        # list of all places (squares) where digit d is a possible value that are in units containing square s (possible affected squares)
-        dplaces = [s for s in u if d in values[s]]
-        if len(dplaces) == 0:
-            # contradiction -> no place for this value
-            return False
-        elif len(dplaces) == 1:
-            # digit d is a possible value for only one square -> place it there
-            if not assign(values, dplaces[0], d):
-                return False
-
-    return values
-
-# function to solve sudoku -> first it parses the input grid and then it searches for a solution
-def solve(grid):
-    # set these variables -> no solution has been found, so solution is empty and multiple solutions are false
-    global solutions, solution
-    solutions = False
-    solution = ""
-
-    # start solving
-    answer = search(grid_parser(grid))
-
-    # no solution found
-    if answer == False and solutions == False:
-        return False
-    # found one solution
-    elif answer == False and solutions == True:
-        return solution
-    # multiple or none solutions (ivalid sudoku)
-    else:        # answer == 2
-        return 2
-        
-def search(values):
-    # depth-first search
-
-    if values is False:
-        # parsing already failed, bad sudoku
-        return False
-
-    elif values == 2:
-        # parsing already checked there are multiple or none solutions
-        return 2
-
-    if all(len(values[s]) == 1 for s in squares):
-        # solved sudoku, each square has only one possible value
-
-        # check if another solutions has already been found
-        global solutions, solution
-        if solutions == False:
-            # first solution -> mark that some solutions exist by setting it to True and return False to search if there is another
-            solutions = True
-            solution = values
-            return False
-
-        else:
-            # second solution found -> return 2 as an error
-            return 2
-
-    # find square s with the fewest possible values (n is the number of possible values) above 1 (empty square)
-    n, s = min((len(values[s]), s) for s in squares if len(values[s]) > 1)
-
-    # count frequencies of all possible digits in the sudoku and order them (lowest freq first)
-    # put digits in values[s] in this order of lowest frequency first -> better search
-    s_ord_val = order_values(values, s)
-
-    # create a new copy of values (so it doesnt affect the old one -> no need to track changes)
-    # try to assign possible values to square s
-    # and also immediately call search if assign doesnt return False -> DFS
-    # get_true = if any search returns 2 (found second solution / invalid sudoku) we return it (ends the solving)
-    return get_true(search(assign(values.copy(), s, d)) for d in s_ord_val)
-
-def get_true(seq):
-    # go through a list and if you find a value that is True (in this case equal to 2), return it
-    for e in seq:
-        if e: return e
-    return False
-
-def order_values(values, s):
-    # takes all values and returns list of digits, sorted by their frequency in values
-
-    # put all possible values into string
-    val_str = "".join(values.values())
-    # create dict with digits as keys and their frequency as value
-    res = {i: val_str.count(i) for i in set(val_str)}
-    # sort this dictionary by values and return a string with ordered digits that are in values[s]
-    res = sorted(res.items(), key=lambda item: item[1])
-    res = map(lambda x: x[0], res)
-    res = "".join(x for x in res if x in values[s])
-    return res
-
-def get_pencilmarks(grid):
-    # similar to parse, but don't fill in obvious spaces that have only one option
-    values = dict((s, digits) for s in squares)
-
-    # put in all the input digits
-    for s, d in grid_values(grid).items():
-        if d in digits:
-            values[s] = d
-
-    # save copy of input values for next loop
-    orig_values = values.copy()
-
-    # for each square that is empty look at surrounding non empty digits (peers with only one possible value at input) and remove these from pencilmarks
-    for s in squares:
-        # check if square is not an input value
-        if len(values[s]) > 1:
-            for peer in peers[s]:
-                # find peers that have input digits
-                if len(orig_values[peer]) == 1:
-                    # remove this digit from possible values
-                    values[s] = values[s].replace(orig_values[peer], "")
-
-    for s in squares:
-        if len(orig_values[s]) == 1:
-            # remove input digits from pencilmarks -> to not show duplicates (digit is already on screen)
-            values[s] = ""
-
-    return values
-
-def check_user_solution(user_grid, solution_vals):
-    # compares filled squares by user with solution and returns a list of squares with wrong digits
-    if solution_vals == 2 or solution_vals == False:
-        # no solution provided
-        return []
-
-    solut_str = "".join(solution_vals.values())
-
-    wrong_squares = []
-    for i in range(len(user_grid)):
-        # check if square is not empty (don't compare empty spaces)
-        if user_grid[i] in digits:
-            if user_grid[i] != solut_str[i]:
-                # incorrect digit found
-                wrong_squares.append(squares[i])
-
-    return wrong_squares
-
-def complete_generator():
-    # generate random complete valid sudoku
-    values = dict((s, digits) for s in squares)
-    grid = "."*81
-
-    while True:
-        while True:
-            # pick random square
-            pos = random.randint(0,80)
-            rand_square = squares[pos]
-            # check if that square hasnt already been picked
-            if len(values[rand_square]) > 1:
-                # pick random digit from valid digits for that square
-                rand_digit = random.choice(values[rand_square])
-                # try to add this value to the grid
-                answ = assign(values.copy(), rand_square, rand_digit)
-                
-                if answ == False:
-                    # cant add this digit -> try different digit
-                    pass
-                else:
-                    # digit can be added -> update values and grid
-                    values = answ
-                    grid = grid[:pos] + str(rand_digit) + grid[pos+1:]
-                    # break out of generating more digits and try to solve the sudoku
-                    break
-        sol = solve(grid)
-        if sol != 2 and sol != False:
-            # solution found == valid complete sudoku found -> we can break and return
-            break
-        elif sol == False:
-            # unsolvable, try again
-            return complete_generator()
-
-        """ if sol == 2 -> try generating another digit 
-        case: multiple solutions -> reduces the number of solutions by adding another digit
-        case: not enough digits -> adds enough digits to get one of the options above
-        """
-
-    # return grid string with solved sudoku
-    return "".join(sol[s] for s in squares)
-
-def puzzle_generator(complete):
-    # remove values from complete sudoku -> leaves less digits in the sudoku than the base sudoku generated by complete_generator()
-
-    # get random list of numbers from 0 to 80 to represent idexes of squares in grid string
-    rand_squares = list(range(81))
-    random.shuffle(rand_squares)
-
-    # for each square try removing it's digit and check if sudoku is still valid
-    for s in rand_squares:
-        rem_val = complete[s]
-        complete = complete[:s] + "." + complete[s+1:]
-        answ = solve(complete)
-        if answ == 2 or answ == False:
-            # sudoku is not valid -> return digit back and go to another square
-            complete = complete[:s] + rem_val + complete[s+1:]
-
-    return complete
-
-def generator():
-    # generates random sudoku
-    # first it generates complete solved valid sudoku and then it removes some digits while keeping the sudoku valid
-    return puzzle_generator(complete_generator())
-
-def grid_to_pygame(my_grid, string=True):
-    # converts grid to pygame list format
-    py_grid = []
-    temp_list = []
-
-    if string == True:
-        # converts string grid to pygame list format
-        
-        # replace dots with zeros if used
-        my_grid = my_grid.replace(".", "0")
-        for i in range(len(my_grid)):
-            temp_list.append(int(my_grid[i]))
-            if (i+1) % 9 == 0:
-                # new line
-                py_grid.append(temp_list)
-                temp_list = []
-    else:
-        # converts values dict to pygame list format
-
-        for i in range(len(squares)):
-            temp_list.append(my_grid[squares[i]])
-            if (i+1) % 9 == 0:
-                # new line
-                py_grid.append(temp_list)
-                temp_list = []
-
-    return py_grid
-
-def grid_from_pygame(py_grid, dots=True):
-    # converts pygame list grid to string grid
-    my_grid = ""
-
-    for line in py_grid:
-        for val in line:
-            my_grid += str(val)
-
-    # dots or zeros for empty spaces
-    if dots == True:
-        my_grid = my_grid.replace("0", ".")
-
-    return my_grid
-
-########################### PyGame ###########################
-
-import os
-# disables pygame support prompt on import
-os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
-
-import pygame
-import tkinter.filedialog
-
-# initialise pygame font
-pygame.font.init()
-
-# entire window, set it's size and initialize it
-screen = pygame.display.set_mode((780, 580))
-x = 0
-y = 0
-# size of a square
-dif = 500 / 9
-
-# title of window
-pygame.display.set_caption("Sudoku")
-
-# load fonts
-font1 = pygame.font.SysFont("Verdana", 40)
-font2 = pygame.font.SysFont("Verdana", 23)
-font3 = pygame.font.SysFont("Verdana", 10)
-font4 = pygame.font.SysFont("Verdana", 20)
-
-def get_cord(pos):
-    # changes coordinates of highlighted square to clicked space
-    global x, y
-    # check if we clicked inbounds
-    if pos[0] <= 500 and pos[1] <= 500 and pos[0] >= 0 and pos[1] >= 0:
-        # calculate the square from coordinates
-        x = int(pos[0]//dif)
-        y = int(pos[1]//dif)
-
-# highlight selected cell by drawing red square around
-def draw_box():
-    for i in range(2):
-        # straight line drawing functions -> draws sides of red square
-        pygame.draw.line(screen, (255, 0, 0), (x * dif-3, (y + i)*dif), (x * dif + dif + 3, (y + i)*dif), 7)
-        pygame.draw.line(screen, (255, 0, 0), ( (x + i)* dif, y * dif ), ((x + i) * dif, y * dif + dif), 7)
-
-# draw sudoku board
-def draw(error_squares, pencilmarks, marks):
-    # draw numbers and fill background
-    for i in range (9):
-        for j in range (9):
-            # squares with digit
-            if grid[j][i]!= 0:
-
-                # color square with a digit blue -> rectangle drawing function (Rect(left, top, width, height))
-                if frozen_grid[j][i]!= 0:
-                    # different color for initial puzzle digits
-                    pygame.draw.rect(screen, init_square_color, (i * dif, j * dif, dif + 1, dif + 1))
-                else:
-                    pygame.draw.rect(screen, square_color, (i * dif, j * dif, dif + 1, dif + 1))
-
-                # Fill grid with default numbers specified
-                text1 = font1.render(str(grid[j][i]), 1, (0, 0, 0))
-                # puts text object on screen surface (on exact position)
-                screen.blit(text1, (i * dif + 15, j * dif + 2))
-
-            if pencilmarks:
-                # display pencilmarks above empty spaces (for non empty get_pencilmarks returns empty string)
-                str_square = str(chr(j + 65)) + str(i+1)
-                penmarks = marks[str_square]
-
-                # draw pencilmarks in two lines if there are too many values
-                text1 = font3.render(penmarks[:7], 1, (0, 0, 0))
-                screen.blit(text1, (i * dif + 5, j * dif + 2))
-                text1 = font3.render(penmarks[7:], 1, (0, 0, 0))
-                screen.blit(text1, (i * dif + 5, j * dif + 15))
-
-    # mark every incorrect digit red
-    for square in error_squares:
-        mark_error(square)
-
-    # Draw lines horizontally and vertically to form a grid 
-    for i in range(10):
-        # every third line is thicker
-        if i % 3 == 0 :
-            thick = 7
-        else:
-            thick = 1
-        pygame.draw.line(screen, (0, 0, 0), (0, i * dif), (502, i * dif), thick)
-        pygame.draw.line(screen, (0, 0, 0), (i * dif, 0), (i * dif, 502), thick)
-
-def mark_error(square):
-    # mark wrong digits in red
-
-    # converts square name to coordinates
-    y = ord(square[0]) - 65
-    x = int(square[1]) - 1
-
-    # draws red square and the digit on top of it
-    pygame.draw.rect(screen, (200,0,0), (x * dif, y * dif, dif + 1, dif + 1))
-    text1 = font1.render(str(grid[y][x]), 1, (0, 0, 0))
-    screen.blit(text1, (x * dif + 15, y * dif))
-
-def display_text():
-    # display text below sudoku puzzle
-    text1 = font2.render(bottom_text, 1, (0, 0, 0))
-    screen.blit(text1, (20, 520))
-
-def prompt_file():
-    # ask user to select file with sudoku to load
-
-    # Create a Tk file dialog and cleanup when finished
-    top = tkinter.Tk()
-    top.withdraw()  # hide window
-    file_name = tkinter.filedialog.askopenfilename(parent=top)
-    top.destroy()
-    return file_name
-
-def instructions():
-    # display instructions / keybinds next to sudoku
-    for i in range(len(instr_lines)):
-        text1 = font4.render(instr_lines[i], 1, (0, 0, 0))
-        screen.blit(text1, (515, 20+25*i))
-
-# variable initialization
-run = True                                  # is game running?
-insert_val = 0                              # value to insert to square
-error_squares = []                          # squares with wrong digit
-bottom_text = "Start solving sudoku!"       # text under sudoku
-pencilmarks = False                         # user choice of toggling pencilmarks
-change = 0                                  # did a change occur on the board?
-marks = {}                                  # dict to store pencilmarks
-won = False                                 # did user solve the sudoku?
-square_color = (245, 227, 207)              # square with digit bg color
-init_square_color = (212, 219, 252)         # input square with digit bg color
-# instruction text on the right
-instr_lines = ["N = generate new puzzle", "C = clear the board", "L = load from file", 
-             "R = reset to initial", "G = solve puzzle", "H = solve current board", 
-             "J = show error squares", "P = toggle pencilmarks"]
-
-# start with empty grid
-# frozen grid is never changed by user, only by program (initial puzzle)
-frozen_grid = [
-                [0, 0, 0, 0, 0, 0, 0, 0, 0],
-                [0, 0, 0, 0, 0, 0, 0, 0, 0],
-                [0, 0, 0, 0, 0, 0, 0, 0, 0],
-                [0, 0, 0, 0, 0, 0, 0, 0, 0],
-                [0, 0, 0, 0, 0, 0, 0, 0, 0],
-                [0, 0, 0, 0, 0, 0, 0, 0, 0],
-                [0, 0, 0, 0, 0, 0, 0, 0, 0],
-                [0, 0, 0, 0, 0, 0, 0, 0, 0],
-                [0, 0, 0, 0, 0, 0, 0, 0, 0]
-                ]
-# grid is displayed to user and can be edited
-grid = [x[:] for x in frozen_grid]
-
-# loop of the sudoku game in pygame
-while run:
-    # White color background
-    screen.fill((255, 255, 255))
-    # Loop through the events stored in event.get() -> checking for user inputs
-    for event in pygame.event.get():
-        # user closed the window -> quit
-        if event.type == pygame.QUIT:
-            run = False   
-        # Get the mouse position at mouse click to move highlighted square there
-        if event.type == pygame.MOUSEBUTTONDOWN:
-            pos = pygame.mouse.get_pos()
-            get_cord(pos)
-        
-        if event.type == pygame.KEYDOWN:
-            # change coordinates of cursor on arrow key press (and loop if edge reached)
-            if event.key == pygame.K_LEFT or event.key == pygame.K_a:
-                if x > 0:
-                    x -= 1
-                else:
-                    x = 8
-            if event.key == pygame.K_RIGHT or event.key == pygame.K_d:
-                if x < 8:
-                    x += 1
-                else:
-                    x = 0
-            if event.key == pygame.K_UP or event.key == pygame.K_w:
-                if y > 0:
-                    y-= 1
-                else:
-                    y = 8
-            if event.key == pygame.K_DOWN or event.key == pygame.K_s:
-                if y < 8:
-                    y += 1  
-                else:
-                    y = 0
-            # Get the digit to be inserted if key pressed
-            if event.key == pygame.K_1 or event.key == pygame.K_KP1:
-                insert_val = 1
-            if event.key == pygame.K_2 or event.key == pygame.K_KP2:
-                insert_val = 2   
-            if event.key == pygame.K_3 or event.key == pygame.K_KP3:
-                insert_val = 3
-            if event.key == pygame.K_4 or event.key == pygame.K_KP4:
-                insert_val = 4
-            if event.key == pygame.K_5 or event.key == pygame.K_KP5:
-                insert_val = 5
-            if event.key == pygame.K_6 or event.key == pygame.K_KP6:
-                insert_val = 6
-            if event.key == pygame.K_7 or event.key == pygame.K_KP7:
-                insert_val = 7
-            if event.key == pygame.K_8 or event.key == pygame.K_KP8:
-                insert_val = 8
-            if event.key == pygame.K_9 or event.key == pygame.K_KP9:
-                insert_val = 9 
-
-            # empty the selected square
-            if event.key == pygame.K_DELETE or event.key == pygame.K_BACKSPACE or event.key == pygame.K_0 or event.key == pygame.K_KP0:
-                # check if this square is empty in initial puzzle (don't remove digits from it)
-                if frozen_grid[y][x] == 0:
-                    grid[y][x] = 0
-
-                    # if this square was flagged with error -> remove this error (change by user)
-                    # convert coordinates to string name of square
-                    rem_square = str(chr(y + 65)) + str(x+1)
-                    if rem_square in error_squares:
-                        error_squares.remove(rem_square)
-
-                    bottom_text=""
-                    change = 1
-
-            # C pressed -> clear sudoku board
-            if event.key == pygame.K_c:
-                frozen_grid = [
-                [0, 0, 0, 0, 0, 0, 0, 0, 0],
-                [0, 0, 0, 0, 0, 0, 0, 0, 0],
-                [0, 0, 0, 0, 0, 0, 0, 0, 0],
-                [0, 0, 0, 0, 0, 0, 0, 0, 0],
-                [0, 0, 0, 0, 0, 0, 0, 0, 0],
-                [0, 0, 0, 0, 0, 0, 0, 0, 0],
-                [0, 0, 0, 0, 0, 0, 0, 0, 0],
-                [0, 0, 0, 0, 0, 0, 0, 0, 0],
-                [0, 0, 0, 0, 0, 0, 0, 0, 0]
-                ]
-                grid = [x[:] for x in frozen_grid]
-                error_squares = []
-                bottom_text="Cleared the board!"
-                change = 1
-
-            # R pressed -> load back frozen_grid (initial puzzle)
-            if event.key == pygame.K_r:
-                grid = [x[:] for x in frozen_grid]
-                error_squares = []
-                bottom_text="Reset back to initial puzzle!"
-                change = 1
-
-            # N pressed -> generate new sudoku (and put it in frozen grid)
-            if event.key == pygame.K_n:
-                frozen_grid = grid_to_pygame(generator())
-                grid = [x[:] for x in frozen_grid]
-                error_squares = []
-                bottom_text="Generated new sudoku!"
-                change = 1
-
-            # G pressed -> solve initial puzzle (frozen_grid)
-            if event.key == pygame.K_g:
-                # get output from solving initial puzzle
-                sol_answ = solve(grid_from_pygame(frozen_grid))
-
-                # one solution found -> display it
-                if sol_answ != 2 and sol_answ != False:
-                    frozen_grid = grid_to_pygame(sol_answ, string=False)
-                    grid = [x[:] for x in frozen_grid]
-                    error_squares = []
-                    bottom_text="Correct solution to the initial puzzle."
-                    change = 1
-
-                # none or multiple solutions of input puzzle (triggers when called on cleared board)
-                else:
-                    bottom_text="Initial puzzle is not a valid sudoku!"
-
-            # H pressed -> solve user entered grid
-            if event.key == pygame.K_h:
-                # get output from solve function on user input grid
-                sol_answ = solve(grid_from_pygame(grid))
-
-                # one solution was found -> display it
-                if sol_answ != 2 and sol_answ != False:
-                    frozen_grid = grid_to_pygame(sol_answ, string=False)
-                    grid = [x[:] for x in frozen_grid]
-                    error_squares = []
-                    bottom_text="Correct solution to the current state of puzzle."
-                    change = 1
-
-                # none or multiple solutions
-                else:
-                    bottom_text = "This sudoku is not valid! (unsolvable or multiple solutions)"
-
-            # J / Enter pressed -> show errors in user input
-            if event.key == pygame.K_j or event.key == pygame.K_RETURN:
-                error_squares = []
-                # list of error squares in string -> for displaying to the user
-                str_sqr = ""
-
-                # go through list of squares with wrong digit -> add them to the list (and string)
-                for square in check_user_solution(grid_from_pygame(grid), solve(grid_from_pygame(frozen_grid))):
-                    error_squares.append(square)
-                    str_sqr += square + " "
-
-                # check if any errors were found and update bottom text accordingly
-                if str_sqr == "":
-                    bottom_text = "No incorrect squares!"
-                else:
-                    bottom_text = "Incorrect squares are: " + str_sqr
-
-            # P pressed -> enable / disable pencilmarks
-            if event.key == pygame.K_p:
-                pencilmarks = not pencilmarks
-                if pencilmarks:
-                    bottom_text="Enabled pencilmarks!"
-                    change = 1
-                else:
-                    bottom_text="Disabled pencilmarks!"
-
-            # L pressed -> pop up a window to load file with sudoku puzzle and load it
-            if event.key == pygame.K_l:
-                sudoku_file = prompt_file()
-                # check if file is a text file
-                if sudoku_file[-3:] == "txt":
-                    new_grid = ""
-                    with open(sudoku_file, "r") as f:
-                        # read by character until the end of file
-                        while True:
-                            char = f.read(1)         
-                            if not char:
-                                break
-
-                            # character is a digit or empty space -> add it to sudoku
-                            if char in digits or char in "0.":
-                                new_grid += char
-
-                    # check if sudoku is of correct length and load it
-                    if len(new_grid) == 81:
-                        frozen_grid = grid_to_pygame(new_grid)
-                        grid = [x[:] for x in frozen_grid]
-                        error_squares = []
-                        change = 1
-                        bottom_text="Loaded sudoku from a file!"
-                    else:
-                        bottom_text="Load failed! (bad input sudoku)"
-                else:
-                    bottom_text="Load failed! (incorrect file type)"
-
-    # checks if user inputed a new digit and puts it in selected square
-    if insert_val != 0:
-        # insert only to empty squares in initial puzzle
-        if frozen_grid[y][x] == 0:
-            # change the value only when it's different from the one before
-            if grid[y][x] != insert_val:
-                grid[y][x] = insert_val
-
-                # remove this square from error marked squares -> user changed it
-                rem_square = str(chr(y + 65)) + str(x+1)
-                if rem_square in error_squares:
-                    error_squares.remove(rem_square)
-
-            bottom_text=""
-            change = 1
-
-            # second part checks if user has solved the sudoku by entering this value
-
-            # go through all squares and check if none of them is zero
-            if all(grid[i//9][i%9] != 0 for i in range(81)):
-                init_sol = solve(grid_from_pygame(frozen_grid))
-                if init_sol != 2 and init_sol != False:
-                    # the initial puzzle had a solution
-                    if len(check_user_solution(grid_from_pygame(grid), init_sol)) == 0:
-                        # there is no difference between user solution and correct solution
-                        bottom_text="Correct solution!"
-                        square_color = (217, 234, 211)
-                        init_square_color = (217, 234, 211)
-                        won = True
-                    else:
-                        won = False
-                else:
-                    won = False
-            else:
-                won = False
-        
-        # reset insert value back to zero
-        insert_val = 0
-    
-    # user changed the board
-    if change == 1:
-        # keep normal colors if user hasn't won
-        if won == False:
-            square_color = (245, 227, 207)
-            init_square_color = (212, 219, 252)
- 
-        if pencilmarks:
-            # get pencilmarks if showing them is enabled and a change to the board occured
-            marks = get_pencilmarks(grid_from_pygame(grid))
-        change = 0
-
-    # draw sudoku and bottom text
-    draw(error_squares, pencilmarks, marks)
-    display_text()
-    instructions()
-
-    # draw highlight around selected square
-    draw_box()
-    
-    # Update screen
-    pygame.display.update()
-
-    # limit framerate
-    time.sleep(0.015)
-
-# Quit pygame window
-pygame.quit()
\ No newline at end of file
+# Sudoku solver and generator with GUI
+# Jiri Kruchina, I.rocnik
+# zimni semestr 2022/23
+
+# GUI entry point -> the solver and generator live in solver.py (can be imported without pygame)
+
+import collections
+import os
+import time
+
+# disables pygame support prompt on import
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
+
+import pygame
+import tkinter.filedialog
+
+from solver import squares, solve, generator, check_user_solution
+from candidates import CandidateGrid
+import loader
+from gui_worker import Worker
+
+# text shown while a background job is running
+JOB_TEXT = {"generate": "Generating new sudoku", "solve_initial": "Solving initial puzzle",
+            "solve_current": "Solving current board", "errors": "Checking for errors"}
+
+# solutions of the last few initial puzzles (puzzle string -> solve() answer), solved once in the background
+# -> errors (J), solving the initial puzzle (G) and the win check only compare the grid with the cached solution
+SOLUTION_CACHE_SIZE = 8
+solutions = collections.OrderedDict()
+
+def cache_solution(puzzle, answer):
+    solutions[puzzle] = answer
+    solutions.move_to_end(puzzle)
+    while len(solutions) > SOLUTION_CACHE_SIZE:
+        solutions.popitem(last=False)
+
+def cached_solution(puzzle):
+    # solve() answer of puzzle (solution dict, False or 2), None if it wasn't solved yet
+    answer = solutions.get(puzzle)
+    if answer is not None:
+        solutions.move_to_end(puzzle)
+    return answer
+
+def grid_to_pygame(my_grid, string=True):
+    # converts grid to pygame list format
+    py_grid = []
+    temp_list = []
+
+    if string == True:
+        # converts string grid to pygame list format
+        
+        # replace dots with zeros if used
+        my_grid = my_grid.replace(".", "0")
+        for i in range(len(my_grid)):
+            temp_list.append(int(my_grid[i]))
+            if (i+1) % 9 == 0:
+                # new line
+                py_grid.append(temp_list)
+                temp_list = []
+    else:
+        # converts values dict to pygame list format
+
+        for i in range(len(squares)):
+            temp_list.append(my_grid[squares[i]])
+            if (i+1) % 9 == 0:
+                # new line
+                py_grid.append(temp_list)
+                temp_list = []
+
+    return py_grid
+
+def grid_from_pygame(py_grid, dots=True):
+    # converts pygame list grid to string grid
+    my_grid = ""
+
+    for line in py_grid:
+        for val in line:
+            my_grid += str(val)
+
+    # dots or zeros for empty spaces
+    if dots == True:
+        my_grid = my_grid.replace("0", ".")
+
+    return my_grid
+
+########################### PyGame ###########################
+
+x = 0
+y = 0
+# size of a square
+dif = 500 / 9
+
+# screen areas redrawn on their own (text under the sudoku, FPS / CPU overlay)
+BOTTOM_RECT = pygame.Rect(0, 505, 780, 75)
+OVERLAY_RECT = pygame.Rect(515, 460, 265, 30)
+
+# rendered text surfaces by (font, text) -> every digit, pencilmark and text line is rendered only once
+glyphs = {}
+
+def render(font, text):
+    surface = glyphs.get((font, text))
+    if surface is None:
+        if len(glyphs) > 1000:
+            # changing texts (like the running time of a job) would fill the cache
+            glyphs.clear()
+        surface = glyphs[(font, text)] = font.render(text, 1, (0, 0, 0))
+    return surface
+
+def cell_rect(i, j):
+    # area of square in column i and row j including the lines and highlight around it
+    return pygame.Rect(int(i * dif) - 4, int(j * dif) - 4, int(dif) + 10, int(dif) + 10)
+
+def cell_states(error_squares, pencilmarks, marks):
+    # everything that decides how each square looks -> squares whose state changed are redrawn
+    states = []
+    for j in range(9):
+        for i in range(9):
+            square = chr(j + 65) + str(i + 1)
+            states.append((grid[j][i], frozen_grid[j][i], square in error_squares, square in conflicts,
+                           marks.get(square, "") if pencilmarks else "", square_color, init_square_color, (i, j) == (x, y)))
+    return states
+
+def get_cord(pos):
+    # changes coordinates of highlighted square to clicked space
+    global x, y
+    # check if we clicked inbounds
+    if pos[0] <= 500 and pos[1] <= 500 and pos[0] >= 0 and pos[1] >= 0:
+        # calculate the square from coordinates
+        x = int(pos[0]//dif)
+        y = int(pos[1]//dif)
+
+# highlight selected cell by drawing red square around
+def draw_box():
+    for i in range(2):
+        # straight line drawing functions -> draws sides of red square
+        pygame.draw.line(screen, (255, 0, 0), (x * dif-3, (y + i)*dif), (x * dif + dif + 3, (y + i)*dif), 7)
+        pygame.draw.line(screen, (255, 0, 0), ( (x + i)* dif, y * dif ), ((x + i) * dif, y * dif + dif), 7)
+
+# draw one square of the board (column i, row j) on the white background
+def draw_square(i, j, error_squares, pencilmarks, marks):
+    square = chr(j + 65) + str(i + 1)
+    # squares with digit
+    if grid[j][i]!= 0:
+
+        # color square with a digit blue -> rectangle drawing function (Rect(left, top, width, height))
+        if square in conflicts:
+            # same digit twice in a row, column or box
+            pygame.draw.rect(screen, conflict_color, (i * dif, j * dif, dif + 1, dif + 1))
+        elif frozen_grid[j][i]!= 0:
+            # different color for initial puzzle digits
+            pygame.draw.rect(screen, init_square_color, (i * dif, j * dif, dif + 1, dif + 1))
+        else:
+            pygame.draw.rect(screen, square_color, (i * dif, j * dif, dif + 1, dif + 1))
+
+        # Fill grid with default numbers specified
+        text1 = render(font1, str(grid[j][i]))
+        # puts text object on screen surface (on exact position)
+        screen.blit(text1, (i * dif + 15, j * dif + 2))
+
+    if pencilmarks:
+        # display pencilmarks above empty spaces (marks of non empty squares are empty strings)
+        penmarks = marks[square]
+
+        # draw pencilmarks in two lines if there are too many values
+        text1 = render(font3, penmarks[:7])
+        screen.blit(text1, (i * dif + 5, j * dif + 2))
+        text1 = render(font3, penmarks[7:])
+        screen.blit(text1, (i * dif + 5, j * dif + 15))
+
+    # mark incorrect digit red
+    if square in error_squares:
+        mark_error(square)
+
+# draw sudoku board
+def draw(error_squares, pencilmarks, marks):
+    # draw numbers and fill background
+    for i in range (9):
+        for j in range (9):
+            draw_square(i, j, error_squares, pencilmarks, marks)
+    draw_lines()
+
+def draw_lines():
+    # Draw lines horizontally and vertically to form a grid 
+    for i in range(10):
+        # every third line is thicker
+        if i % 3 == 0 :
+            thick = 7
+        else:
+            thick = 1
+        pygame.draw.line(screen, (0, 0, 0), (0, i * dif), (502, i * dif), thick)
+        pygame.draw.line(screen, (0, 0, 0), (i * dif, 0), (i * dif, 502), thick)
+
+def mark_error(square):
+    # mark wrong digits in red
+
+    # converts square name to coordinates
+    y = ord(square[0]) - 65
+    x = int(square[1]) - 1
+
+    # draws red square and the digit on top of it
+    pygame.draw.rect(screen, (200,0,0), (x * dif, y * dif, dif + 1, dif + 1))
+    text1 = render(font1, str(grid[y][x]))
+    screen.blit(text1, (x * dif + 15, y * dif))
+
+def display_text():
+    # display text below sudoku puzzle
+    text1 = render(font2, bottom_text)
+    screen.blit(text1, (20, 520))
+
+def prompt_file():
+    # ask user to select file with sudoku to load
+
+    # Create a Tk file dialog and cleanup when finished
+    top = tkinter.Tk()
+    top.withdraw()  # hide window
+    file_name = tkinter.filedialog.askopenfilename(parent=top)
+    top.destroy()
+    return file_name
+
+def instructions():
+    # display instructions / keybinds next to sudoku
+    for i in range(len(instr_lines)):
+        text1 = render(font4, instr_lines[i])
+        screen.blit(text1, (515, 20+25*i))
+
+def display_overlay(overlay_text):
+    # FPS / CPU text (nothing when it is turned off)
+    if overlay_text:
+        screen.blit(render(font4, overlay_text), OVERLAY_RECT.topleft)
+
+def draw_screen(error_squares, pencilmarks, marks, overlay_text):
+    # draw the whole window
+    screen.fill((255, 255, 255))
+    draw(error_squares, pencilmarks, marks)
+    display_text()
+    instructions()
+    display_overlay(overlay_text)
+    draw_box()
+
+def redraw(rects, error_squares, pencilmarks, marks, overlay_text):
+    # redraw only the changed areas of the window (cell_rect() areas, the bottom text and the overlay)
+    # and send just them to the display, every area draws only what is inside it
+    for rect in rects:
+        screen.set_clip(rect)
+        screen.fill((255, 255, 255))
+        if rect is BOTTOM_RECT:
+            display_text()
+        elif rect is OVERLAY_RECT:
+            display_overlay(overlay_text)
+        else:
+            # the area of a square reaches into its neighbours -> every square it touches, then lines and highlight
+            for i in range(max(0, int(rect.left // dif)), min(9, int(rect.right // dif) + 1)):
+                for j in range(max(0, int(rect.top // dif)), min(9, int(rect.bottom // dif) + 1)):
+                    draw_square(i, j, error_squares, pencilmarks, marks)
+            draw_lines()
+            draw_box()
+    screen.set_clip(None)
+    pygame.display.update(rects)
+
+# the GUI is started only when this file is run (not on import)
+if __name__ == "__main__":
+    # initialise pygame font
+    pygame.font.init()
+
+    # entire window, set it's size and initialize it
+    screen = pygame.display.set_mode((780, 580))
+
+    # title of window
+    pygame.display.set_caption("Sudoku")
+
+    # load fonts
+    font1 = pygame.font.SysFont("Verdana", 40)
+    font2 = pygame.font.SysFont("Verdana", 23)
+    font3 = pygame.font.SysFont("Verdana", 10)
+    font4 = pygame.font.SysFont("Verdana", 20)
+
+    # variable initialization
+    run = True                                  # is game running?
+    insert_val = 0                              # value to insert to square
+    error_squares = []                          # squares with wrong digit
+    bottom_text = "Start solving sudoku!"       # text under sudoku
+    pencilmarks = False                         # user choice of toggling pencilmarks
+    strong_marks = False                        # pencilmarks with naked / hidden singles applied
+    change = 0                                  # did a change occur on the board?
+    marks = {}                                  # dict to store pencilmarks
+    won = False                                 # did user solve the sudoku?
+    square_color = (245, 227, 207)              # square with digit bg color
+    init_square_color = (212, 219, 252)         # input square with digit bg color
+    conflict_color = (250, 180, 120)            # bg color of digits that conflict with another digit
+    conflicts = set()                           # squares with conflicting digits (updated on every change)
+    waiting = set()                             # actions waiting for the solution of the initial puzzle
+    loaded = []                                 # puzzles (loader records) of the last loaded file
+    loaded_index = 0                            # which of them is shown
+    bad_records = 0                             # records of the file that couldn't be read
+    show_loaded = False                         # put loaded[loaded_index] on the board
+    frozen_puzzle = None                        # initial puzzle (string) the solution was last requested for
+    # instruction text on the right
+    instr_lines = ["N = generate new puzzle", "C = clear the board", "L = load from file", 
+                 "R = reset to initial", "G = solve puzzle", "H = solve current board", 
+                 "J = show error squares", "P = toggle pencilmarks", "Z / Y = undo / redo",
+                 "PgUp / PgDn = browse file", "Esc = cancel running job", "F = show FPS / CPU use"]
+
+    # window is drawn only when something changed -> what was drawn last time
+    full_redraw = True                          # redraw everything (first frame, window exposed, many changes)
+    drawn_cells = []                            # cell_states() of the last frame
+    drawn_text = None                           # bottom text of the last frame
+    show_fps = False                            # user choice of showing the FPS / CPU overlay
+    overlay_text = ""                           # FPS / CPU text (empty when the overlay is off)
+    drawn_overlay = ""                          # overlay text of the last frame
+    frames = 0                                  # frames drawn since the overlay was updated
+    fps_time = time.perf_counter()              # wall and CPU time when the overlay was updated
+    cpu_time = time.process_time()
+
+    # solving and generating run in the background -> the window doesn't freeze meanwhile
+    worker = Worker()
+    # the initial puzzle is solved by its own worker (job name = puzzle string), so other jobs don't cancel it
+    solution_worker = Worker()
+
+    def request_solution():
+        # start solving the initial puzzle in the background unless its solution is already cached
+        puzzle = grid_from_pygame(frozen_grid)
+        if cached_solution(puzzle) is None and solution_worker.name != puzzle:
+            solution_worker.submit(puzzle, solve, puzzle)
+
+    # start with empty grid
+    # frozen grid is never changed by user, only by program (initial puzzle)
+    frozen_grid = [
+                    [0, 0, 0, 0, 0, 0, 0, 0, 0],
+                    [0, 0, 0, 0, 0, 0, 0, 0, 0],
+                    [0, 0, 0, 0, 0, 0, 0, 0, 0],
+                    [0, 0, 0, 0, 0, 0, 0, 0, 0],
+                    [0, 0, 0, 0, 0, 0, 0, 0, 0],
+                    [0, 0, 0, 0, 0, 0, 0, 0, 0],
+                    [0, 0, 0, 0, 0, 0, 0, 0, 0],
+                    [0, 0, 0, 0, 0, 0, 0, 0, 0],
+                    [0, 0, 0, 0, 0, 0, 0, 0, 0]
+                    ]
+    # grid is displayed to user and can be edited
+    grid = [x[:] for x in frozen_grid]
+    cands = CandidateGrid(grid_from_pygame(grid))
+
+    # loop of the sudoku game in pygame
+    while run:
+        # wait for user input instead of drawing at a fixed rate
+        # (only a running job or the overlay need the loop to wake up by itself)
+        if worker.busy or solution_worker.busy:
+            event = pygame.event.wait(100)
+        elif show_fps:
+            event = pygame.event.wait(1000)
+        else:
+            event = pygame.event.wait()
+
+        # Loop through the events (the one waited for and all others that came) -> checking for user inputs
+        for event in [event] + pygame.event.get():
+            # user closed the window -> quit
+            if event.type == pygame.QUIT:
+                run = False   
+            # window content was lost (for example uncovered) -> draw everything again
+            if event.type == pygame.VIDEOEXPOSE or event.type == pygame.WINDOWEXPOSED:
+                full_redraw = True
+            # Get the mouse position at mouse click to move highlighted square there
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                pos = pygame.mouse.get_pos()
+                get_cord(pos)
+
+            if event.type == pygame.KEYDOWN:
+                # change coordinates of cursor on arrow key press (and loop if edge reached)
+                if event.key == pygame.K_LEFT or event.key == pygame.K_a:
+                    if x > 0:
+                        x -= 1
+                    else:
+                        x = 8
+                if event.key == pygame.K_RIGHT or event.key == pygame.K_d:
+                    if x < 8:
+                        x += 1
+                    else:
+                        x = 0
+                if event.key == pygame.K_UP or event.key == pygame.K_w:
+                    if y > 0:
+                        y-= 1
+                    else:
+                        y = 8
+                if event.key == pygame.K_DOWN or event.key == pygame.K_s:
+                    if y < 8:
+                        y += 1  
+                    else:
+                        y = 0
+                # Get the digit to be inserted if key pressed
+                if event.key == pygame.K_1 or event.key == pygame.K_KP1:
+                    insert_val = 1
+                if event.key == pygame.K_2 or event.key == pygame.K_KP2:
+                    insert_val = 2   
+                if event.key == pygame.K_3 or event.key == pygame.K_KP3:
+                    insert_val = 3
+                if event.key == pygame.K_4 or event.key == pygame.K_KP4:
+                    insert_val = 4
+                if event.key == pygame.K_5 or event.key == pygame.K_KP5:
+                    insert_val = 5
+                if event.key == pygame.K_6 or event.key == pygame.K_KP6:
+                    insert_val = 6
+                if event.key == pygame.K_7 or event.key == pygame.K_KP7:
+                    insert_val = 7
+                if event.key == pygame.K_8 or event.key == pygame.K_KP8:
+                    insert_val = 8
+                if event.key == pygame.K_9 or event.key == pygame.K_KP9:
+                    insert_val = 9 
+
+                # empty the selected square
+                if event.key == pygame.K_DELETE or event.key == pygame.K_BACKSPACE or event.key == pygame.K_0 or event.key == pygame.K_KP0:
+                    # check if this square is empty in initial puzzle (don't remove digits from it)
+                    if frozen_grid[y][x] == 0:
+                        grid[y][x] = 0
+                        cands.set(y * 9 + x, 0)
+
+                        # if this square was flagged with error -> remove this error (change by user)
+                        # convert coordinates to string name of square
+                        rem_square = str(chr(y + 65)) + str(x+1)
+                        if rem_square in error_squares:
+                            error_squares.remove(rem_square)
+
+                        # the board isn't full anymore -> no win check
+                        won = False
+                        waiting.discard("win")
+                        bottom_text=""
+                        change = 1
+
+                # F pressed -> show / hide FPS and CPU use
+                if event.key == pygame.K_f:
+                    show_fps = not show_fps
+                    if not show_fps:
+                        overlay_text = ""
+
+                # Esc pressed -> stop the running background job
+                if event.key == pygame.K_ESCAPE:
+                    if worker.cancel() is not None or waiting:
+                        bottom_text = "Cancelled!"
+                    solution_worker.cancel()
+                    waiting.clear()
+
+                # C pressed -> clear sudoku board
+                if event.key == pygame.K_c:
+                    # result of a running job would belong to the old board
+                    worker.cancel()
+                    frozen_grid = [
+                    [0, 0, 0, 0, 0, 0, 0, 0, 0],
+                    [0, 0, 0, 0, 0, 0, 0, 0, 0],
+                    [0, 0, 0, 0, 0, 0, 0, 0, 0],
+                    [0, 0, 0, 0, 0, 0, 0, 0, 0],
+                    [0, 0, 0, 0, 0, 0, 0, 0, 0],
+                    [0, 0, 0, 0, 0, 0, 0, 0, 0],
+                    [0, 0, 0, 0, 0, 0, 0, 0, 0],
+                    [0, 0, 0, 0, 0, 0, 0, 0, 0],
+                    [0, 0, 0, 0, 0, 0, 0, 0, 0]
+                    ]
+                    grid = [x[:] for x in frozen_grid]
+                    cands = CandidateGrid(grid_from_pygame(grid))
+                    error_squares = []
+                    bottom_text="Cleared the board!"
+                    change = 1
+
+                # R pressed -> load back frozen_grid (initial puzzle)
+                if event.key == pygame.K_r:
+                    worker.cancel()
+                    grid = [x[:] for x in frozen_grid]
+                    cands = CandidateGrid(grid_from_pygame(grid))
+                    error_squares = []
+                    won = False
+                    waiting.discard("win")
+                    bottom_text="Reset back to initial puzzle!"
+                    change = 1
+
+                # N pressed -> generate new sudoku in the background (pressing N again starts over)
+                if event.key == pygame.K_n:
+                    worker.submit("generate", generator)
+
+                # G pressed -> show solution of initial puzzle (frozen_grid) once it is known
+                if event.key == pygame.K_g:
+                    waiting.add("solve_initial")
+                    request_solution()
+
+                # H pressed -> solve user entered grid in the background
+                if event.key == pygame.K_h:
+                    worker.submit("solve_current", solve, grid_from_pygame(grid))
+
+                # J / Enter pressed -> show errors in user input once the solution of initial puzzle is known
+                if event.key == pygame.K_j or event.key == pygame.K_RETURN:
+                    waiting.add("errors")
+                    request_solution()
+
+                # P pressed -> enable / disable pencilmarks
+                # (pressing again switches to strong pencilmarks with naked / hidden singles, then off)
+                if event.key == pygame.K_p:
+                    if not pencilmarks:
+                        pencilmarks, strong_marks = True, False
+                        bottom_text="Enabled pencilmarks!"
+                    elif not strong_marks:
+                        strong_marks = True
+                        bottom_text="Enabled strong pencilmarks!"
+                    else:
+                        pencilmarks = strong_marks = False
+                        bottom_text="Disabled pencilmarks!"
+                    change = 1
+
+                # Z / Y pressed -> undo / redo the last edit of the board
+                if event.key == pygame.K_z or event.key == pygame.K_y:
+                    s = cands.undo() if event.key == pygame.K_z else cands.redo()
+                    if s is None:
+                        bottom_text = "Nothing to undo!" if event.key == pygame.K_z else "Nothing to redo!"
+                    else:
+                        # move the cursor to the changed square
+                        y, x = divmod(s, 9)
+                        grid[y][x] = cands.values[s]
+                        if squares[s] in error_squares:
+                            error_squares.remove(squares[s])
+                        bottom_text = ""
+                        change = 1
+
+                        # the board can be full again -> check it like an inserted digit
+                        won = False
+                        if all(grid[i//9][i%9] != 0 for i in range(81)) and not cands.conflicts():
+                            waiting.add("win")
+                            request_solution()
+                        else:
+                            waiting.discard("win")
+
+                # L pressed -> pop up a window to load file with sudoku puzzle and load it
+                if event.key == pygame.K_l:
+                    worker.cancel()
+                    sudoku_file = prompt_file()
+                    if not sudoku_file:
+                        bottom_text="Load failed! (no file selected)"
+                    else:
+                        # every puzzle in the file is read at once -> PgUp / PgDn browse them
+                        try:
+                            records = loader.load(sudoku_file)
+                        except (OSError, UnicodeDecodeError, ValueError):
+                            records = None
+                            bottom_text="Load failed! (can't read the file)"
+                        if records is not None:
+                            loaded = [record for record in records if record.puzzle is not None]
+                            bad_records = len(records) - len(loaded)
+                            if loaded:
+                                loaded_index = 0
+                                show_loaded = True
+                            elif records:
+                                # nothing could be read -> show why the first record failed
+                                bottom_text="Load failed! (line %d: %s)" % (records[0].line, records[0].error)
+                            else:
+                                bottom_text="Load failed! (no sudoku in the file)"
+
+                # PgUp / PgDn pressed -> previous / next puzzle of the loaded file
+                if (event.key == pygame.K_PAGEUP or event.key == pygame.K_PAGEDOWN) and loaded:
+                    worker.cancel()
+                    step = -1 if event.key == pygame.K_PAGEUP else 1
+                    loaded_index = (loaded_index + step) % len(loaded)
+                    show_loaded = True
+
+        # puzzle of the loaded file chosen (L, PgUp, PgDn) -> put it in frozen grid
+        if show_loaded:
+            record = loaded[loaded_index]
+            frozen_grid = grid_to_pygame(record.puzzle)
+            grid = [x[:] for x in frozen_grid]
+            cands = CandidateGrid(grid_from_pygame(grid))
+            error_squares = []
+            change = 1
+            if len(loaded) == 1 and not bad_records:
+                bottom_text="Loaded sudoku from a file!"
+            else:
+                bottom_text="Loaded sudoku %d of %d (line %d)" % (loaded_index + 1, len(loaded), record.line)
+                if bad_records:
+                    bottom_text += ", %d bad" % bad_records
+            show_loaded = False
+
+        # result of the background job
+        job = worker.poll()
+        if job is not None:
+            job_name, sol_answ, job_error = job
+
+            if job_error is not None:
+                bottom_text = "Failed! (" + job_error + ")"
+
+            # new sudoku generated -> put it in frozen grid
+            elif job_name == "generate":
+                frozen_grid = grid_to_pygame(sol_answ)
+                grid = [x[:] for x in frozen_grid]
+                cands = CandidateGrid(grid_from_pygame(grid))
+                error_squares = []
+                bottom_text="Generated new sudoku!"
+                change = 1
+
+            # solution of the user entered grid (H)
+            elif job_name == "solve_current":
+                # one solution found -> display it
+                if sol_answ != 2 and sol_answ != False:
+                    frozen_grid = grid_to_pygame(sol_answ, string=False)
+                    grid = [x[:] for x in frozen_grid]
+                    cands = CandidateGrid(grid_from_pygame(grid))
+                    # the solved grid is the new initial puzzle -> its solution is known already
+                    cache_solution(grid_from_pygame(frozen_grid), sol_answ)
+                    error_squares = []
+                    bottom_text="Correct solution to the current state of puzzle."
+                    change = 1
+                else:
+                    bottom_text = "This sudoku is not valid! (unsolvable or multiple solutions)"
+
+        # solution of the initial puzzle finished in the background -> keep it in the cache
+        job = solution_worker.poll()
+        if job is not None:
+            puzzle, sol_answ, job_error = job
+            if job_error is not None:
+                if waiting:
+                    bottom_text = "Failed! (" + job_error + ")"
+                waiting.clear()
+            else:
+                cache_solution(puzzle, sol_answ)
+
+        if worker.busy:
+            # show that the job is still running (with running time)
+            bottom_text = "%s... %.1f s (Esc = cancel)" % (JOB_TEXT[worker.name], worker.elapsed())
+        elif waiting & {"solve_initial", "errors"} and solution_worker.busy:
+            # G or J waits for the solution of the initial puzzle
+            name = "solve_initial" if "solve_initial" in waiting else "errors"
+            bottom_text = "%s... %.1f s (Esc = cancel)" % (JOB_TEXT[name], solution_worker.elapsed())
+
+        # checks if user inputed a new digit and puts it in selected square
+        if insert_val != 0:
+            # insert only to empty squares in initial puzzle
+            if frozen_grid[y][x] == 0:
+                # change the value only when it's different from the one before
+                if grid[y][x] != insert_val:
+                    grid[y][x] = insert_val
+                    cands.set(y * 9 + x, insert_val)
+
+                    # remove this square from error marked squares -> user changed it
+                    rem_square = str(chr(y + 65)) + str(x+1)
+                    if rem_square in error_squares:
+                        error_squares.remove(rem_square)
+
+                bottom_text=""
+                change = 1
+
+                # second part checks if user has solved the sudoku by entering this value
+
+                # go through all squares and check if none of them is zero (a full grid with conflicts can't be solved)
+                # -> compared with the solution of the initial puzzle below, as soon as it is known
+                won = False
+                if all(grid[i//9][i%9] != 0 for i in range(81)) and not cands.conflicts():
+                    waiting.add("win")
+                    request_solution()
+                else:
+                    waiting.discard("win")
+
+            # reset insert value back to zero
+            insert_val = 0
+
+        # actions waiting for the solution of initial puzzle -> done once it is in the cache (only O(81) comparisons)
+        init_sol = cached_solution(grid_from_pygame(frozen_grid)) if waiting else None
+        if init_sol is not None:
+            if "errors" in waiting:
+                error_squares = []
+                # list of error squares in string -> for displaying to the user
+                str_sqr = ""
+
+                # go through list of squares with wrong digit -> add them to the list (and string)
+                for square in check_user_solution(grid_from_pygame(grid), init_sol):
+                    error_squares.append(square)
+                    str_sqr += square + " "
+
+                # check if any errors were found and update bottom text accordingly
+                if str_sqr == "":
+                    bottom_text = "No incorrect squares!"
+                else:
+                    bottom_text = "Incorrect squares are: " + str_sqr
+
+            # (the board can have changed since the win check was requested -> it has to be still full)
+            if ("win" in waiting and init_sol != 2 and init_sol != False
+                    and all(grid[i//9][i%9] != 0 for i in range(81))):
+                # the initial puzzle had a solution
+                if len(check_user_solution(grid_from_pygame(grid), init_sol)) == 0:
+                    # there is no difference between user solution and correct solution
+                    bottom_text="Correct solution!"
+                    square_color = (217, 234, 211)
+                    init_square_color = (217, 234, 211)
+                    won = True
+                    change = 1
+
+            if "solve_initial" in waiting:
+                # one solution found -> display it
+                if init_sol != 2 and init_sol != False:
+                    frozen_grid = grid_to_pygame(init_sol, string=False)
+                    grid = [x[:] for x in frozen_grid]
+                    cands = CandidateGrid(grid_from_pygame(grid))
+                    cache_solution(grid_from_pygame(frozen_grid), init_sol)
+                    error_squares = []
+                    bottom_text="Correct solution to the initial puzzle."
+                    change = 1
+
+                # none or multiple solutions (G triggers this when called on cleared board)
+                else:
+                    bottom_text="Initial puzzle is not a valid sudoku!"
+            waiting.clear()
+
+        # user changed the board
+        if change == 1:
+            # keep normal colors if user hasn't won
+            if won == False:
+                square_color = (245, 227, 207)
+                init_square_color = (212, 219, 252)
+
+            # digits that are twice in a unit are highlighted right away
+            conflicts = set(squares[s] for s in cands.conflicts())
+
+            # new initial puzzle -> solve it in the background, actions waiting for the old one are dropped
+            puzzle = grid_from_pygame(frozen_grid)
+            if puzzle != frozen_puzzle:
+                frozen_puzzle = puzzle
+                waiting.clear()
+                request_solution()
+
+            if pencilmarks:
+                # get pencilmarks if showing them is enabled and a change to the board occured
+                # (the candidate model is updated by every edit -> no parsing of the whole grid)
+                marks = cands.marks(strong_marks)
+            change = 0
+
+        # FPS (frames drawn per second) and CPU use of this process, updated every second
+        if show_fps and time.perf_counter() - fps_time >= 1:
+            now, cpu_now = time.perf_counter(), time.process_time()
+            overlay_text = "FPS %.1f  CPU %.1f %%" % (frames / (now - fps_time), 100 * (cpu_now - cpu_time) / (now - fps_time))
+            frames, fps_time, cpu_time = 0, now, cpu_now
+
+        # draw only the squares and texts that changed since the last frame
+        cells = cell_states(error_squares, pencilmarks, marks)
+        rects = [cell_rect(k % 9, k // 9) for k in range(81) if full_redraw or cells[k] != drawn_cells[k]]
+        if bottom_text != drawn_text:
+            rects.append(BOTTOM_RECT)
+        if overlay_text != drawn_overlay:
+            # new FPS / CPU text or the overlay was turned off (its old text is erased)
+            rects.append(OVERLAY_RECT)
+
+        if full_redraw or len(rects) > 27:
+            # many changes -> one redraw of the whole window is cheaper
+            draw_screen(error_squares, pencilmarks, marks, overlay_text)
+            pygame.display.update()
+        elif rects:
+            redraw(rects, error_squares, pencilmarks, marks, overlay_text)
+        if rects:
+            frames += 1
+        full_redraw = False
+        drawn_cells = cells
+        drawn_text = bottom_text
+        drawn_overlay = overlay_text
+
+    # Quit pygame window (and stop the background job)
+    worker.close()
+    solution_worker.close()
+    pygame.quit()
@@ -0,0 +1,62 @@
+# Tests of search budgets (node budget, deadline, cancellation) in every engine
+# usage: python -m unittest test_budget (or pytest) from the repository root
+
+import time
+import unittest
+
+import board
+import solver
+
+# norvig's hard1, needs a few dozen search nodes in every engine
+PUZZLE = "4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......"
+
+def cancelled():
+    token = solver.CancelToken()
+    token.cancel()
+    return solver.Budget(cancel=token)
+
+# budget that runs out at once -> its reason
+BUDGETS = (("nodes", lambda: solver.Budget(max_nodes=1)),
+           ("deadline", lambda: solver.Budget(deadline=time.monotonic() - 1)),
+           ("cancelled", cancelled))
+
+class BudgetTest(unittest.TestCase):
+
+    def test_solve_grid_status(self):
+        for backend in solver.BACKENDS:
+            for reason, make in BUDGETS:
+                with self.subTest(backend=backend, reason=reason):
+                    budget = make()
+                    result = solver.solve_grid(PUZZLE, backend=backend, budget=budget)
+                    self.assertEqual(result.status, solver.BUDGET_EXCEEDED)
+                    self.assertIsNone(result.solution)
+                    self.assertEqual(budget.reason, reason)
+                    self.assertLessEqual(result.stats["nodes"], 1)
+
+    def test_enough_budget(self):
+        for backend in solver.BACKENDS:
+            with self.subTest(backend=backend):
+                budget = solver.Budget(max_nodes=100000, timeout=60)
+                self.assertEqual(solver.solve_grid(PUZZLE, backend=backend, budget=budget).status, solver.UNIQUE)
+                self.assertIsNone(budget.reason)
+                self.assertGreater(budget.nodes, 1)
+
+    def test_raising_functions(self):
+        # the old interfaces have no status for it -> BudgetExceeded with the partial stats
+        calls = (("solve", lambda budget: solver.solve(PUZZLE, budget=budget)),
+                 ("count_solutions", lambda budget: solver.count_solutions(PUZZLE, budget=budget)),
+                 ("generator", lambda budget: solver.generator(rng=1, budget=budget)),
+                 ("board.solve", lambda budget: board.solve(PUZZLE, budget=budget)),
+                 ("board.generator", lambda budget: board.generator(16, rng=1, budget=budget)))
+        for name, call in calls:
+            with self.subTest(call=name):
+                with self.assertRaises(solver.BudgetExceeded) as raised:
+                    call(solver.Budget(max_nodes=1))
+                self.assertIsNotNone(raised.exception.stats)
+
+    def test_board_status(self):
+        self.assertEqual(board.solve_grid(PUZZLE, budget=solver.Budget(max_nodes=1)).status, solver.BUDGET_EXCEEDED)
+        self.assertEqual(board.solve_grid(PUZZLE).status, solver.UNIQUE)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+# Tests of the incremental candidate grid (candidates, conflicts, undo / redo)
+# usage: python -m unittest test_candidates (or pytest) from the repository root
+
+import random
+import unittest
+
+import solver
+from candidates import CandidateGrid
+
+PUZZLE = "4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......"
+
+class CandidateGridTest(unittest.TestCase):
+
+    def test_marks_match_solver(self):
+        grid = CandidateGrid(PUZZLE)
+        self.assertEqual(grid.to_string(), PUZZLE)
+        self.assertEqual(grid.marks(), solver.get_pencilmarks(PUZZLE))
+
+    def test_edits_match_solver(self):
+        # after any edits the counts give the same candidates as a grid parsed from scratch
+        rng = random.Random(1)
+        grid = CandidateGrid(PUZZLE)
+        for _ in range(200):
+            grid.set(rng.randrange(81), rng.randrange(10))
+            self.assertEqual(grid.marks(), solver.get_pencilmarks(grid.to_string()))
+
+    def test_conflicts(self):
+        grid = CandidateGrid(PUZZLE)
+        self.assertEqual(grid.conflicts(), [])
+        grid.set("A2", 4)
+        self.assertEqual(grid.conflicts(), [0, 1])
+        grid.clear("A2")
+        self.assertEqual(grid.conflicts(), [])
+
+    def test_undo_redo(self):
+        grid = CandidateGrid(PUZZLE)
+        states = [grid.to_string()]
+        for s, d in ((1, 1), ("A3", "2"), (1, 6), (1, 0)):
+            self.assertTrue(grid.set(s, d))
+            states.append(grid.to_string())
+        self.assertFalse(grid.set(1, 0))
+
+        for state in reversed(states[:-1]):
+            self.assertIsNotNone(grid.undo())
+            self.assertEqual(grid.to_string(), state)
+            self.assertEqual(grid.marks(), solver.get_pencilmarks(state))
+        self.assertIsNone(grid.undo())
+
+        for state in states[1:]:
+            self.assertIsNotNone(grid.redo())
+            self.assertEqual(grid.to_string(), state)
+        self.assertIsNone(grid.redo())
+
+        # a new edit drops what could be redone
+        grid.undo()
+        grid.set(40, 5)
+        self.assertIsNone(grid.redo())
+
+    def test_strong_marks(self):
+        # naked and hidden singles only take candidates away, the solution keeps all its digits
+        grid = CandidateGrid(PUZZLE)
+        solution = solver.solve(PUZZLE)
+        weak, strong = grid.marks(), grid.marks(strong=True)
+        for s in solver.squares:
+            self.assertTrue(set(strong[s]) <= set(weak[s]))
+            if weak[s]:
+                self.assertIn(solution[s], strong[s])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+# Tests of canonical forms and the solution cache
+# usage: python -m unittest test_canon (or pytest) from the repository root
+
+import random
+import unittest
+
+import canon
+import solver
+from generate import apply_transform, shuffle_grid
+
+PUZZLE = "4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......"
+
+def solution_string(result):
+    return None if result.solution is None else "".join(result.solution[s] for s in solver.squares)
+
+class CanonTest(unittest.TestCase):
+
+    def test_invariance(self):
+        rng = random.Random(1)
+        puzzles = [PUZZLE] + [solver.generator(rng=i) for i in range(3)]
+        for puzzle in puzzles:
+            canonical, transform = canon.canonical_form(puzzle)
+            self.assertEqual(apply_transform(puzzle, transform), canonical)
+            self.assertEqual(canon.invert_transform(canonical, transform), puzzle)
+            for _ in range(3):
+                with self.subTest(puzzle=puzzle):
+                    self.assertEqual(canon.canonical_form(shuffle_grid(puzzle, rng))[0], canonical)
+
+    def test_max_states(self):
+        # the same row in every row of the grid ties every row order
+        self.assertIsNone(canon.canonical_form("123456789" * 9, max_states=10))
+        self.assertIsNotNone(canon.canonical_form(PUZZLE, max_states=canon.MAX_STATES))
+
+    def test_cache_results(self):
+        rng = random.Random(2)
+        cache = canon.SolutionCache(maxsize=8)
+        grids = [PUZZLE, shuffle_grid(PUZZLE, rng), PUZZLE, "." * 81, PUZZLE[:-1] + "4", "123", PUZZLE[:80]]
+        for grid in grids:
+            with self.subTest(grid=grid):
+                expected = solver.solve_grid(grid)
+                result = cache.solve_grid(grid)
+                self.assertEqual(result.status, expected.status)
+                self.assertEqual(solution_string(result), solution_string(expected))
+        info = cache.cache_info()
+        # the shuffled puzzle shares the entry of PUZZLE, the repeated PUZZLE and PUZZLE[:80] (its last square
+        # is empty anyway) are exact hits
+        self.assertEqual(info.hits, 3)
+
+    def test_cache_size(self):
+        # maxsize counts canonical entries, the exact grids are kept apart
+        cache = canon.SolutionCache(maxsize=4)
+        puzzles = [solver.generator(rng=i) for i in range(6)]
+        for puzzle in puzzles:
+            cache.solve_grid(puzzle)
+        info = cache.cache_info()
+        self.assertEqual((info.misses, info.evictions, info.currsize), (6, 2, 4))
+        for puzzle in puzzles[2:]:
+            cache.solve_grid(puzzle)
+        self.assertEqual(cache.cache_info().hits, 4)
+
+if __name__ == "__main__":
+    unittest.main()
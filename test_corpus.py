@@ -0,0 +1,73 @@
+# Tests of the packed puzzle corpus (round trip of puzzles, solutions, statuses and unreadable records)
+# usage: python -m unittest test_corpus (or pytest) from the repository root
+
+import io
+import os
+import tempfile
+import unittest
+
+import corpus
+import loader
+import solver
+
+PUZZLE = "4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......"
+BAD = PUZZLE[:80]
+
+class CorpusTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "puzzles" + corpus.EXTENSION)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_pack_grid(self):
+        for grid in (PUZZLE, PUZZLE.replace(".", "0"), "." * 81, "123456789" * 9):
+            with self.subTest(grid=grid):
+                self.assertEqual(corpus.unpack_grid(corpus.pack_grid(grid)), grid.replace("0", "."))
+        self.assertIsNone(corpus.unpack_grid(corpus.UNREADABLE))
+
+    def test_round_trip(self):
+        result = solver.solve_grid(PUZZLE)
+        with corpus.CorpusWriter(self.path, solutions=True, statuses=True) as writer:
+            writer.add(PUZZLE, result.solution, result.status)
+            writer.add(None, None, corpus.INVALID)
+            writer.add("." * 81, None, solver.TOO_FEW_CLUES)
+        data = corpus.Corpus(self.path)
+        try:
+            self.assertEqual(len(data), 3)
+            self.assertEqual(list(data), [PUZZLE, None, "." * 81])
+            self.assertEqual(data.solution(0), "".join(result.solution[s] for s in solver.squares))
+            self.assertEqual([data.status(i) for i in range(3)], [solver.UNIQUE, corpus.INVALID, solver.TOO_FEW_CLUES])
+            self.assertIsNone(data.solution(1))
+            self.assertEqual(list(data[1:]), [None, "." * 81])
+        finally:
+            data.close()
+
+    def test_pack_text(self):
+        # records that can't be read are reported and skipped by pack(), read back as error records
+        text = io.StringIO("%s\n%s\n%s\n" % (PUZZLE, BAD, PUZZLE))
+        self.assertEqual(corpus.pack(text, self.path), 2)
+        self.assertTrue(corpus.is_corpus(self.path))
+        records = loader.load(self.path)
+        self.assertEqual([(r.puzzle, r.line) for r in records], [(PUZZLE, 1), (PUZZLE, 2)])
+
+    def test_unreadable_record(self):
+        with corpus.CorpusWriter(self.path) as writer:
+            writer.add(PUZZLE)
+            writer.add(None)
+        records = loader.load(self.path)
+        self.assertEqual(records[0], loader.Record(PUZZLE, 1, None))
+        self.assertIsNone(records[1].puzzle)
+        self.assertIsNotNone(records[1].error)
+
+    def test_not_a_corpus(self):
+        with open(self.path, "w") as f:
+            f.write(PUZZLE + "\n")
+        self.assertFalse(corpus.is_corpus(self.path))
+        with self.assertRaises(ValueError):
+            corpus.Corpus(self.path)
+
+if __name__ == "__main__":
+    unittest.main()
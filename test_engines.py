@@ -0,0 +1,105 @@
+# Parity test of the solver engines against test_data/expected_results.txt
+# usage: python -m unittest test_engines (or pytest) from the repository root
+# every test_data/input*.txt puzzle is solved by each engine through solve_grid() and the old solve() contract
+# (solution dict, False for no solution, 2 for multiple solutions or too few input digits)
+
+import glob
+import os
+import re
+import unittest
+
+import bitsolver
+import dlx
+import loader
+import solver
+from solver import squares
+
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_data")
+
+# reason given in expected_results.txt for an invalid puzzle -> status of solve_grid()
+REASONS = (("two solutions", solver.MULTIPLE), ("unsolvable", solver.NONE),
+           ("need at least 17", solver.TOO_FEW_CLUES), ("8 different digits", solver.TOO_FEW_CLUES))
+
+ENGINES = {"strings": solver, "bits": bitsolver, "dlx": dlx}
+
+try:
+    import npsolver
+except ImportError:
+    npsolver = None
+
+def read_expected(path):
+    # expected_results.txt -> input file name -> (status, solution string or None)
+    sections = {}
+    name = None
+    with open(path) as f:
+        lines = f.readlines()
+    for line in lines:
+        header = re.match(r"(input\d+\.txt)", line)
+        if header:
+            name = header.group(1)
+            sections[name] = []
+        elif name is not None:
+            sections[name].append(line)
+    expected = {}
+    for name, lines in sections.items():
+        text = "".join(lines)
+        if "not a valid sudoku" in text:
+            status = next(status for reason, status in REASONS if reason in text)
+            expected[name] = (status, None)
+        else:
+            expected[name] = (solver.UNIQUE, "".join(c for c in text if c in solver.digits))
+    return expected
+
+def read_puzzle(name):
+    return next(loader.puzzles(loader.load(os.path.join(DATA, name))))
+
+def legacy(status, solution):
+    # expected return value of solve() for a status
+    if status == solver.UNIQUE:
+        return dict(zip(squares, solution))
+    return False if status == solver.NONE else 2
+
+class ExpectedResultsTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.expected = read_expected(os.path.join(DATA, "expected_results.txt"))
+        cls.names = sorted(os.path.basename(path) for path in glob.glob(os.path.join(DATA, "input*.txt")))
+
+    def test_every_input_has_expected_result(self):
+        self.assertTrue(self.names)
+        self.assertEqual(set(self.names), set(self.expected))
+        for status, solution in self.expected.values():
+            if status == solver.UNIQUE:
+                self.assertEqual(len(solution), 81)
+
+    def test_solve_grid(self):
+        for name in self.names:
+            status, solution = self.expected[name]
+            puzzle = read_puzzle(name)
+            for backend in solver.BACKENDS:
+                with self.subTest(input=name, backend=backend):
+                    result = solver.solve_grid(puzzle, backend=backend)
+                    self.assertEqual(result.status, status)
+                    if solution is None:
+                        self.assertIsNone(result.solution)
+                    else:
+                        self.assertEqual("".join(result.solution[s] for s in squares), solution)
+
+    def test_solve_contract(self):
+        for name in self.names:
+            status, solution = self.expected[name]
+            puzzle = read_puzzle(name)
+            for engine, module in ENGINES.items():
+                with self.subTest(input=name, engine=engine):
+                    self.assertEqual(module.solve(puzzle), legacy(status, solution))
+
+    @unittest.skipIf(npsolver is None, "numpy is not installed")
+    def test_numpy_batch(self):
+        puzzles = [read_puzzle(name) for name in self.names]
+        for name, answer in zip(self.names, npsolver.solve_batch(puzzles)):
+            with self.subTest(input=name):
+                self.assertEqual(answer, legacy(*self.expected[name]))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+# Tests of the puzzle loader (format detection, records and errors)
+# usage: python -m unittest test_loader (or pytest) from the repository root
+
+import io
+import os
+import tempfile
+import unittest
+
+import loader
+
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_data")
+
+PUZZLE = "4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......"
+
+def rows(puzzle):
+    return [puzzle[i:i + 9] for i in range(0, 81, 9)]
+
+def records(text, fmt=None):
+    return list(loader.iter_records(io.StringIO(text), fmt))
+
+class LoaderTest(unittest.TestCase):
+
+    def test_no_puzzles(self):
+        for text in ("", "\n\n", "# comment\n", "# comment\n[Puzzle]\n\n"):
+            with self.subTest(text=text):
+                self.assertEqual(records(text), [])
+                self.assertEqual(records(text, loader.GRID), [])
+
+    def test_empty_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for name, text in (("empty.txt", ""), ("comment.txt", "# nothing here\n")):
+                path = os.path.join(tmp, name)
+                with open(path, "w") as f:
+                    f.write(text)
+                with self.subTest(file=name):
+                    self.assertEqual(loader.load(path), [])
+                    self.assertEqual(list(loader.open_records(path)), [])
+
+    def test_line_format(self):
+        text = "# header\n%s\n%s  comment 123\n%s\n" % (PUZZLE, PUZZLE, PUZZLE[:80])
+        self.assertEqual(records(text), [loader.Record(PUZZLE, 2, None), loader.Record(PUZZLE, 3, None),
+                                         loader.Record(None, 4, "expected 81 squares, found 80")])
+
+    def test_truncated_first_line(self):
+        # one bad line doesn't make the rest of the file grid format
+        text = "%s\n%s\n%s\n" % (PUZZLE[:80], PUZZLE, PUZZLE)
+        result = records(text)
+        self.assertEqual([r.puzzle for r in result], [None, PUZZLE, PUZZLE])
+        self.assertEqual(result[0].line, 1)
+
+    def test_grid_formats(self):
+        sdk = "\n".join(rows(PUZZLE)) + "\n"
+        ss = "\n".join(r[:3] + "|" + r[3:6] + "|" + r[6:] for r in rows(PUZZLE)) + "\n"
+        for name, lines in (("sdk", sdk), ("ss", "---+---+---\n" + ss), ("two", sdk + "\n" + sdk)):
+            with self.subTest(format=name):
+                result = records(lines)
+                self.assertTrue(result)
+                self.assertTrue(all(r.puzzle == PUZZLE for r in result))
+        with open(os.path.join(DATA, "input1.txt")) as f:
+            self.assertEqual(len(list(loader.puzzles(loader.iter_records(f)))), 1)
+
+    def test_grid_with_whole_puzzle_line(self):
+        text = "\n".join(rows(PUZZLE)) + "\n" + PUZZLE + "\n" + "\n".join(rows(PUZZLE)[:4]) + "\n" + PUZZLE + "\n"
+        result = records(text)
+        self.assertEqual([(r.puzzle, r.line) for r in result],
+                         [(PUZZLE, 1), (PUZZLE, 10), (None, 11), (PUZZLE, 15)])
+
+    def test_bad_row(self):
+        text = "\n".join(rows(PUZZLE)[:3]) + "\n12345678\n" + "\n".join(rows(PUZZLE)) + "\n"
+        result = records(text)
+        self.assertEqual(result[0], loader.Record(None, 1, "line 4: expected 9 squares in a row, found 8"))
+        self.assertEqual(result[1], loader.Record(PUZZLE, 5, None))
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            loader.iter_records(io.StringIO(PUZZLE), "csv")
+
+if __name__ == "__main__":
+    unittest.main()